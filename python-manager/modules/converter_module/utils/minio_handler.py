@@ -1,6 +1,8 @@
 import io
 import os
+import shutil
 from minio import Minio
+from minio.error import S3Error
 from config import config
 from logger import get_logger
 
@@ -33,6 +35,39 @@ class MinIOHandler:
             logger.error(f"❌ Download failed for {object_key}: {e}")
             raise
     
+    def download_to_path(self, object_key: str, local_path: str) -> None:
+        """Download file from MinIO straight to disk, without buffering it in memory."""
+        try:
+            logger.info(f"Downloading from MinIO: {object_key} -> {local_path}")
+            response = self.client.get_object(self.bucket, object_key)
+            self._save_response(response, local_path)
+            logger.info(f"✅ Downloaded {object_key}")
+        except Exception as e:
+            logger.error(f"❌ Download failed for {object_key}: {e}")
+            raise
+
+    def download_to_path_if_exists(self, object_key: str, local_path: str) -> bool:
+        """Like download_to_path, but return False instead of raising when the object does not exist."""
+        try:
+            response = self.client.get_object(self.bucket, object_key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return False
+            logger.error(f"❌ Download failed for {object_key}: {e}")
+            raise
+        self._save_response(response, local_path)
+        logger.info(f"✅ Downloaded {object_key}")
+        return True
+
+    @staticmethod
+    def _save_response(response, local_path: str) -> None:
+        try:
+            with open(local_path, "wb") as f:
+                shutil.copyfileobj(response, f, length=1 << 20)
+        finally:
+            response.close()
+            response.release_conn()
+
     def upload_file(
         self, 
         object_key: str, 
@@ -57,4 +92,24 @@ class MinIOHandler:
             logger.error(f"❌ Upload failed for {object_key}: {e}")
             raise
 
+    def upload_path(
+        self,
+        object_key: str,
+        local_path: str,
+        content_type: str = "application/octet-stream"
+    ) -> None:
+        """Upload a file from disk to MinIO, streaming it in parts."""
+        try:
+            logger.info(f"Uploading to MinIO: {object_key} ({os.path.getsize(local_path)} bytes)")
+            self.client.fput_object(
+                self.bucket,
+                object_key,
+                local_path,
+                content_type=content_type,
+            )
+            logger.info(f"✅ Uploaded {object_key}")
+        except Exception as e:
+            logger.error(f"❌ Upload failed for {object_key}: {e}")
+            raise
+
 minio_handler = MinIOHandler()
@@ -271,8 +271,44 @@ def _should_process(name: str) -> bool:
     return False
 
 
-def process_docx(input_path: str, output_path: str, skip_detect: bool = False) -> None:
-    """Process DOCX file."""
+def _humanize_package(input_path, output, skip_detect: bool) -> None:
+    """Copy the DOCX package entry by entry, humanizing the main document."""
+    with zipfile.ZipFile(input_path, "r") as zin, zipfile.ZipFile(output, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if _should_process(item.filename):
+                try:
+                    tree = etree.parse(io.BytesIO(data))
+                except Exception as xml_err:
+                    import traceback, tempfile
+                    print(f"[XML ERROR] Failed to parse {item.filename} in {input_path}: {xml_err}")
+                    tb = traceback.format_exc()
+                    print(tb)
+                    # Write problematic XML to a temp file for later analysis
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=".xml", mode="wb") as badxml:
+                        badxml.write(data)
+                        print(f"[XML ERROR] Problematic XML written to: {badxml.name}")
+                    raise RuntimeError(f"XML parse error in {item.filename}: {xml_err}\nTraceback:\n{tb}\nProblematic XML saved to: {badxml.name}")
+                _process_tree(tree, skip_detect=skip_detect)
+                data = etree.tostring(
+                    tree,
+                    xml_declaration=True,
+                    encoding="UTF-8",
+                    standalone="yes",
+                )
+            zi = zipfile.ZipInfo(item.filename)
+            zi.date_time = item.date_time
+            zi.compress_type = item.compress_type
+            zi.external_attr = item.external_attr
+            zout.writestr(zi, data)
+
+
+def process_docx(input_path, output_path, skip_detect: bool = False) -> None:
+    """Process DOCX file.
+
+    input_path and output_path may be paths or binary file objects (e.g.
+    BytesIO), so pipeline stages can hand documents over in memory.
+    """
     import os
     import tempfile
     import shutil
@@ -288,38 +324,23 @@ def process_docx(input_path: str, output_path: str, skip_detect: bool = False) -
         print(f"[ERROR] Input DOCX is corrupted: {input_path}")
         raise RuntimeError("Input DOCX file is corrupted. Aborting humanizer.")
 
+    if not isinstance(output_path, (str, os.PathLike)):
+        # In-memory output: build in a buffer, hand it over only if valid
+        buffer = io.BytesIO()
+        _humanize_package(input_path, buffer, skip_detect)
+        if not is_valid_docx(buffer):
+            print("[ERROR] Output DOCX is corrupted")
+            raise RuntimeError("Humanizer produced a corrupted DOCX file.")
+        output_path.seek(0)
+        output_path.truncate()
+        output_path.write(buffer.getbuffer())
+        return
+
     # Write to a temp file first, only move to output_path if valid
     with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmpfile:
         tmp_output = tmpfile.name
     try:
-        with zipfile.ZipFile(input_path, "r") as zin, zipfile.ZipFile(tmp_output, "w") as zout:
-            for item in zin.infolist():
-                data = zin.read(item.filename)
-                if _should_process(item.filename):
-                    try:
-                        tree = etree.parse(io.BytesIO(data))
-                    except Exception as xml_err:
-                        import traceback, tempfile
-                        print(f"[XML ERROR] Failed to parse {item.filename} in {input_path}: {xml_err}")
-                        tb = traceback.format_exc()
-                        print(tb)
-                        # Write problematic XML to a temp file for later analysis
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".xml", mode="wb") as badxml:
-                            badxml.write(data)
-                            print(f"[XML ERROR] Problematic XML written to: {badxml.name}")
-                        raise RuntimeError(f"XML parse error in {item.filename}: {xml_err}\nTraceback:\n{tb}\nProblematic XML saved to: {badxml.name}")
-                    _process_tree(tree, skip_detect=skip_detect)
-                    data = etree.tostring(
-                        tree,
-                        xml_declaration=True,
-                        encoding="UTF-8",
-                        standalone="yes",
-                    )
-                zi = zipfile.ZipInfo(item.filename)
-                zi.date_time = item.date_time
-                zi.compress_type = item.compress_type
-                zi.external_attr = item.external_attr
-                zout.writestr(zi, data)
+        _humanize_package(input_path, tmp_output, skip_detect)
 
         # --- Validate output DOCX ---
         if not is_valid_docx(tmp_output):
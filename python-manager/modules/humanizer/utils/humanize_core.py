@@ -2,14 +2,26 @@
 Core humanization utilities - Streamlit-free version
 Extracted from pages/humanize_text.py for API usage
 """
+import atexit
+import functools
+import os
 import random
 import re
 import ssl
+import sys
+import threading
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+
 import nltk
 import spacy
 from nltk.tokenize import sent_tokenize, word_tokenize
 
+try:
+    import re2  # google-re2: linear-time engine for the fused paraphrase scanners
+except ImportError:
+    re2 = None
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 ########################################
@@ -78,34 +90,31 @@ HEADER_PATTERNS = [
 
 HEADER_REGEX = re.compile("|".join(HEADER_PATTERNS), re.IGNORECASE)
 
+# Header patterns plus the short-label rule (under 10 chars containing ':'),
+# matched against the stripped line in one call
+_HEADER_OR_LABEL_REGEX = re.compile(
+    "|".join(HEADER_PATTERNS) + r"|(?=.{0,9}\Z)[^:]*:",
+    re.IGNORECASE | re.DOTALL,
+)
+
 def is_header_or_metadata(line: str) -> bool:
     """
     Check if a line is a header/metadata line that should not be humanized.
     Headers are typically short lines with labels followed by colons or values.
     """
-    line_stripped = line.strip()
-    
-    # Skip empty lines
-    if not line_stripped:
-        return False
-    
-    # Check against header patterns
-    if HEADER_REGEX.match(line_stripped):
-        return True
-    
-    # Skip very short lines (likely headers/labels)
-    if len(line_stripped) < 10:
-        # But only if they end with ':' (label pattern)
-        if ':' in line_stripped:
-            return True
-    
-    return False
+    # Empty lines match neither a header pattern nor the label rule
+    return _HEADER_OR_LABEL_REGEX.match(line.strip()) is not None
 
 ########################################
 # Helper: Protect numeric/currency patterns
 ########################################
 CURRENCY_PATTERN = re.compile(r'([₹$€£¥]\s*[\d,]+(?:\.\d{1,2})?)')
 
+# Placeholder prefixes produced by protect_numbers/extract_citations
+_NUM_PREFIX = sys.intern("__NUM")
+_REF_PREFIX = sys.intern("[[REF")
+_PLACEHOLDER_PREFIXES = (_NUM_PREFIX, _REF_PREFIX)
+
 def protect_numbers(text):
     """Extract currency and large numbers, replace with placeholders."""
     protected = {}
@@ -116,7 +125,7 @@ def protect_numbers(text):
         # Remove any spaces within the number
         clean_value = re.sub(r'(₹|\$|€|£|¥)\s+', r'\1', value)
         clean_value = clean_value.replace(' ', '')
-        placeholder = f"__NUM{counter[0]}__"
+        placeholder = f"{_NUM_PREFIX}{counter[0]}__"
         protected[placeholder] = clean_value
         counter[0] += 1
         return placeholder
@@ -162,6 +171,46 @@ def restore_citations(text, placeholder_map):
     restored = PLACEHOLDER_REGEX.sub(replace_placeholder, text)
     return restored
 
+########################################
+# Combined protection: numbers + citations in one pass
+########################################
+_PROTECT_REGEX = re.compile(f"(?P<num>{CURRENCY_PATTERN.pattern})|(?P<ref>{CITATION_REGEX.pattern})")
+_PROTECTED_PLACEHOLDER_REGEX = re.compile(rf"(?P<num>{_NUM_PREFIX}\d+__)|{PLACEHOLDER_REGEX.pattern}")
+
+def protect_spans(text):
+    """Replace currency values and citations with placeholders in a single scan.
+
+    Same placeholders and numbering as protect_numbers followed by
+    extract_citations; returns the protected text and one combined table.
+    """
+    table = {}
+    counters = {"num": 0, "ref": 0}
+
+    def replace_fn(match):
+        if match.lastgroup == "num":
+            value = re.sub(r'(₹|\$|€|£|¥)\s+', r'\1', match.group(0)).replace(' ', '')
+            placeholder = f"{_NUM_PREFIX}{counters['num']}__"
+            counters["num"] += 1
+        else:
+            value = match.group(0)
+            counters["ref"] += 1
+            placeholder = f"[[REF_{counters['ref']}]]"
+        table[placeholder] = value
+        return placeholder
+
+    return _PROTECT_REGEX.sub(replace_fn, text), table
+
+def restore_spans(text, table):
+    """Undo protect_spans in one scan (tolerates spaces added inside [[REF_n]])."""
+    if not table:
+        return text
+
+    def replace_fn(match):
+        key = match.group("num") or f"[[REF_{match.group(2)}]]"
+        return table.get(key, match.group(0))
+
+    return _PROTECTED_PLACEHOLDER_REGEX.sub(replace_fn, text)
+
 ########################################
 # Step 2: Expansions, Synonyms, & Transitions
 ########################################
@@ -312,102 +361,128 @@ def expand_contractions(text):
             expanded.append(replaced)
     return " ".join(expanded)
 
+# Radical vocabulary replacement table, built once at import
+_SYNONYM_MAP = {
+    "utilize": ["use", "employ", "apply", "leverage", "tap into", "work with", "get the most from"],
+    "obtain": ["get", "acquire", "gain", "pick up", "snag", "grab", "land"],
+    "assistance": ["help", "support", "aid", "a hand", "backing"],
+    "assist": ["help", "support", "aid", "back up", "give a hand"],
+    "demonstrate": ["show", "illustrate", "prove", "display", "make clear", "reveal", "spell out"],
+    "indicate": ["show", "suggest", "point to", "reveal", "hint at", "signal"],
+    "methodology": ["method", "approach", "way", "technique", "process", "strategy"],
+    "objective": ["goal", "aim", "target", "purpose", "what we're after", "end game"],
+    "approximately": ["about", "around", "roughly", "nearly", "something like", "in the ballpark of"],
+    "prior": ["before", "earlier", "previously", "beforehand"],
+    "subsequent": ["after", "later", "following", "next", "then"],
+    "terminate": ["end", "stop", "finish", "wrap up", "call it quits"],
+    "commence": ["start", "begin", "kick off", "get going"],
+    "therefore": ["so", "thus", "hence", "that's why", "as a result", "meaning", "which is why"],
+    "however": ["but", "though", "yet", "still", "mind you", "then again"],
+    "furthermore": ["also", "plus", "moreover", "besides", "on top of that", "and another thing"],
+    "nevertheless": ["still", "even so", "nonetheless", "but", "yet"],
+    "consequently": ["so", "as a result", "therefore", "meaning", "thus"],
+    "significant": ["important", "major", "key", "notable", "big", "substantial"],
+    "essential": ["crucial", "vital", "necessary", "key", "a must", "critical"],
+    "fundamental": ["basic", "core", "key", "essential", "at its root", "ground level"],
+    "comprehensive": ["complete", "thorough", "full", "detailed", "all-encompassing", "extensive"],
+    "numerous": ["many", "several", "various", "lots of", "tons of", "heaps of"],
+    "sufficient": ["enough", "adequate", "plenty", "ample"],
+    "adequate": ["enough", "sufficient", "okay", "acceptable"],
+    "implement": ["use", "apply", "put in place", "carry out", "execute", "make happen"],
+    "facilitate": ["help", "enable", "make easier", "allow", "permit"],
+    "maintain": ["keep", "preserve", "sustain", "hold onto", "stick with"],
+    "ensure": ["make sure", "guarantee", "secure", "check that", "verify"],
+    "establish": ["set up", "create", "form", "build", "get going"],
+    "provide": ["give", "offer", "supply", "furnish", "hand over"],
+    "identify": ["find", "spot", "recognize", "locate", "pick out"],
+    "determine": ["find", "figure out", "decide", "work out", "establish"],
+    "examine": ["look at", "check", "study", "analyze", "inspect", "size up"],
+    "analyze": ["study", "examine", "look at", "break down", "dig into", "parse"],
+    "evaluate": ["assess", "judge", "review", "size up", "gauge"],
+    "illustrate": ["show", "demonstrate", "explain", "spell out", "make clear"],
+    "require": ["need", "call for", "demand", "ask for", "want"],
+    "regarding": ["about", "concerning", "on", "as for", "with respect to"],
+    "concerning": ["about", "regarding", "on", "touching on"],
+    "various": ["different", "several", "many", "assorted", "mixed"],
+    "additionally": ["also", "plus", "besides", "on top of that", "and another thing", "further"],
+    "particularly": ["especially", "notably", "in particular", "specifically"],
+    "specifically": ["in particular", "especially", "to be exact", "precisely"],
+    "concept": ["idea", "notion", "thought", "theory", "thing"],
+    "statement": ["claim", "declaration", "assertion", "point"],
+    "provides": ["gives", "offers", "supplies", "delivers"],
+    "states": ["says", "claims", "argues", "points out"],
+    "implies": ["suggests", "hints", "points to", "signals"],
+    "data": ["info", "details", "numbers", "stuff"],
+    "information": ["details", "facts", "info", "specifics", "stuff", "intel"],
+    "process": ["procedure", "steps", "way", "method", "routine"],
+    "system": ["setup", "structure", "network", "mechanism"],
+    "creates": ["makes", "forms", "builds", "generates"],
+    "helps": ["aids", "assists", "supports", "benefits"],
+    "shows": ["displays", "presents", "reveals", "indicates"],
+    "makes": ["creates", "produces", "generates"],
+    "important": ["critical", "significant", "key", "vital"],
+    "different": ["distinct", "separate", "varied", "diverse"],
+    "results": ["outcomes", "conclusions", "findings", "upshots"],
+    "use": ["application", "usage", "employment", "leveraging"],
+    "used": ["employed", "applied", "leveraged", "put to work"],
+    "way": ["manner", "approach", "method", "technique"],
+    "task": ["job", "work", "duty", "responsibility"],
+    "tasks": ["jobs", "work", "duties", "responsibilities"],
+    "helps": ["supports", "aids", "benefits", "facilitates"],
+}
+_OPTIONS_POOL = {}
+
+def _intern_options(options):
+    """Replacement options as an interned tuple, shared by every table listing the same set."""
+    key = tuple(sys.intern(v) for v in options)
+    return _OPTIONS_POOL.setdefault(key, key)
+
+
+# Interned keys/values: lookups of common words compare by identity first
+_SYNONYM_MAP = {sys.intern(k): _intern_options(vs) for k, vs in _SYNONYM_MAP.items()}
+
+@functools.lru_cache(maxsize=2048)
+def _synonym_options(word):
+    """Replacement tuple for ``word`` (any casing), or None.
+
+    Keyed on the raw token so the handful of words that dominate academic
+    text skip the ``lower()`` allocation and the table lookup on repeats.
+    """
+    return _SYNONYM_MAP.get(word.lower())
+
 def get_synonym(word):
     """Radical vocabulary replacement for extreme AI evasion."""
-    SAFE_MAP = {
-        "utilize": ["use", "employ", "apply", "leverage", "tap into", "work with", "get the most from"],
-        "obtain": ["get", "acquire", "gain", "pick up", "snag", "grab", "land"],
-        "assistance": ["help", "support", "aid", "a hand", "backing"],
-        "assist": ["help", "support", "aid", "back up", "give a hand"],
-        "demonstrate": ["show", "illustrate", "prove", "display", "make clear", "reveal", "spell out"],
-        "indicate": ["show", "suggest", "point to", "reveal", "hint at", "signal"],
-        "methodology": ["method", "approach", "way", "technique", "process", "strategy"],
-        "objective": ["goal", "aim", "target", "purpose", "what we're after", "end game"],
-        "approximately": ["about", "around", "roughly", "nearly", "something like", "in the ballpark of"],
-        "prior": ["before", "earlier", "previously", "beforehand"],
-        "subsequent": ["after", "later", "following", "next", "then"],
-        "terminate": ["end", "stop", "finish", "wrap up", "call it quits"],
-        "commence": ["start", "begin", "kick off", "get going"],
-        "therefore": ["so", "thus", "hence", "that's why", "as a result", "meaning", "which is why"],
-        "however": ["but", "though", "yet", "still", "mind you", "then again"],
-        "furthermore": ["also", "plus", "moreover", "besides", "on top of that", "and another thing"],
-        "nevertheless": ["still", "even so", "nonetheless", "but", "yet"],
-        "consequently": ["so", "as a result", "therefore", "meaning", "thus"],
-        "significant": ["important", "major", "key", "notable", "big", "substantial"],
-        "essential": ["crucial", "vital", "necessary", "key", "a must", "critical"],
-        "fundamental": ["basic", "core", "key", "essential", "at its root", "ground level"],
-        "comprehensive": ["complete", "thorough", "full", "detailed", "all-encompassing", "extensive"],
-        "numerous": ["many", "several", "various", "lots of", "tons of", "heaps of"],
-        "sufficient": ["enough", "adequate", "plenty", "ample"],
-        "adequate": ["enough", "sufficient", "okay", "acceptable"],
-        "implement": ["use", "apply", "put in place", "carry out", "execute", "make happen"],
-        "facilitate": ["help", "enable", "make easier", "allow", "permit"],
-        "maintain": ["keep", "preserve", "sustain", "hold onto", "stick with"],
-        "ensure": ["make sure", "guarantee", "secure", "check that", "verify"],
-        "establish": ["set up", "create", "form", "build", "get going"],
-        "provide": ["give", "offer", "supply", "furnish", "hand over"],
-        "identify": ["find", "spot", "recognize", "locate", "pick out"],
-        "determine": ["find", "figure out", "decide", "work out", "establish"],
-        "examine": ["look at", "check", "study", "analyze", "inspect", "size up"],
-        "analyze": ["study", "examine", "look at", "break down", "dig into", "parse"],
-        "evaluate": ["assess", "judge", "review", "size up", "gauge"],
-        "illustrate": ["show", "demonstrate", "explain", "spell out", "make clear"],
-        "require": ["need", "call for", "demand", "ask for", "want"],
-        "regarding": ["about", "concerning", "on", "as for", "with respect to"],
-        "concerning": ["about", "regarding", "on", "touching on"],
-        "various": ["different", "several", "many", "assorted", "mixed"],
-        "additionally": ["also", "plus", "besides", "on top of that", "and another thing", "further"],
-        "particularly": ["especially", "notably", "in particular", "specifically"],
-        "specifically": ["in particular", "especially", "to be exact", "precisely"],
-        "concept": ["idea", "notion", "thought", "theory", "thing"],
-        "statement": ["claim", "declaration", "assertion", "point"],
-        "provides": ["gives", "offers", "supplies", "delivers"],
-        "states": ["says", "claims", "argues", "points out"],
-        "implies": ["suggests", "hints", "points to", "signals"],
-        "data": ["info", "details", "numbers", "stuff"],
-        "information": ["details", "facts", "info", "specifics", "stuff", "intel"],
-        "process": ["procedure", "steps", "way", "method", "routine"],
-        "system": ["setup", "structure", "network", "mechanism"],
-        "creates": ["makes", "forms", "builds", "generates"],
-        "helps": ["aids", "assists", "supports", "benefits"],
-        "shows": ["displays", "presents", "reveals", "indicates"],
-        "makes": ["creates", "produces", "generates"],
-        "important": ["critical", "significant", "key", "vital"],
-        "different": ["distinct", "separate", "varied", "diverse"],
-        "results": ["outcomes", "conclusions", "findings", "upshots"],
-        "use": ["application", "usage", "employment", "leveraging"],
-        "used": ["employed", "applied", "leveraged", "put to work"],
-        "way": ["manner", "approach", "method", "technique"],
-        "task": ["job", "work", "duty", "responsibility"],
-        "tasks": ["jobs", "work", "duties", "responsibilities"],
-        "helps": ["supports", "aids", "benefits", "facilitates"],
-    }
-    options = SAFE_MAP.get(word.lower(), [])
+    options = _synonym_options(word)
     if not options:
         return None
     if random.random() < 0.85:  # Increased from 0.75
         return random.choice(options)
     return None
 
+_SYN_STRIP_CHARS = '.,;:!?()[]{}"\''
+_NUMERIC_TOKEN_RE = re.compile(r'[\d,.₹$€£¥]+')
+
 def replace_synonyms(text, p_syn=0.50):  # QUALITY OVER QUANTITY - 50% conservative
     """Conservative lexical replacements - quality synonyms only, avoids manipulation patterns."""
     # Numbers are already protected at pipeline level, just handle words
     words = text.split()
     out = []
+    append = out.append
     
     for word in words:
-        # Skip protected placeholders, numbers, punctuation-only, or very short tokens
-        if word.startswith('__NUM') or word.startswith('[[REF') or re.match(r'[\d,.₹$€£¥]+', word) or len(word) <= 2 or not any(c.isalpha() for c in word):
-            out.append(word)
-            continue
-            
         # Strip punctuation for lookup, then restore
-        clean_word = word.strip('.,;:!?()[]{}"\'')
-        if not clean_word:
-            out.append(word)
+        clean_word = word.strip(_SYN_STRIP_CHARS)
+        # Fast reject: most tokens have no synonym entry (and draw no randomness)
+        if _synonym_options(clean_word) is None:
+            append(word)
+            continue
+        
+        # Skip protected placeholders, numbers, punctuation-only, or very short tokens
+        if word.startswith(_PLACEHOLDER_PREFIXES) or _NUMERIC_TOKEN_RE.match(word) or len(word) <= 2 or not any(c.isalpha() for c in word):
+            append(word)
             continue
             
-        prefix = word[:len(word)-len(word.lstrip('.,;:!?()[]{}"\'\''))]
+        prefix = word[:len(word)-len(word.lstrip(_SYN_STRIP_CHARS))]
         suffix = word[len(clean_word)+len(prefix):]
         
         candidate = get_synonym(clean_word)
@@ -415,9 +490,9 @@ def replace_synonyms(text, p_syn=0.50):  # QUALITY OVER QUANTITY - 50% conservat
             # Preserve capitalization
             if clean_word[:1].isupper():
                 candidate = candidate.capitalize()
-            out.append(prefix + candidate + suffix)
+            append(prefix + candidate + suffix)
         else:
-            out.append(word)
+            append(word)
     
     return " ".join(out)
 
@@ -440,9 +515,59 @@ def punctuation_variation(text: str, p_dash: float = 0.3, p_parenthetical: float
     return text
 
 
-def add_casual_fillers(text: str, p: float = 0.08) -> str:
+########################################
+# Sentence-level transform plumbing
+########################################
+class Sentences:
+    """Tokenized sentence list threaded through sentence-level transforms.
+
+    Chaining transforms on a ``Sentences`` value tokenizes once and joins once,
+    instead of a ``sent_tokenize`` / ``" ".join`` round-trip per transform.
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    @classmethod
+    def from_text(cls, text: str) -> "Sentences":
+        return cls(sent_tokenize(text))
+
+    def apply(self, fn, *args, **kwargs) -> "Sentences":
+        return fn(self, *args, **kwargs)
+
+    def join(self) -> str:
+        return " ".join(self.items)
+
+
+def _sentences_of(text: "str | Sentences") -> list:
+    if isinstance(text, Sentences):
+        return text.items
+    return sent_tokenize(text)
+
+
+def _like_input(text: "str | Sentences", result: list) -> "str | Sentences":
+    """Return ``result`` in the same shape the transform was called with."""
+    if isinstance(text, Sentences):
+        return Sentences(result)
+    return " ".join(result)
+
+
+_NUM_LIST_RE = re.compile(r'^\s*\d+[\.\)]\s+', re.MULTILINE)
+_BULLET_RE = re.compile(r'^\s*[•\-\*]\s+', re.MULTILINE)
+
+
+def _is_list_text(text: str) -> bool:
+    """True if any line of ``text`` starts with a number or bullet marker."""
+    if "\n" not in text:
+        # Single line: a MULTILINE scan can only match at position 0
+        return bool(_NUM_LIST_RE.match(text) or _BULLET_RE.match(text))
+    return bool(_NUM_LIST_RE.search(text) or _BULLET_RE.search(text))
+
+
+def add_casual_fillers(text: "str | Sentences", p: float = 0.08) -> "str | Sentences":
     """Add minimal natural transitions - only at clear sentence boundaries."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     for idx, sent in enumerate(sentences):
         stripped = sent.strip()
@@ -456,12 +581,12 @@ def add_casual_fillers(text: str, p: float = 0.08) -> str:
             result.append(f"{filler} {stripped}")
         else:
             result.append(stripped)
-    return " ".join(result)
+    return _like_input(text, result)
 
 
-def add_fragments_and_questions(text: str, p: float = 0.02) -> str:
+def add_fragments_and_questions(text: "str | Sentences", p: float = 0.02) -> "str | Sentences":
     """Very rarely add natural connective phrases - mostly skip."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     for idx, sent in enumerate(sentences):
         stripped = sent.strip()
@@ -474,17 +599,16 @@ def add_fragments_and_questions(text: str, p: float = 0.02) -> str:
             ]
             if random.random() < 0.5:  # 50% chance to skip even when triggered
                 result.append(random.choice(fragments))
-    return " ".join(result)
+    return _like_input(text, result)
 
 
 def inject_human_phrases(text, p_phrase=0.12):  # Minimal - only where truly natural
     # Skip entirely for numbered or bulleted lists - avoid "1. In plain terms," artifacts
-    if re.search(r'^\s*\d+[\.\)]\s+', text, re.MULTILINE):
-        return text
-    if re.search(r'^\s*[•\-\*]\s+', text, re.MULTILINE):
+    raw = text.join() if isinstance(text, Sentences) else text
+    if _is_list_text(raw):
         return text
     
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     # Only use academic-appropriate phrases
     academic_phrases = [
@@ -509,7 +633,7 @@ def inject_human_phrases(text, p_phrase=0.12):  # Minimal - only where truly nat
             result.append(f"{phrase} {stripped}")
         else:
             result.append(stripped)
-    return " ".join(result)
+    return _like_input(text, result)
 
 
 def light_sentence_restructure(text, p_split=0.75, p_merge=0.75):  # Increased from 0.65 - EXTREME
@@ -517,14 +641,12 @@ def light_sentence_restructure(text, p_split=0.75, p_merge=0.75):  # Increased f
     BUT: Skip this entirely for numbered/bulleted lists to avoid artifacts.
     """
     # Check if text contains numbered lists (1., 2., etc.) or bullets
-    if re.search(r'^\s*\d+[\.\)]\s+', text, re.MULTILINE):
-        # This is a numbered list - DON'T restructure to avoid "1 since", "2 and in practice" artifacts
-        return text
-    if re.search(r'^\s*[•\-\*]\s+', text, re.MULTILINE):
-        # Bulleted list - skip
+    # DON'T restructure lists to avoid "1 since", "2 and in practice" artifacts
+    raw = text.join() if isinstance(text, Sentences) else text
+    if _is_list_text(raw):
         return text
     
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     reshaped = []
 
     i = 0
@@ -555,11 +677,11 @@ def light_sentence_restructure(text, p_split=0.75, p_merge=0.75):  # Increased f
         reshaped.append(sent)
         i += 1
 
-    return " ".join(reshaped)
+    return _like_input(text, reshaped)
 
-def add_natural_imperfections(text: str, p: float = 0.15) -> str:
+def add_natural_imperfections(text: "str | Sentences", p: float = 0.15) -> "str | Sentences":
     """Add subtle natural variations - humans don't write perfectly uniform text."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     for sent in sentences:
@@ -583,12 +705,12 @@ def add_natural_imperfections(text: str, p: float = 0.15) -> str:
         
         result.append(stripped)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
 def light_word_reordering(text, p=0.10):
     """Light reordering: subtle clause reordering for variety, maintain natural flow."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     for sent in sentences:
@@ -607,12 +729,12 @@ def light_word_reordering(text, p=0.10):
         else:
             result.append(stripped)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
 def smart_filler_injection(text, p=0.15):
     """Smart filler: light, natural interjections only where they fit."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     # Only natural, subtle fillers
@@ -634,14 +756,14 @@ def smart_filler_injection(text, p=0.15):
         else:
             result.append(stripped)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
-def aggressive_voice_conversion(text: str, p: float = 0.60) -> str:
+def aggressive_voice_conversion(text: "str | Sentences", p: float = 0.60) -> "str | Sentences":
     """Aggressively convert between passive and active voice.
     This is one of the strongest evasion techniques - changes structure drastically.
     """
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     for sent in sentences:
@@ -666,12 +788,12 @@ def aggressive_voice_conversion(text: str, p: float = 0.60) -> str:
         
         result.append(sent)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
-def aggressive_clause_reordering(text: str, p: float = 0.65) -> str:
+def aggressive_clause_reordering(text: "str | Sentences", p: float = 0.65) -> "str | Sentences":
     """Aggressively reorder clauses, changing sentence structure dramatically."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     for sent in sentences:
@@ -693,12 +815,12 @@ def aggressive_clause_reordering(text: str, p: float = 0.65) -> str:
         else:
             result.append(sent)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
-def aggressive_sentence_merging(text: str, p: float = 0.55) -> str:
+def aggressive_sentence_merging(text: "str | Sentences", p: float = 0.55) -> "str | Sentences":
     """Merge short consecutive sentences to vary length distribution."""
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     i = 0
     
@@ -721,14 +843,14 @@ def aggressive_sentence_merging(text: str, p: float = 0.55) -> str:
         result.append(sent)
         i += 1
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
-def semantic_sentence_restructure(text: str, p: float = 0.50) -> str:
+def semantic_sentence_restructure(text: "str | Sentences", p: float = 0.50) -> "str | Sentences":
     """Restructure sentences semantically - change passive to active voice and vice versa.
     This breaks AI detector patterns without obvious word-level manipulation.
     """
-    sentences = sent_tokenize(text)
+    sentences = _sentences_of(text)
     result = []
     
     for sent in sentences:
@@ -745,7 +867,7 @@ def semantic_sentence_restructure(text: str, p: float = 0.50) -> str:
         
         result.append(sent)
     
-    return " ".join(result)
+    return _like_input(text, result)
 
 
 def multi_pass_transform(text: str, passes: int = 2) -> str:
@@ -756,9 +878,14 @@ def multi_pass_transform(text: str, passes: int = 2) -> str:
     
     for pass_num in range(passes):
         # Structural transformations - MINIMAL probabilities to preserve grammar for 90+ score
-        out = aggressive_voice_conversion(out, p=0.15)
-        out = aggressive_clause_reordering(out, p=0.15)
-        out = aggressive_sentence_merging(out, p=0.10)
+        # Tokenized once and joined once for all three sentence-level transforms
+        out = (
+            Sentences.from_text(out)
+            .apply(aggressive_voice_conversion, p=0.15)
+            .apply(aggressive_clause_reordering, p=0.15)
+            .apply(aggressive_sentence_merging, p=0.10)
+            .join()
+        )
         
         # Paraphrasing and synonyms - reduced
         out = phrase_level_paraphrase(out, p=0.35)
@@ -773,8 +900,6 @@ def multi_pass_transform(text: str, passes: int = 2) -> str:
         out = add_natural_imperfections(out, p=0.08)
     
     return out
-    
-    return out
 
 
 def advanced_phrase_restructure(text: str, p: float = 0.50) -> str:
@@ -800,70 +925,163 @@ def advanced_phrase_restructure(text: str, p: float = 0.50) -> str:
     return out
 
 
+# High-confidence academic→colloquial phrase rewrites
+PARAPHRASE_PHRASES = [
+    (r"has become an integral part of", ["is now a core part of", "has become central to", "is a key part of", "is now fundamental to"]),
+    (r"is essential for", ["is important for", "matters for", "is critical to", "is vital for", "is key to"]),
+    (r"on\-demand computing resources", ["computing resources on demand", "resources available on demand", "resources when you need them"]),
+    (r"enabling organizations to", ["so organizations can", "which lets organizations", "allowing organizations to", "helping organizations"]),
+    (r"the primary benefits", ["the main benefits", "the key benefits", "what you mainly get", "the chief advantages"]),
+    (r"enhancement of", ["improving", "boosting", "increase in", "bettering"]),
+    (r"thereby reducing", ["which reduces", "and that reduces", "that ends up reducing", "cutting down on"]),
+    (r"virtualization technology enables the creation of", ["virtualization lets you create", "with virtualization you can create", "virtualization helps create"]),
+    (r"cost\-effective IT infrastructure", ["cost\-efficient IT setup", "IT infrastructure that saves money", "affordable IT infrastructure"]),
+    (r"in order to", ["to", "so that", "for"]),
+    (r"due to the fact that", ["because", "since", "as"]),
+    (r"a number of", ["several", "some", "many"]),
+    (r"at the present time", ["now", "currently", "at present"]),
+    (r"in the event that", ["if", "should", "when"]),
+]
+
+def _re2_usable() -> bool:
+    """True if the installed re2 binding supports what the fused scanners need."""
+    if re2 is None:
+        return False
+    try:
+        probe = re2.compile(r"(?i)(?P<p0>a(b)?)|(?P<p1>c)")
+        return probe.groupindex["p1"] == 3 and probe.search("xC").lastindex == 3
+    except Exception:
+        return False
+
+
+_USE_RE2 = _re2_usable()
+
+
+def _fuse_patterns(patterns):
+    """Compile ``patterns`` into one case-insensitive alternation.
+
+    Uses re2 (linear time, no backtracking) when available and the pattern
+    compiles under it, otherwise the stdlib engine. Returns ``(regex, slots)``
+    where ``slots`` maps the outer group number seen as ``match.lastindex``
+    back to the pattern's position in the table.
+    """
+    source = "(?i)" + "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns))
+    fused = None
+    if _USE_RE2:
+        try:
+            fused = re2.compile(source)
+        except Exception:
+            fused = None
+    if fused is None:
+        fused = re.compile(source)
+    slots = {fused.groupindex[f"p{i}"]: i for i in range(len(fused.groupindex))}
+    return fused, slots
 
-    """Smart aggressive vocabulary: meaningful synonyms only (no garbage replacements)."""
-    # Only use GOOD synonyms that maintain meaning and sound natural
-    smart_map = {
-        'information': ['details', 'specifics', 'data', 'facts', 'insights', 'knowledge'],
-        'technology': ['systems', 'tech', 'tools', 'technology', 'solutions', 'platforms', 'methods'],
-        'provides': ['offers', 'delivers', 'gives', 'furnishes', 'supplies'],
-        'enable': ['allow', 'facilitate', 'permit', 'make possible', 'let', 'support', 'help'],
-        'resources': ['tools', 'assets', 'capabilities', 'resources', 'materials', 'means'],
-        'capability': ['ability', 'capacity', 'strength', 'capability', 'potential'],
-        'creation': ['formation', 'establishment', 'building', 'development', 'construction'],
-        'efficiently': ['effectively', 'well', 'smoothly', 'efficiently', 'properly'],
-        'important': ['key', 'vital', 'critical', 'essential', 'major', 'central', 'pivotal'],
-        'various': ['multiple', 'several', 'many', 'numerous', 'varied', 'assorted'],
-        'shows': ['reveals', 'indicates', 'suggests', 'points to', 'highlights', 'demonstrates'],
-        'includes': ['has', 'features', 'encompasses', 'involves', 'comprises', 'contains'],
-        'requires': ['calls for', 'demands', 'takes', 'needs', 'necessitates'],
-        'understand': ['grasp', 'comprehend', 'get', 'see', 'know', 'realize'],
-        'different': ['varied', 'diverse', 'distinct', 'separate', 'various'],
-    }
-    
-    words = text.split()
-    result = []
-    
-    for word in words:
-        clean = word.strip('.,;:!?()[]{}"\'')
-        if clean.lower() in smart_map and random.random() < p:
-            options = smart_map[clean.lower()]
-            replacement = random.choice(options)
-            if clean[0].isupper():
-                replacement = replacement.capitalize()
-            result.append(replacement)
-        else:
-            result.append(word)
-    
-    return " ".join(result)
+
+_PHRASES_FUSED, _PHRASE_SLOTS = _fuse_patterns(pattern for pattern, _ in PARAPHRASE_PHRASES)
+_PHRASE_OPTIONS = [_intern_options(options) for _, options in PARAPHRASE_PHRASES]
 
 
 def phrase_level_paraphrase(text: str, p: float = 0.70) -> str:  # Increased from 0.60
     """Targeted academic→colloquial phrase paraphrasing to break detector patterns.
     Applies only high-confidence phrase rewrites and keeps meaning intact.
     """
-    PHRASES = [
-        (r"has become an integral part of", ["is now a core part of", "has become central to", "is a key part of", "is now fundamental to"]),
-        (r"is essential for", ["is important for", "matters for", "is critical to", "is vital for", "is key to"]),
-        (r"on\-demand computing resources", ["computing resources on demand", "resources available on demand", "resources when you need them"]),
-        (r"enabling organizations to", ["so organizations can", "which lets organizations", "allowing organizations to", "helping organizations"]),
-        (r"the primary benefits", ["the main benefits", "the key benefits", "what you mainly get", "the chief advantages"]),
-        (r"enhancement of", ["improving", "boosting", "increase in", "bettering"]),
-        (r"thereby reducing", ["which reduces", "and that reduces", "that ends up reducing", "cutting down on"]),
-        (r"virtualization technology enables the creation of", ["virtualization lets you create", "with virtualization you can create", "virtualization helps create"]),
-        (r"cost\-effective IT infrastructure", ["cost\-efficient IT setup", "IT infrastructure that saves money", "affordable IT infrastructure"]),
-        (r"in order to", ["to", "so that", "for"]),
-        (r"due to the fact that", ["because", "since", "as"]),
-        (r"a number of", ["several", "some", "many"]),
-        (r"at the present time", ["now", "currently", "at present"]),
-        (r"in the event that", ["if", "should", "when"]),
-    ]
-    out = text
-    for pattern, options in PHRASES:
-        if random.random() < p:
-            repl = random.choice(options)
-            out = re.sub(pattern, repl, out, flags=re.IGNORECASE)
-    return out
+    # Per call: whether each rewrite is active, and the one wording it uses.
+    # Decided lazily on a rewrite's first match, so absent phrases cost no draws.
+    chosen = {}
+
+    def dispatch(m):
+        i = _PHRASE_SLOTS[m.lastindex]
+        if i not in chosen:
+            chosen[i] = random.choice(_PHRASE_OPTIONS[i]) if random.random() < p else None
+        repl = chosen[i]
+        return m.group(0) if repl is None else repl
+
+    return _PHRASES_FUSED.sub(dispatch, text)
+
+
+def _smart_replace(match_obj, replacements):
+    """Replace while preserving original capitalization style."""
+    original = match_obj.group(0)
+    replacement = random.choice(replacements)
+    
+    # If original starts with uppercase, capitalize replacement
+    if original[0].isupper():
+        replacement = replacement[0].upper() + replacement[1:] if len(replacement) > 1 else replacement.upper()
+    
+    return replacement
+
+
+# Natural rewordings for common academic/business/CS textbook phrasing
+DOMAIN_PAIRS = [
+    # General academic
+    (r"in detail", ["in depth", "thoroughly", "with depth"]),
+    (r"with suitable examples", ["with clear examples", "with fitting examples", "with relevant examples"]),
+    (r"discuss(ed)? below", ["explained below", "outlined below", "covered below"]),
+    (r"basic rules and assumptions", ["core rules and assumptions", "fundamental rules and assumptions"]),
+    (r"ensure consistency, reliability, and comparability", ["promote consistency, reliability, and comparability", "help keep things consistent, reliable, and comparable"]),
+    (r"This concept states that", ["This principle says", "This idea says", "It says"]),
+    (r"According to this concept", ["Under this idea", "By this concept", "With this principle"]),
+    (r"Money Measurement Concept", ["Money Measurement Principle"]),
+    (r"Going Concern Concept", ["Going Concern Principle"]),
+    (r"Cost Concept", ["Cost Principle"]),
+    (r"Dual Aspect Concept", ["Dual Aspect Principle", "Double-entry principle"]),
+    (r"Accounting Period Concept", ["Accounting Period Principle"]),
+    (r"Matching Concept", ["Matching Principle"]),
+    (r"Realisation Concept", ["Realization Principle"]),
+    (r"Accrual Concept", ["Accrual Principle"]),
+    (r"Consistency Concept", ["Consistency Principle"]),
+    (r"Example:\s*", ["For instance: ", "E.g.: ", "Say: "]),
+    (r"This ensures", ["This helps ensure", "This makes sure", "This helps"],),
+    (r"forms the basis of", ["underpins", "is the basis of", "is foundational to"]),
+    (r"divided into specific periods", ["split into set periods", "broken into defined periods"]),
+    (r"Expenses should be matched with the revenue they help to generate", ["Match expenses with the revenue they bring", "Expenses should line up with related revenue"]),
+    (r"Revenue should be recorded only when it is earned", ["Record revenue only once it's earned", "Record revenue when earned"]),
+    (r"Revenues and expenses must be recorded when they occur", ["Record revenues and expenses when they happen", "Record them when they occur"]),
+    (r"Conclusion", ["In summary", "To sum up", "In closing"]),
+    # Accounting process
+    (r"systematic series of steps", ["set of steps", "structured set of steps"]),
+    (r"book of original entry", ["first record book", "primary entry book"]),
+    (r"double\-entry system", ["double entry system"]),
+    (r"Trial Balance", ["trial balance"]),
+    (r"adjusting entries", ["adjustments", "adjustment entries"]),
+    (r"Profit and Loss Account", ["Profit & Loss Account", "P&L Account"]),
+    (r"Balance Sheet", ["balance sheet"]),
+    # Shares section
+    (r"Equity Shares \(Ordinary Shares\)", ["Equity shares (ordinary)"]),
+    (r"Preference Shares", ["Preference shares"]),
+    (r"dividends", ["payouts", "dividend payments"]),
+    (r"rights shares", ["rights issue shares"]),
+    # Office automation
+    (r"refers to the use of", ["means using", "is about using"]),
+    (r"in simpler terms", ["put simply", "in plain terms"]),
+    (r"key components", ["main components", "core components"]),
+    (r"increased efficiency", ["higher efficiency", "better efficiency"]),
+    (r"cost savings", ["lower costs", "saving costs"]),
+    (r"communication has also improved greatly", ["communication has improved a lot"]),
+    # Excel sorting
+    (r"Meaning of Sorting", ["What sorting means"]),
+    (r"Types of Sorting", ["Kinds of sorting"]),
+    (r"Single\-level sorting", ["Single level sorting"]),
+    (r"Multi\-level sorting", ["Multi level sorting"]),
+    (r"Importance of Sorting", ["Why sorting matters"]),
+    # Input vs output
+    (r"In summary, input and output devices", ["To sum up, input and output devices"]),
+    # System vs application software
+    (r"System Software", ["system software"]),
+    (r"Application Software", ["application software"]),
+    (r"Difference Between System and Application Software", ["System vs Application Software"]),
+    # SDLC
+    (r"Software Development Life Cycle \(SDLC\)", ["SDLC (Software Development Life Cycle)"]),
+    (r"Requirement Analysis", ["Requirements analysis"]),
+    (r"System Design", ["Design"]),
+    (r"Implementation \(Coding\)", ["Implementation (coding)"]),
+    (r"User Acceptance Testing \(UAT\)", ["user acceptance testing (UAT)"]),
+    (r"Maintenance", ["maintenance"]),
+]
+
+_DOMAIN_FUSED, _DOMAIN_SLOTS = _fuse_patterns(pattern for pattern, _ in DOMAIN_PAIRS)
+_DOMAIN_OPTIONS = [_intern_options(options) for _, options in DOMAIN_PAIRS]
 
 
 def domain_paraphrase(text: str, p: float = 0.70) -> str:
@@ -871,88 +1089,19 @@ def domain_paraphrase(text: str, p: float = 0.70) -> str:
     Applies natural rewordings across common textbook phrasing while preserving meaning.
     Uses case-insensitive matching with smart capitalization preservation.
     """
-    def smart_replace(match_obj, replacements):
-        """Replace while preserving original capitalization style."""
-        original = match_obj.group(0)
-        replacement = random.choice(replacements)
-        
-        # If original starts with uppercase, capitalize replacement
-        if original[0].isupper():
-            replacement = replacement[0].upper() + replacement[1:] if len(replacement) > 1 else replacement.upper()
-        
-        return replacement
-    
-    PAIRS = [
-        # General academic
-        (r"in detail", ["in depth", "thoroughly", "with depth"]),
-        (r"with suitable examples", ["with clear examples", "with fitting examples", "with relevant examples"]),
-        (r"discuss(ed)? below", ["explained below", "outlined below", "covered below"]),
-        (r"basic rules and assumptions", ["core rules and assumptions", "fundamental rules and assumptions"]),
-        (r"ensure consistency, reliability, and comparability", ["promote consistency, reliability, and comparability", "help keep things consistent, reliable, and comparable"]),
-        (r"This concept states that", ["This principle says", "This idea says", "It says"]),
-        (r"According to this concept", ["Under this idea", "By this concept", "With this principle"]),
-        (r"Money Measurement Concept", ["Money Measurement Principle"]),
-        (r"Going Concern Concept", ["Going Concern Principle"]),
-        (r"Cost Concept", ["Cost Principle"]),
-        (r"Dual Aspect Concept", ["Dual Aspect Principle", "Double-entry principle"]),
-        (r"Accounting Period Concept", ["Accounting Period Principle"]),
-        (r"Matching Concept", ["Matching Principle"]),
-        (r"Realisation Concept", ["Realization Principle"]),
-        (r"Accrual Concept", ["Accrual Principle"]),
-        (r"Consistency Concept", ["Consistency Principle"]),
-        (r"Example:\s*", ["For instance: ", "E.g.: ", "Say: "]),
-        (r"This ensures", ["This helps ensure", "This makes sure", "This helps"],),
-        (r"forms the basis of", ["underpins", "is the basis of", "is foundational to"]),
-        (r"divided into specific periods", ["split into set periods", "broken into defined periods"]),
-        (r"Expenses should be matched with the revenue they help to generate", ["Match expenses with the revenue they bring", "Expenses should line up with related revenue"]),
-        (r"Revenue should be recorded only when it is earned", ["Record revenue only once it's earned", "Record revenue when earned"]),
-        (r"Revenues and expenses must be recorded when they occur", ["Record revenues and expenses when they happen", "Record them when they occur"]),
-        (r"Conclusion", ["In summary", "To sum up", "In closing"]),
-        # Accounting process
-        (r"systematic series of steps", ["set of steps", "structured set of steps"]),
-        (r"book of original entry", ["first record book", "primary entry book"]),
-        (r"double\-entry system", ["double entry system"]),
-        (r"Trial Balance", ["trial balance"]),
-        (r"adjusting entries", ["adjustments", "adjustment entries"]),
-        (r"Profit and Loss Account", ["Profit & Loss Account", "P&L Account"]),
-        (r"Balance Sheet", ["balance sheet"]),
-        # Shares section
-        (r"Equity Shares \(Ordinary Shares\)", ["Equity shares (ordinary)"]),
-        (r"Preference Shares", ["Preference shares"]),
-        (r"dividends", ["payouts", "dividend payments"]),
-        (r"rights shares", ["rights issue shares"]),
-        # Office automation
-        (r"refers to the use of", ["means using", "is about using"]),
-        (r"in simpler terms", ["put simply", "in plain terms"]),
-        (r"key components", ["main components", "core components"]),
-        (r"increased efficiency", ["higher efficiency", "better efficiency"]),
-        (r"cost savings", ["lower costs", "saving costs"]),
-        (r"communication has also improved greatly", ["communication has improved a lot"]),
-        # Excel sorting
-        (r"Meaning of Sorting", ["What sorting means"]),
-        (r"Types of Sorting", ["Kinds of sorting"]),
-        (r"Single\-level sorting", ["Single level sorting"]),
-        (r"Multi\-level sorting", ["Multi level sorting"]),
-        (r"Importance of Sorting", ["Why sorting matters"]),
-        # Input vs output
-        (r"In summary, input and output devices", ["To sum up, input and output devices"]),
-        # System vs application software
-        (r"System Software", ["system software"]),
-        (r"Application Software", ["application software"]),
-        (r"Difference Between System and Application Software", ["System vs Application Software"]),
-        # SDLC
-        (r"Software Development Life Cycle \(SDLC\)", ["SDLC (Software Development Life Cycle)"]),
-        (r"Requirement Analysis", ["Requirements analysis"]),
-        (r"System Design", ["Design"]),
-        (r"Implementation \(Coding\)", ["Implementation (coding)"]),
-        (r"User Acceptance Testing \(UAT\)", ["user acceptance testing (UAT)"]),
-        (r"Maintenance", ["maintenance"]),
-    ]
-    out = text
-    for pattern, options in PAIRS:
-        if random.random() < p:
-            out = re.sub(pattern, lambda m: smart_replace(m, options), out, flags=re.IGNORECASE)
-    return out
+    # Single pass over the text; each pattern is active for this call with probability p,
+    # drawn on its first match so the many patterns absent from a text cost nothing
+    enabled = {}
+
+    def dispatch(m):
+        i = _DOMAIN_SLOTS[m.lastindex]
+        if i not in enabled:
+            enabled[i] = random.random() < p
+        if not enabled[i]:
+            return m.group(0)
+        return _smart_replace(m, _DOMAIN_OPTIONS[i])
+
+    return _DOMAIN_FUSED.sub(dispatch, text)
 
 
 def minimal_rewriting(text, p_syn=0.50, p_trans=0.0):  # ZERO DETECTION APPROACH
@@ -960,8 +1109,7 @@ def minimal_rewriting(text, p_syn=0.50, p_trans=0.0):  # ZERO DETECTION APPROACH
     Uses semantic restructuring, voice conversion, and clause reordering.
     """
     # Protect numbers and citations FIRST
-    protected_text, num_map = protect_numbers(text)
-    core, refs = extract_citations(protected_text)
+    core, protected = protect_spans(text)
 
     # Apply MULTI-PASS transformation - this is key to 0% detection
     out = multi_pass_transform(core, passes=2)
@@ -971,57 +1119,370 @@ def minimal_rewriting(text, p_syn=0.50, p_trans=0.0):  # ZERO DETECTION APPROACH
     out = add_natural_imperfections(out, p=0.20)
     out = grammar_post_process(out)
     
-    # Restore in reverse order: citations then numbers
-    out = restore_citations(out, refs)
-    out = restore_numbers(out, num_map)
+    # Restore citations and numbers
+    out = restore_spans(out, protected)
     return out
 
-    random.shuffle(transforms)
-    out = core
-    for t in transforms:
-        out = t(out)
+# Optional multi-process line rewriting for long documents (0/1 = serial).
+# Processes rather than threads: the rewrite is pure-Python regex work that holds the GIL.
+LINE_WORKERS = int(os.environ.get("HUMANIZER_LINE_WORKERS", "0"))
+LINE_PARALLEL_MIN = int(os.environ.get("HUMANIZER_LINE_PARALLEL_MIN", "32"))
+
+_line_pool = None
+# Requests run on server threads; only one of them may start the pool
+_line_pool_lock = threading.Lock()
+
+def _get_line_pool():
+    """Lazily start one shared worker pool; each worker reseeds its RNG from os.urandom."""
+    global _line_pool
+    with _line_pool_lock:
+        if _line_pool is None:
+            _line_pool = ProcessPoolExecutor(max_workers=LINE_WORKERS, initializer=random.seed)
+        return _line_pool
+
+
+def _shutdown_line_pool():
+    """Stop the worker pool, if one was started."""
+    global _line_pool
+    with _line_pool_lock:
+        if _line_pool is not None:
+            _line_pool.shutdown(cancel_futures=True)
+            _line_pool = None
+
+
+atexit.register(_shutdown_line_pool)
+
+
+def _rewrite_line(line):
+    """Rewrite one content line (callers filter out blank and header/metadata lines)."""
+    # Protect numbers and citations FIRST
+    core, protected = protect_spans(line)
+    
+    # Multi-pass transformation on this line
+    out = multi_pass_transform(core, passes=2)
+    out = reintroduce_contractions(out, p=0.30)
+    out = add_natural_imperfections(out, p=0.10)
+    # Apply grammar fixes up to 4 TIMES for maximum grammar score,
+    # stopping once a pass changes nothing (later passes would be no-ops)
+    out = grammar_post_process(out)
+    for _ in range(3):
+        fixed = grammar_post_process(out)
+        if fixed == out:
+            break
+        out = fixed
+    
+    # Restore citations and numbers
+    return restore_spans(out, protected)
 
-    # Restore in reverse order: citations then numbers
-    out = restore_citations(out, refs)
-    out = restore_numbers(out, num_map)
-    return out
 
 def preserve_linebreaks_rewrite(text, p_syn=0.50, p_trans=0.0):  # ZERO DETECTION APPROACH
     """
     Multi-pass semantic rewrite with line break preservation.
     Applies aggressive semantic transformations for near-0% detection.
+    Lines are independent, so long documents can be spread over worker processes.
     """
     lines = text.split("\n")
-    rewritten_lines = []
-    for line in lines:
-        if line.strip():
-            # Check if this is a header/metadata line
-            if is_header_or_metadata(line):
-                rewritten_lines.append(line)
-            else:
-                # Protect numbers and citations FIRST
-                protected_line, num_map = protect_numbers(line)
-                core, refs = extract_citations(protected_line)
-                
-                # Multi-pass transformation on this line
-                out = multi_pass_transform(core, passes=2)
-                out = reintroduce_contractions(out, p=0.30)
-                out = add_natural_imperfections(out, p=0.10)
-                # Apply grammar fixes 4 TIMES for maximum grammar score
-                out = grammar_post_process(out)
-                out = grammar_post_process(out)
-                out = grammar_post_process(out)
-                out = grammar_post_process(out)
-                
-                # Restore citations and numbers
-                line = restore_citations(out, refs)
-                line = restore_numbers(line, num_map)
-                rewritten_lines.append(line)
-        else:
-            rewritten_lines.append(line)
+    # Classify every line up front; blank and header/metadata lines are kept as-is
+    content_idxs = [
+        i for i, line in enumerate(lines)
+        if line.strip() and not is_header_or_metadata(line)
+    ]
+    content_lines = [lines[i] for i in content_idxs]
+
+    if LINE_WORKERS > 1 and len(content_lines) >= LINE_PARALLEL_MIN:
+        rewritten = _get_line_pool().map(_rewrite_line, content_lines, chunksize=8)
+    else:
+        rewritten = map(_rewrite_line, content_lines)
+
+    rewritten_lines = list(lines)
+    for i, line in zip(content_idxs, rewritten):
+        rewritten_lines[i] = line
     return "\n".join(rewritten_lines)
 
 
+########################################
+# Grammar post-processing rules
+########################################
+# Every pattern is compiled once at import. Each pass is a table of
+# (pattern, replacement) rules; _GRAMMAR_PIPELINE chains them in order.
+
+_QUOTE_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201C": '"',
+    "\u201D": '"',
+    "\u00A0": " ",  # NBSP to space
+})
+
+def _normalize_quotes(s: str) -> str:
+    # One translate() walk instead of five replace() passes
+    return s.translate(_QUOTE_TABLE)
+
+
+_PUNCT_SPACING_RULES = [
+    # remove spaces before punctuation (but skip protected placeholders)
+    (re.compile(r"\s+([\.,;:?!])"), r"\1"),
+    # ensure single space after punctuation if followed by word (not placeholder)
+    (re.compile(r"([\.,;:?!])(?![_\s]|$)"), r"\1 "),
+    # parentheses spacing cleanup
+    (re.compile(r"\(\s+"), "("),
+    (re.compile(r"\s+\)"), ")"),
+    # Fix hyphen spacing
+    (re.compile(r"(\w)\s+-\s+(\w)"), r"\1-\2"),
+    # Fix quotation mark spacing (both sides in one pass)
+    (re.compile(r'\s*"\s*'), '"'),
+]
+
+
+# !!, ??, ,, runs; 4+ dots; a lone double period (ellipses are kept)
+_DUP_PUNCT_RE = re.compile(r"([!?,])\1+|\.{4,}|(?<!\.)\.{2}(?!\.)")
+
+def _dedupe_punct_repl(m):
+    if m.group(1):
+        return m.group(1)
+    return "..." if len(m.group(0)) >= 4 else "."
+
+
+_ARTICLE_RE = re.compile(r"\b([Aa]n?)\s+([A-Za-z][A-Za-z\.-]*)")
+_ARTICLE_EX_A = frozenset({"university","user","european","one","unique","unit","unilateral","ubiquitous","use","usual","u.s.","eulogy","uniform","union"})
+_ARTICLE_EX_AN = frozenset({"hour","honest","honor","heir","herb","nba","fbi","mba"})
+
+def _article_repl(m):
+    art = m.group(1)
+    word = m.group(2)
+    lw = word.lower()
+    use_an = lw[:1] in "aeiou"
+    if lw in _ARTICLE_EX_A:
+        use_an = False
+    if lw in _ARTICLE_EX_AN:
+        use_an = True
+    desired = "an" if use_an else "a"
+    if art[0].isupper():
+        desired = desired.capitalize()
+    return f"{desired} {word}"
+
+
+_INDEFINITE_PRONOUNS = r"[Ee]veryone|[Ee]verybody|[Ss]omeone|[Ss]omebody|[Nn]obody|[Aa]nyone|[Aa]nybody|[Ee]ach"
+_AGREEMENT_RULES = [
+    # Extensive subject-verb agreement fixes
+    (re.compile(r"\b([Hh]e|[Ss]he|[Ii]t)\s+are\b"), r"\1 is"),
+    (re.compile(r"\b([Hh]e|[Ss]he|[Ii]t)\s+were\b"), r"\1 was"),
+    (re.compile(r"\b([Hh]e|[Ss]he|[Ii]t)\s+have\b"), r"\1 has"),
+    (re.compile(r"\b([Hh]e|[Ss]he|[Ii]t)\s+do\b"), r"\1 does"),
+    (re.compile(r"\b([Tt]his|[Tt]hat)\s+are\b"), r"\1 is"),
+    (re.compile(r"\b([Tt]his|[Tt]hat)\s+have\b"), r"\1 has"),
+    (re.compile(r"\b([Tt]hey|[Ww]e|[Yy]ou)\s+was\b"), r"\1 were"),
+    (re.compile(r"\b([Tt]hey|[Ww]e|[Yy]ou)\s+has\b"), r"\1 have"),
+    (re.compile(r"\b([Tt]hey|[Ww]e)\s+does\b"), r"\1 do"),
+    # Additional common patterns
+    (re.compile(rf"\b({_INDEFINITE_PRONOUNS})\s+are\b"), r"\1 is"),
+    (re.compile(rf"\b({_INDEFINITE_PRONOUNS})\s+have\b"), r"\1 has"),
+    (re.compile(rf"\b({_INDEFINITE_PRONOUNS})\s+do\b"), r"\1 does"),
+    # Fix "there is/are" patterns
+    (re.compile(r"\bthere\s+is\s+([a-z]+\s+)?(?:people|things|items|students|many|several)", re.IGNORECASE), "there are"),
+    (re.compile(r"\bthere\s+are\s+(?:a|an|one)\s+", re.IGNORECASE), "there is "),
+]
+
+
+_DOUBLE_NEGATIVE_FIXES = {
+    "don't": "don't need any",
+    "can't": "can't get any",
+    "ain't": "don't have any",
+}
+_COMMON_ERROR_RULES = [
+    # Its vs it's
+    (re.compile(r"\bits\s+(going|been|is|was|are|were)", re.IGNORECASE), "it's \\1"),
+    (re.compile(r"\bit's\s+(own|features|benefits|advantages|disadvantages|purpose|characteristics|properties)", re.IGNORECASE), "its \\1"),
+    # Your vs you're
+    (re.compile(r"\byour\s+(going|being|been|is|was|are|were|have|has)", re.IGNORECASE), "you're \\1"),
+    # Their vs they're vs there
+    (re.compile(r"\btheir\s+(going|being|been|is|was|are|were|have|has)", re.IGNORECASE), "they're \\1"),
+    (re.compile(r"\bthey're\s+(own|house|car|opinion|perspective|responsibility|property)", re.IGNORECASE), "their \\1"),
+    # Then vs than
+    (re.compile(r"\bthen\s+(more|less|better|worse|bigger|smaller|higher|lower|greater|fewer|stronger)", re.IGNORECASE), "than \\1"),
+    # Affect vs effect (basic cases)
+    (re.compile(r"\baffect\s+(?:is|was|are|were|has|had|can|will)", re.IGNORECASE), "effect"),
+    # Could of -> could have
+    (re.compile(r"\b(could|would|should|might|may|must)\s+of\b", re.IGNORECASE), "\\1 have"),
+    # Double negatives
+    (re.compile(r"\b(?:(don't)\s+need|(can't)\s+get|(ain't)\s+got)\s+no\b", re.IGNORECASE),
+     lambda m: _DOUBLE_NEGATIVE_FIXES[m.group(m.lastindex).lower()]),
+    # Who vs whom (basic pattern)
+    (re.compile(r"\bwhom\s+(is|was|are|were|has|have|do|does|can|will)", re.IGNORECASE), "who \\1"),
+    # Me vs I in compound subjects
+    (re.compile(r"\b(me and [A-Z]\w+|[A-Z]\w+ and me)\s+(is|are|was|were|will|can|should|have)"), lambda m: m.group(0).replace("me", "I")),
+    # Less vs fewer
+    (re.compile(r"\bless\s+(people|items|things|students|workers|children|cars|houses)", re.IGNORECASE), "fewer \\1"),
+    # Good vs well
+    (re.compile(r"\b(did|done|performed|works|functions)\s+good\b", re.IGNORECASE), "\\1 well"),
+]
+
+
+# Transformation-artifact rules only. Capitalization after a period, space
+# runs and he/she/it agreement are handled by their own passes.
+_ULTRA_RULES = [
+    # Fix missing subjects (common transformation artifact)
+    # "was changed the" -> "was changed the" stays same but catch weird patterns
+    (re.compile(r'(\w+)\s+(was|were|is|are)\s+(been|being)', re.IGNORECASE), r'\1 \2'),
+    # Fix double verbs (transformation artifact)
+    (re.compile(r'\b(is|are|was|were)\s+(is|are|was|were)\b', re.IGNORECASE), lambda m: m.group(1)),
+    # Fix dangling prepositions and incomplete phrases
+    (re.compile(r'\b(to|in|on|at|by|from|with|for|about)\s+$'), ''),
+    # Fix missing articles before nouns
+    (re.compile(r'\b(many|several|some|few)\s+([A-Z])'), r'\1 the \2'),
+    # Fix subject-verb mismatches from transformations
+    (re.compile(r'\bthey\s+(is|was|has|does|do)\b', re.IGNORECASE), lambda m: m.group(0).replace(m.group(1), {'is':'are','was':'were','has':'have','does':'do','do':'do'}.get(m.group(1), m.group(1)))),
+    # Fix incomplete or malformed comparatives
+    (re.compile(r'\b(more|less)\s+(more|less|most|least)', re.IGNORECASE), lambda m: m.group(1)),
+    # Fix tense inconsistencies
+    (re.compile(r'\b(is|are|was|were)\s+going\s+(\w+ed)\b', re.IGNORECASE), lambda m: f'{m.group(1)} {m.group(2)[:-2]}'),
+    # Remove trailing incomplete phrases
+    (re.compile(r'\s+(which|that|and|or|but)\s*$'), ''),
+    # Fix weird conjunction patterns
+    (re.compile(r'\b(and|or|but)\s+(and|or|but)\b', re.IGNORECASE), lambda m: m.group(1)),
+]
+
+
+_CAP_AFTER_PUNCT_RE = re.compile(r'([\.\?!]\s+)([a-z])')
+# Fix lowercase "i" when used as pronoun. "\bi\s+" also covers the "^i\s+" and
+# "\si\s+" forms, and the trailing/before-punctuation forms share one pass.
+_PRONOUN_I_RULES = [
+    (re.compile(r"\bi\s+"), "I "),
+    (re.compile(r"\si$|\s+i(?=[,.])"), " I"),
+]
+
+_FIRST_CHAR_RE = re.compile(r"\A.", re.DOTALL)
+
+def _cap_after_punct(m):
+    return m.group(1) + m.group(2).upper()
+
+def _upper_if_lower(m):
+    c = m.group(0)
+    return c.upper() if c.islower() else c
+
+_CAPITALIZATION_RULES = [
+    # Capitalize after period, question mark, exclamation
+    (_CAP_AFTER_PUNCT_RE, _cap_after_punct),
+    # Capitalize first letter of string if it's lowercase
+    (_FIRST_CHAR_RE, _upper_if_lower),
+    *_PRONOUN_I_RULES,
+]
+
+
+# Have/has + simple past -> past participle ("have ran" -> "have run")
+_PAST_PARTICIPLES = {
+    "ran": "run",
+    "saw": "seen",
+    "did": "done",
+    "began": "begun",
+    "went": "gone",
+    "ate": "eaten",
+    "wrote": "written",
+    "spoke": "spoken",
+}
+_VERB_FORM_RE = re.compile(
+    r"\b(have|has)\s+(" + "|".join(_PAST_PARTICIPLES) + r")\b", re.IGNORECASE
+)
+
+def _verb_form_repl(m):
+    return f"{m.group(1).lower()} {_PAST_PARTICIPLES[m.group(2).lower()]}"
+
+
+# Keyed by the lowercased first word of each phrase
+_PREPOSITION_FIXES = {
+    "different": "different from",  # Different from/than
+    "on": "by accident",            # On accident -> by accident
+    "off": "off",                   # Off of -> off
+    "where": "where",               # Where at -> where
+}
+_PREPOSITION_RE = re.compile(
+    r"\b(?:(different)\s+than|(on)\s+accident|(off)\s+of|(where)\s+at)\b", re.IGNORECASE
+)
+
+def _preposition_repl(m):
+    return _PREPOSITION_FIXES[m.group(m.lastindex).lower()]
+
+
+_COLLAPSE_SPACE_RULES = [
+    # collapse tabs and multiple spaces; preserve line breaks
+    (re.compile(r"[ \t]{2,}"), " "),
+    # trim spaces around line edges
+    (re.compile(r"[ \t]+\n"), "\n"),
+    (re.compile(r"\n[ \t]+"), "\n"),
+]
+
+
+# Remove immediate duplicate words like "stuff stuff" but preserve rare valid cases
+_DUPLICATE_WORD_RE = re.compile(r"\b([A-Za-z]{3,})\b(?:\s+\1\b)+", re.IGNORECASE)
+_DUPLICATE_WORD_EXCEPTIONS = frozenset({"had had", "that that"})
+
+def _duplicate_word_repl(m):
+    pair = f"{m.group(1).lower()} {m.group(1).lower()}"
+    if pair in _DUPLICATE_WORD_EXCEPTIONS:
+        return m.group(0)
+    return m.group(1)
+
+
+# Remove awkward mid-sentence phrase injections and manipulation artifacts
+# Fix patterns like "2 from a practical angle money" or "E. g and in practice:"
+_FILLER_CHAIN_RULES = [
+    # CRITICAL: Fix numbered list artifacts - "3 and in practice", "1 since", "4 which is why"
+    # These are obvious manipulation patterns that detectors flag immediately
+    (re.compile(r'(\d+)\s+(and in practice|since|which is why|which explains why|meaning|from a practical angle|so in real terms|and this|put together)\s+', re.IGNORECASE), r'\1. '),
+    # Remove mid-sentence phrase injections that break flow
+    (re.compile(r'\b(and this|so in real terms|put together|if you ask me|from a practical angle|which explains why|meaning|which means|and that\'s because)\s+', re.IGNORECASE), ' '),
+    # Fix broken numbering patterns: "2 from a practical angle money" → "2."
+    (re.compile(r'(\d+)\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+([A-Z])'), r'\1. \2'),
+    (re.compile(r'(\d+)\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+([A-Z])'), r'\1. \2'),
+    (re.compile(r'(\d+)\s+[a-z]{3,}\s+([a-z]{3,})\s+([A-Z])'), r'\1. \3'),  # "1 since office" → "1. Office"
+    # Fix broken examples: "E. g and in practice:" → "Example:"
+    (re.compile(r'E\.\s*g\.?\s+and\s+[a-z\s,]+:', re.IGNORECASE), 'Example:'),
+    (re.compile(r'E\.\s*g\.?\s*[a-z\s,]+:', re.IGNORECASE), 'Example:'),
+    (re.compile(r'E\.\s*g\.?\s+[a-z\s,]+', re.IGNORECASE), 'For example,'),
+    # Fix capital letter after period mid-word: ". Software" → ", software"
+    (re.compile(r'\.(\s+)([A-Z])([a-z]+,)'), r',\1\2\3'),
+    # Clean up awkward phrase remnants
+    (re.compile(r'\s+(since|meaning)\s+([A-Z])'), r'. \2'),
+    # Clean up space before commas/periods that shouldn't be there
+    (re.compile(r'\s+([,.])'), r'\1'),
+]
+
+# Every pass in order, flattened to (bound sub, replacement) pairs so each line
+# runs through one loop instead of a call per pass plus a loop per table
+_GRAMMAR_PIPELINE = tuple(
+    (pattern.sub, repl)
+    for pattern, repl in (
+        *_PUNCT_SPACING_RULES,
+        (_DUP_PUNCT_RE, _dedupe_punct_repl),
+        # articles: swap only when clearly mismatched
+        (_ARTICLE_RE, _article_repl),
+        *_AGREEMENT_RULES,
+        *_COMMON_ERROR_RULES,
+        (_VERB_FORM_RE, _verb_form_repl),
+        (_PREPOSITION_RE, _preposition_repl),
+        *_CAPITALIZATION_RULES,
+        *_ULTRA_RULES,  # aggressive artifact removal
+        *_COLLAPSE_SPACE_RULES,
+        (_DUPLICATE_WORD_RE, _duplicate_word_repl),
+        *_FILLER_CHAIN_RULES,
+    )
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _grammar_fix_line(ln: str) -> str:
+    """Run every grammar pass over one (number-protected) line.
+
+    Deterministic, so results are cached: boilerplate lines that repeat
+    within or across documents skip the whole regex chain.
+    """
+    # Smart quotes and NBSP are all non-ASCII; plain ASCII lines skip the translate
+    s = ln if ln.isascii() else _normalize_quotes(ln)
+    for sub, repl in _GRAMMAR_PIPELINE:
+        s = sub(repl, s)
+    return s
+
+
 def grammar_post_process(text: str) -> str:
     """Comprehensive grammar cleanup for 90+ grammar score.
     - Fix punctuation spacing and duplicates
@@ -1034,297 +1495,15 @@ def grammar_post_process(text: str) -> str:
     if not text:
         return text
 
-    # Protect currency/numbers from spacing fixes
-    protected_text, num_map = protect_numbers(text)
-
-    def normalize_quotes(s: str) -> str:
-        s = s.replace("\u2018", "'").replace("\u2019", "'")
-        s = s.replace("\u201C", '"').replace("\u201D", '"')
-        s = s.replace("\u00A0", " ")  # NBSP to space
-        return s
-
-    def fix_punct_spacing(s: str) -> str:
-        # remove spaces before punctuation (but skip protected placeholders)
-        s = re.sub(r"\s+([\.,;:?!])", r"\1", s)
-        # ensure single space after punctuation if followed by word (not placeholder)
-        s = re.sub(r"([\.,;:?!])(?![_\s]|$)", r"\1 ", s)
-        # parentheses spacing cleanup
-        s = re.sub(r"\(\s+", "(", s)
-        s = re.sub(r"\s+\)", ")", s)
-        # Fix hyphen spacing
-        s = re.sub(r"(\w)\s+-\s+(\w)", r"\1-\2", s)
-        # Fix quotation mark spacing
-        s = re.sub(r'"\s+', '"', s)
-        s = re.sub(r'\s+"', '"', s)
-        return s
-
-    def dedupe_punct(s: str) -> str:
-        # reduce multiple exclamations/questions/commas
-        s = re.sub(r"!{2,}", "!", s)
-        s = re.sub(r"\?{2,}", "?", s)
-        s = re.sub(r",{2,}", ",", s)
-        # dots: keep ellipses, reduce 4+ to 3
-        s = re.sub(r"\.{4,}", "...", s)
-        # rare: double period to single when not ellipsis
-        s = re.sub(r"(?<!\.)\.{2}(?!\.)", ".", s)
-        return s
-
-    def fix_articles(s: str) -> str:
-        EX_A = {"university","user","european","one","unique","unit","unilateral","ubiquitous","use","usual","u.s.","eulogy","uniform","union"}
-        EX_AN = {"hour","honest","honor","heir","herb","nba","fbi","mba"}
-        def repl(m):
-            art = m.group(1)
-            word = m.group(2)
-            lw = word.lower()
-            use_an = lw[:1] in "aeiou"
-            if lw in EX_A:
-                use_an = False
-            if lw in EX_AN:
-                use_an = True
-            desired = "an" if use_an else "a"
-            if art[0].isupper():
-                desired = desired.capitalize()
-            return f"{desired} {word}"
-        # swap only when clearly mismatched
-        s = re.sub(r"\b([Aa]n?)\s+([A-Za-z][A-Za-z\.-]*)", repl, s)
-        return s
-
-    def fix_agreement(s: str) -> str:
-        # Extensive subject-verb agreement fixes
-        s = re.sub(r"\b([Hh]e|[Ss]he|[Ii]t)\s+are\b", lambda m: f"{m.group(1)} is", s)
-        s = re.sub(r"\b([Hh]e|[Ss]he|[Ii]t)\s+were\b", lambda m: f"{m.group(1)} was", s)
-        s = re.sub(r"\b([Hh]e|[Ss]he|[Ii]t)\s+have\b", lambda m: f"{m.group(1)} has", s)
-        s = re.sub(r"\b([Hh]e|[Ss]he|[Ii]t)\s+do\b", lambda m: f"{m.group(1)} does", s)
-        s = re.sub(r"\b([Tt]his|[Tt]hat)\s+are\b", lambda m: f"{m.group(1)} is", s)
-        s = re.sub(r"\b([Tt]his|[Tt]hat)\s+have\b", lambda m: f"{m.group(1)} has", s)
-        s = re.sub(r"\b([Tt]hey|[Ww]e|[Yy]ou)\s+was\b", lambda m: f"{m.group(1)} were", s)
-        s = re.sub(r"\b([Tt]hey|[Ww]e|[Yy]ou)\s+has\b", lambda m: f"{m.group(1)} have", s)
-        s = re.sub(r"\b([Tt]hey|[Ww]e)\s+does\b", lambda m: f"{m.group(1)} do", s)
-        
-        # Additional common patterns
-        s = re.sub(r"\b([Ee]veryone|[Ee]verybody|[Ss]omeone|[Ss]omebody|[Nn]obody|[Aa]nyone|[Aa]nybody|[Ee]ach)\s+are\b", lambda m: f"{m.group(1)} is", s)
-        s = re.sub(r"\b([Ee]veryone|[Ee]verybody|[Ss]omeone|[Ss]omebody|[Nn]obody|[Aa]nyone|[Aa]nybody|[Ee]ach)\s+have\b", lambda m: f"{m.group(1)} has", s)
-        s = re.sub(r"\b([Ee]veryone|[Ee]verybody|[Ss]omeone|[Ss]omebody|[Nn]obody|[Aa]nyone|[Aa]nybody|[Ee]ach)\s+do\b", lambda m: f"{m.group(1)} does", s)
-        
-        # Fix "there is/are" patterns
-        s = re.sub(r"\bthere\s+is\s+([a-z]+\s+)?(?:people|things|items|students|many|several)", "there are", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bthere\s+are\s+(?:a|an|one)\s+", "there is ", s, flags=re.IGNORECASE)
-        
-        return s
-    
-    def fix_common_errors(s: str) -> str:
-        """Fix commonly confused words and phrases"""
-        # Its vs it's
-        s = re.sub(r"\bits\s+(going|been|is|was|are|were)", "it's \\1", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bit's\s+(own|features|benefits|advantages|disadvantages|purpose|characteristics|properties)", "its \\1", s, flags=re.IGNORECASE)
-        
-        # Your vs you're
-        s = re.sub(r"\byour\s+(going|being|been|is|was|are|were|have|has)", "you're \\1", s, flags=re.IGNORECASE)
-        
-        # Their vs they're vs there
-        s = re.sub(r"\btheir\s+(going|being|been|is|was|are|were|have|has)", "they're \\1", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bthey're\s+(own|house|car|opinion|perspective|responsibility|property)", "their \\1", s, flags=re.IGNORECASE)
-        
-        # Then vs than
-        s = re.sub(r"\bthen\s+(more|less|better|worse|bigger|smaller|higher|lower|greater|fewer|stronger)", "than \\1", s, flags=re.IGNORECASE)
-        
-        # Affect vs effect (basic cases)
-        s = re.sub(r"\baffect\s+(?:is|was|are|were|has|had|can|will)", "effect", s, flags=re.IGNORECASE)
-        
-        # Could of -> could have
-        s = re.sub(r"\b(could|would|should|might|may|must)\s+of\b", "\\1 have", s, flags=re.IGNORECASE)
-        
-        # Double negatives
-        s = re.sub(r"\bdon't\s+need\s+no\b", "don't need any", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bcan't\s+get\s+no\b", "can't get any", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bain't\s+got\s+no\b", "don't have any", s, flags=re.IGNORECASE)
-        
-        # Who vs whom (basic pattern)
-        s = re.sub(r"\bwhom\s+(is|was|are|were|has|have|do|does|can|will)", "who \\1", s, flags=re.IGNORECASE)
-        
-        # Me vs I in compound subjects
-        s = re.sub(r"\b(me and [A-Z]\w+|[A-Z]\w+ and me)\s+(is|are|was|were|will|can|should|have)", lambda m: m.group(0).replace("me", "I"), s)
-        
-        # Less vs fewer
-        s = re.sub(r"\bless\s+(people|items|things|students|workers|children|cars|houses)", "fewer \\1", s, flags=re.IGNORECASE)
-        
-        # Good vs well
-        s = re.sub(r"\b(did|done|performed|works|functions)\s+good\b", "\\1 well", s, flags=re.IGNORECASE)
-        
-        return s
-    
-    def ultra_aggressive_grammar_fix(s: str) -> str:
-        """Ultra-aggressive grammar fixes for transformation artifacts"""
-        if not s:
-            return s
-        
-        # Fix common transformation artifacts
-        # Fix broken sentence fragments with lowercase after period
-        s = re.sub(r'\.(\s+)([a-z])', lambda m: f'.{m.group(1)}{m.group(2).upper()}', s)
-        
-        # Fix missing subjects (common transformation artifact)
-        # "was changed the" -> "was changed the" stays same but catch weird patterns
-        s = re.sub(r'(\w+)\s+(was|were|is|are)\s+(been|being)', r'\1 \2', s, flags=re.IGNORECASE)
-        
-        # Fix double verbs (transformation artifact)
-        s = re.sub(r'\b(is|are|was|were)\s+(is|are|was|were)\b', lambda m: m.group(1), s, flags=re.IGNORECASE)
-        
-        # Fix dangling prepositions and incomplete phrases
-        s = re.sub(r'\b(to|in|on|at|by|from|with|for|about)\s+$', '', s)
-        
-        # Fix multiple spaces
-        s = re.sub(r'  +', ' ', s)
-        
-        # Fix missing articles before nouns
-        s = re.sub(r'\b(many|several|some|few)\s+([A-Z])', r'\1 the \2', s)
-        
-        # Fix subject-verb mismatches from transformations
-        s = re.sub(r'\bthey\s+(is|was|has|does|do)\b', lambda m: m.group(0).replace(m.group(1), {'is':'are','was':'were','has':'have','does':'do','do':'do'}.get(m.group(1), m.group(1))), s, flags=re.IGNORECASE)
-        s = re.sub(r'\b(he|she|it)\s+(are|were|have|do|does|do)\b', lambda m: m.group(0).replace(m.group(1), {'are':'is','were':'was','have':'has','do':'does','does':'does','do':'does'}.get(m.group(2), m.group(2))), s, flags=re.IGNORECASE)
-        
-        # Fix incomplete or malformed comparatives
-        s = re.sub(r'\b(more|less)\s+(more|less|most|least)', lambda m: m.group(1), s, flags=re.IGNORECASE)
-        
-        # Fix tense inconsistencies
-        s = re.sub(r'\b(is|are|was|were)\s+going\s+(\w+ed)\b', lambda m: f'{m.group(1)} {m.group(2)[:-2]}', s, flags=re.IGNORECASE)
-        
-        # Remove trailing incomplete phrases
-        s = re.sub(r'\s+(which|that|and|or|but)\s*$', '', s)
-        
-        # Fix weird conjunction patterns
-        s = re.sub(r'\b(and|or|but)\s+(and|or|but)\b', lambda m: m.group(1), s, flags=re.IGNORECASE)
-        
-        return s
-    
-    def fix_capitalization(s: str) -> str:
-        """Fix sentence capitalization"""
-        # Capitalize after period, question mark, exclamation
-        def cap_after_punct(m):
-            return m.group(1) + m.group(2).upper() + m.group(3)
-        
-        s = re.sub(r'([\.\?!]\s+)([a-z])(\w*)', cap_after_punct, s)
-        
-        # Capitalize first letter of string if it's lowercase
-        if s and s[0].islower():
-            s = s[0].upper() + s[1:]
-        
-        # Fix lowercase "i" when used as pronoun (more comprehensive)
-        s = re.sub(r"\bi\s+", "I ", s)
-        s = re.sub(r"\si\s+", " I ", s)
-        s = re.sub(r"\si$", " I", s)
-        s = re.sub(r"^i\s+", "I ", s)
-        s = re.sub(r"\s+i,", " I,", s)
-        s = re.sub(r"\s+i\.", " I.", s)
-        
-        return s
-    
-    def fix_verb_forms(s: str) -> str:
-        """Fix common verb form errors"""
-        # Have/has + past participle corrections
-        s = re.sub(r"\bhave\s+ran\b", "have run", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+ran\b", "has run", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+saw\b", "have seen", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+saw\b", "has seen", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+did\b", "have done", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+did\b", "has done", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+began\b", "have begun", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+began\b", "has begun", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+went\b", "have gone", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+went\b", "has gone", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+ate\b", "have eaten", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+ate\b", "has eaten", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+wrote\b", "have written", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+wrote\b", "has written", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhave\s+spoke\b", "have spoken", s, flags=re.IGNORECASE)
-        s = re.sub(r"\bhas\s+spoke\b", "has spoken", s, flags=re.IGNORECASE)
-        
-        return s
-    
-    def fix_prepositions(s: str) -> str:
-        """Fix common preposition errors"""
-        # Different from/than
-        s = re.sub(r"\bdifferent\s+than\b", "different from", s, flags=re.IGNORECASE)
-        
-        # On accident -> by accident
-        s = re.sub(r"\bon\s+accident\b", "by accident", s, flags=re.IGNORECASE)
-        
-        # Off of -> off
-        s = re.sub(r"\boff\s+of\b", "off", s, flags=re.IGNORECASE)
-        
-        # Where at -> where
-        s = re.sub(r"\bwhere\s+at\b", "where", s, flags=re.IGNORECASE)
-        
-        return s
-
-    def collapse_spaces(s: str) -> str:
-        # collapse tabs and multiple spaces; preserve line breaks
-        s = re.sub(r"[ \t]{2,}", " ", s)
-        # trim spaces around line edges
-        s = re.sub(r"[ \t]+\n", "\n", s)
-        s = re.sub(r"\n[ \t]+", "\n", s)
-        return s
-
-    def reduce_adjacent_duplicate_words(s: str) -> str:
-        # Remove immediate duplicate words like "stuff stuff" but preserve rare valid cases
-        exceptions = {"had had", "that that"}
-        def repl(m):
-            pair = f"{m.group(1).lower()} {m.group(1).lower()}"
-            if pair in exceptions:
-                return m.group(0)
-            return m.group(1)
-        return re.sub(r"\b([A-Za-z]{3,})\b(?:\s+\1\b)+", repl, s, flags=re.IGNORECASE)
-
-    def reduce_leading_filler_chains(s: str) -> str:
-        # Remove awkward mid-sentence phrase injections and manipulation artifacts
-        # Fix patterns like "2 from a practical angle money" or "E. g and in practice:"
-        
-        # CRITICAL: Fix numbered list artifacts - "3 and in practice", "1 since", "4 which is why"
-        # These are obvious manipulation patterns that detectors flag immediately
-        s = re.sub(r'(\d+)\s+(and in practice|since|which is why|which explains why|meaning|from a practical angle|so in real terms|and this|put together)\s+', r'\1. ', s, flags=re.IGNORECASE)
-        
-        # Remove mid-sentence phrase injections that break flow
-        s = re.sub(r'\b(and this|so in real terms|put together|if you ask me|from a practical angle|which explains why|meaning|which means|and that\'s because)\s+', ' ', s, flags=re.IGNORECASE)
-        
-        # Fix broken numbering patterns: "2 from a practical angle money" → "2."
-        s = re.sub(r'(\d+)\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+([A-Z])', r'\1. \2', s)
-        s = re.sub(r'(\d+)\s+[a-z]+\s+[a-z]+\s+[a-z]+\s+([A-Z])', r'\1. \2', s)
-        s = re.sub(r'(\d+)\s+[a-z]{3,}\s+([a-z]{3,})\s+([A-Z])', r'\1. \3', s)  # "1 since office" → "1. Office"
-        
-        # Fix broken examples: "E. g and in practice:" → "Example:"
-        s = re.sub(r'E\.\s*g\.?\s+and\s+[a-z\s,]+:', 'Example:', s, flags=re.IGNORECASE)
-        s = re.sub(r'E\.\s*g\.?\s*[a-z\s,]+:', 'Example:', s, flags=re.IGNORECASE)
-        s = re.sub(r'E\.\s*g\.?\s+[a-z\s,]+', 'For example,', s, flags=re.IGNORECASE)
-        
-        # Fix capital letter after period mid-word: ". Software" → ", software"
-        s = re.sub(r'\.(\s+)([A-Z])([a-z]+,)', r',\1\2\3', s)
-        
-        # Clean up awkward phrase remnants
-        s = re.sub(r'\s+(since|meaning)\s+([A-Z])', r'. \2', s)
-        
-        # Clean up space before commas/periods that shouldn't be there
-        s = re.sub(r'\s+([,.])', r'\1', s)
-        
-        return s
+    # Protect currency/numbers from spacing fixes. "$" is the only ASCII
+    # currency symbol, so pure-ASCII text without one has nothing to protect.
+    if text.isascii() and "$" not in text:
+        protected_text, num_map = text, None
+    else:
+        protected_text, num_map = protect_numbers(text)
 
     # Process per line to preserve line breaks and human quirks
-    lines = protected_text.split("\n")
-    out_lines = []
-    for ln in lines:
-        s = normalize_quotes(ln)
-        s = fix_punct_spacing(s)
-        s = dedupe_punct(s)
-        s = fix_articles(s)
-        s = fix_agreement(s)
-        s = fix_common_errors(s)
-        s = fix_verb_forms(s)
-        s = fix_prepositions(s)
-        s = fix_capitalization(s)
-        s = ultra_aggressive_grammar_fix(s)  # NEW: aggressive artifact removal
-        s = collapse_spaces(s)
-        s = reduce_adjacent_duplicate_words(s)
-        s = reduce_leading_filler_chains(s)
-        out_lines.append(s)
-
-    result = "\n".join(out_lines)
+    # join() consumes the map directly; no intermediate per-line list
+    result = "\n".join(map(_grammar_fix_line, protected_text.split("\n")))
     # Restore numbers at the end
-    return restore_numbers(result, num_map)
+    return restore_numbers(result, num_map) if num_map else result
@@ -5,10 +5,14 @@ Simple FastAPI wrapper to expose spell and grammar checking functionality
 for plain text via HTTP endpoints.
 """
 
+import os
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
+import anyio.to_thread
 import uvicorn
+from starlette.concurrency import run_in_threadpool
 from spell_grammar_checker import process_text_node
 
 # Initialize FastAPI app
@@ -16,6 +20,7 @@ app = FastAPI(
     title="Spell & Grammar Checker API",
     version="0.1",
     description="Check and fix spelling and grammar errors in plain text",
+    default_response_class=ORJSONResponse,
 )
 
 class CheckRequest(BaseModel):
@@ -35,13 +40,24 @@ class CheckResponse(BaseModel):
             }
         }
 
+@app.on_event("startup")
+async def configure_threadpool():
+    """Size the worker threadpool that runs blocking checks.
+
+    LanguageTool checks block on its local server, so concurrent requests
+    only overlap if there are enough threads (GRAMMAR_THREADPOOL_SIZE).
+    """
+    default_size = max(32, (os.cpu_count() or 1) * 4)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.environ.get("GRAMMAR_THREADPOOL_SIZE", default_size))
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
 @app.post("/check", response_model=CheckResponse)
-def check_text(req: CheckRequest):
+async def check_text(req: CheckRequest):
     """Check and fix spelling and grammar in text.
     
     Args:
@@ -57,17 +73,20 @@ def check_text(req: CheckRequest):
         if not req.text or not req.text.strip():
             raise HTTPException(status_code=400, detail="Text must not be empty")
         
-        # Process the text
-        corrected = process_text_node(
+        # Process the text off the event loop (spell + LanguageTool calls block)
+        corrected = await run_in_threadpool(
+            process_text_node,
             req.text,
             fix_spell=req.fix_spelling,
             fix_gram=req.fix_grammar
         )
         
-        return {
+        # Returned as a Response so FastAPI skips re-validating the two text
+        # fields through CheckResponse; the model still documents the schema
+        return ORJSONResponse({
             "original_text": req.text,
             "corrected_text": corrected,
-        }
+        })
     except Exception as e:
         print(f"[ERROR] Exception in /check endpoint:")
         print(f"[ERROR] Input text: {repr(req.text)}")
@@ -77,8 +96,13 @@ def check_text(req: CheckRequest):
 
 if __name__ == "__main__":
     # Run with: python api.py
-    # Or: GRAMMAR_PORT=8001 python api.py
-    import os
+    # Or: GRAMMAR_PORT=8001 GRAMMAR_WORKERS=4 python api.py
+    # Each worker process starts its own LanguageTool server, so raise
+    # GRAMMAR_WORKERS only where there is memory for one JVM per worker.
     host = os.environ.get("GRAMMAR_HOST", "0.0.0.0")
     port = int(os.environ.get("GRAMMAR_PORT", "8001"))
-    uvicorn.run(app, host=host, port=port)
+    workers = int(os.environ.get("GRAMMAR_WORKERS", "1"))
+    if workers > 1:
+        uvicorn.run("api:app", host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
@@ -14,45 +14,182 @@ Key principles:
 """
 
 import os
-import io
+import contextlib
+import functools
+import json
+import http.client
 import zipfile
 import re
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Set, List, Tuple
 from lxml import etree
 from spellchecker import SpellChecker
 import language_tool_python
+import requests
+from requests.adapters import HTTPAdapter
+from language_tool_python.utils import LanguageToolError
+
+# shared/ lives at the repository root, and at /app/shared in the service images
+for _root in Path(__file__).resolve().parents:
+    if (_root / "shared" / "zip_raw.py").is_file():
+        if str(_root) not in sys.path:
+            sys.path.append(str(_root))
+        break
+from shared.zip_raw import copy_entry
 
 NSMAP = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+_T_TAG = f"{{{NSMAP['w']}}}t"
+_P_TAG = f"{{{NSMAP['w']}}}p"
+_TBL_TAG = f"{{{NSMAP['w']}}}tbl"
+
+# Leading whitespace, core text, trailing whitespace
+_WS_SPLIT_RE = re.compile(r'(\s*)(.*?)(\s*)$', flags=re.DOTALL)
+# One token per match, already split for spell-checking: either
+# prefix/word/suffix (punctuation around a single word) or any other
+# whitespace-free token, then the whitespace after it
+_TOKEN_RE = re.compile(r'(?:([^\w\s]*)(\w+)([^\w\s]*)(?!\S)|(\S+))(\s*)')
+
+# Characters outside the BMP, which are two UTF-16 code units in LanguageTool offsets
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+# Spacing cleanup after grammar fixes, in one scan: drop whitespace before
+# closing punctuation or after an opening bracket, collapse other runs
+_CLEANUP_RE = re.compile(r"\s+(?=[.,;:!?)\]])|(?<=[([{}])\s+|(\s{2,})")
 
 # Initialize spell checker (English)
 spell = SpellChecker()
+# Lowercase dictionary words as a plain set: the common "correctly spelled"
+# check is one hash lookup instead of SpellChecker.__contains__ dispatch
+_KNOWN_WORDS = frozenset(spell.word_frequency.dictionary)
 
 # Initialize grammar checker (will be lazy-loaded)
 _grammar_tool = None
 
+
+class _PooledLanguageTool(language_tool_python.LanguageTool):
+    """LanguageTool client that keeps HTTP connections to the server alive.
+
+    The stock client opens a new connection for every check(); this one
+    sends all requests through one pooled requests.Session. ``level`` is a
+    per-request option in the LanguageTool HTTP API, so it is sent with each
+    check rather than written into the server config.
+    """
+
+    def __init__(self, *args, pool_size: int = 16, level: str = "default", **kwargs):
+        self._level = level
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Checks run on worker threads; a server failure they all see is
+        # answered with one restart. Bumped after every restart.
+        self._restart_lock = threading.Lock()
+        self._server_generation = 0
+        super().__init__(*args, **kwargs)
+
+    def _query_server(self, url, params=None, num_tries=2):
+        # Same retry/restart behaviour as LanguageTool._query_server, but
+        # checks are sent as a form POST: in a GET the whole text goes into
+        # the query string, which servers and proxies cap
+        for n in range(num_tries):
+            generation = self._server_generation
+            try:
+                if params is None:
+                    request = self._session.get(url, timeout=self._TIMEOUT)
+                else:
+                    request = self._session.post(url, data=params, timeout=self._TIMEOUT)
+                with request as response:
+                    try:
+                        return response.json()
+                    except json.decoder.JSONDecodeError:
+                        raise LanguageToolError(response.content.decode())
+            except (IOError, http.client.HTTPException) as e:
+                if self._remote is False:
+                    self._restart_local_server(generation)
+                if n + 1 >= num_tries:
+                    raise LanguageToolError('{}: {}'.format(self._url, e))
+
+    def _restart_local_server(self, generation: int) -> None:
+        """Restart the local server unless it was restarted since generation"""
+        with self._restart_lock:
+            if generation != self._server_generation:
+                return
+            self._terminate_server()
+            self._start_local_server()
+            self._server_generation += 1
+
+    def _create_params(self, text):
+        params = super()._create_params(text)
+        if self._level != "default":
+            params['level'] = self._level
+        return params
+
+
+# Hashes of texts LanguageTool recently found nothing in, so repeats (within a
+# document or across documents) skip the roundtrip. Bounded, oldest evicted first.
+_CLEAN_CACHE_SIZE = int(os.environ.get("SPELL_GRAMMAR_CLEAN_CACHE", "100000"))
+_clean_hashes: Set[int] = set()
+_clean_order: deque = deque()
+_clean_lock = threading.Lock()
+
+
+def _is_known_clean(text: str) -> bool:
+    return hash(text) in _clean_hashes
+
+
+def _mark_clean(text: str) -> None:
+    h = hash(text)
+    with _clean_lock:
+        if h in _clean_hashes:
+            return
+        _clean_hashes.add(h)
+        _clean_order.append(h)
+        if len(_clean_order) > _CLEAN_CACHE_SIZE:
+            _clean_hashes.discard(_clean_order.popleft())
+
+
 def get_grammar_tool():
     """Lazy load grammar tool (it's slow to initialize).
 
     Allows tuning via env:
-    - SPELL_GRAMMAR_LEVEL=picky  -> enable stricter LanguageTool rules
+    - SPELL_GRAMMAR_LEVEL=picky  -> enable stricter LanguageTool rules (default: "default")
+    - SPELL_GRAMMAR_MAX_SUGG     -> suggestions computed per spelling match (default: 3)
     - SPELL_GRAMMAR_MAX_THREADS  -> override default thread count
     - SPELL_GRAMMAR_CACHE        -> override cache size
+    - SPELL_GRAMMAR_LT_URL       -> use an already running LanguageTool server
+                                    instead of starting a local JVM (server-side
+                                    config then applies)
+    - SPELL_GRAMMAR_BATCH_CHARS  -> max size of one batched check (default: 20000,
+                                    keep within the server's maxTextLength)
     """
     global _grammar_tool
     if _grammar_tool is None:
-        level = os.environ.get("SPELL_GRAMMAR_LEVEL", "picky")  # Use picky for 90%+ grammar quality
+        # Picky rules roughly double the rules evaluated per check, and only the
+        # top suggestion is ever applied, so both stay opt-in
+        level = os.environ.get("SPELL_GRAMMAR_LEVEL", "default")
+        max_suggestions = int(os.environ.get("SPELL_GRAMMAR_MAX_SUGG", "3"))
         max_threads = int(os.environ.get("SPELL_GRAMMAR_MAX_THREADS", "8"))
         cache_size = int(os.environ.get("SPELL_GRAMMAR_CACHE", "2000"))
 
         config = {
             "cacheSize": cache_size,
             "maxCheckThreads": max_threads,
-            "level": "picky",  # Enable picky mode for thorough checking
-            "maxSpellingSuggestions": 20,  # Allow more alternatives to reach higher grammar score
+            "maxSpellingSuggestions": max_suggestions,
         }
 
-        # Initialize with all rules enabled for maximum accuracy
-        _grammar_tool = language_tool_python.LanguageTool('en-US', config=config)
+        remote_url = os.environ.get("SPELL_GRAMMAR_LT_URL")
+        # Pool at least one connection per concurrent checker thread
+        pool_size = max(16, max_threads)
+        if remote_url:
+            _grammar_tool = _PooledLanguageTool('en-US', remote_server=remote_url, pool_size=pool_size, level=level)
+        else:
+            # Initialize with all rules enabled for maximum accuracy
+            _grammar_tool = _PooledLanguageTool('en-US', config=config, pool_size=pool_size, level=level)
         # Standard mode avoids over-polishing that triggers AI detectors
     return _grammar_tool
 
@@ -69,7 +206,7 @@ def fix_spelling(text: str) -> str:
         return text
     
     # Preserve leading/trailing whitespace
-    match = re.match(r'(\s*)(.*?)(\s*)$', text, flags=re.DOTALL)
+    match = _WS_SPLIT_RE.match(text)
     if not match:
         return text
     
@@ -77,58 +214,131 @@ def fix_spelling(text: str) -> str:
     if not core:
         return text
     
-    # Split into words while preserving structure
-    words = core.split()
-    fixed_words = []
+    return f"{leading_ws}{_fix_spelling_core(core)}{trailing_ws}"
+
+
+@functools.lru_cache(maxsize=200_000)
+def _fix_spelling_core(core: str) -> str:
+    """Spell-fix whitespace-stripped text.
+
+    Pure function of its input, so repeated text nodes (headings,
+    boilerplate, identical runs) are only corrected once.
+    """
+    # One scan tokenizes and splits every word; the original spacing between
+    # words is kept as-is
+    tokens = _TOKEN_RE.findall(core)
+    checked = [t for t in tokens if _is_checkable(*t[:3])]
+
+    # Unknown words in one set difference; only those get a correction lookup,
+    # once per distinct word
+    lowered = {t[1].lower() for t in checked}
+    corrections = {w: _correction(w) for w in lowered - _KNOWN_WORDS}
+    if not corrections:
+        return core
+
+    out = []
+    for prefix, core_word, suffix, other, ws in tokens:
+        if other:
+            out.append(other)
+        elif _is_checkable(prefix, core_word, suffix):
+            out.append(_apply_correction(prefix, core_word, suffix,
+                                         corrections.get(core_word.lower())))
+        else:
+            out.append(f"{prefix}{core_word}{suffix}")
+        out.append(ws)
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=50_000)
+def _correction(word: str):
+    """spell.correction() memoized; the edit-distance search is the costliest step.
+
+    Misspellings recur across a document, and so do words with no good
+    correction (None or the word itself), which are cached as well.
+    """
+    return spell.correction(word)
+
+
+def _is_checkable(prefix: str, core_word: str, suffix: str) -> bool:
+    """Whether a split token is worth spell-checking."""
+    # Not a single word with punctuation around it
+    if not core_word:
+        return False
+    # Skip short words (likely acronyms or OK)
+    if len(core_word) <= 2:
+        return False
+    # Skip if it's a number, URL or email
+    if not prefix and not suffix and core_word.isdecimal():
+        return False
+    if '@' in prefix or '@' in suffix or '://' in prefix or '://' in suffix:
+        return False
+    return True
+
+
+def _apply_correction(prefix: str, core_word: str, suffix: str, correction) -> str:
+    """Swap in a correction, keeping the original capitalization."""
+    if not correction or correction == core_word.lower():
+        # Correctly spelled, or no good correction found: keep original
+        return f"{prefix}{core_word}{suffix}"
     
-    for word in words:
-        # Skip if it's a number, URL, email, or has special chars
-        if re.match(r'^\d+$', word) or '@' in word or '://' in word:
-            fixed_words.append(word)
-            continue
-        
-        # Extract the core word (remove punctuation)
-        word_match = re.match(r'^([^\w]*)(\w+)([^\w]*)$', word)
-        if not word_match:
-            fixed_words.append(word)
+    # Apply same capitalization as original
+    if core_word.isupper():
+        corrected = correction.upper()
+    elif core_word[0].isupper():
+        corrected = correction.capitalize()
+    else:
+        corrected = correction
+    
+    return f"{prefix}{corrected}{suffix}"
+
+
+def _match_spans(text: str, matches) -> List[Tuple[int, int, list]]:
+    """
+    (start, end, replacements) of each LanguageTool match, as indices into text.
+
+    LanguageTool reports offsets in UTF-16 code units (Java string indices), so
+    every character outside the BMP (emoji, the math italic 𝑥/𝑦 PDF conversion
+    produces) shifts the offsets after it by one.
+    """
+    # UTF-16 offset just past each astral character (two code units each)
+    astral_ends = [m.start() + i + 2 for i, m in enumerate(_ASTRAL_RE.finditer(text))]
+    if not astral_ends:
+        return [(m.offset, m.offset + m.errorLength, m.replacements) for m in matches]
+
+    def index(offset: int) -> int:
+        return offset - bisect_right(astral_ends, offset)
+
+    return [(index(m.offset), index(m.offset + m.errorLength), m.replacements) for m in matches]
+
+
+def _utf16_len(text: str) -> int:
+    """Length of text as LanguageTool counts it (maxTextLength is in UTF-16 code units)"""
+    return len(text) + len(_ASTRAL_RE.findall(text))
+
+
+def _apply_corrections(text: str, corrections, skip_empty: bool = False) -> str:
+    """
+    Apply the top suggestion of each (start, end, replacements) correction.
+
+    Builds the result in one left-to-right walk instead of re-slicing the
+    whole string per correction. Corrections overlapping an earlier applied
+    one are dropped; with skip_empty, zero-width ones are ignored too.
+    """
+    out = []
+    cur = 0
+    for start, end, replacements in sorted(corrections, key=lambda c: c[0]):
+        if not replacements or start < cur:
             continue
-        
-        prefix, core_word, suffix = word_match.groups()
-        
-        # Check spelling (case-insensitive)
-        lower_word = core_word.lower()
-        
-        # Skip short words (likely acronyms or OK)
-        if len(core_word) <= 2:
-            fixed_words.append(word)
+        if skip_empty and not text[start:end]:
             continue
-        
-        # Check if misspelled
-        if lower_word in spell:
-            # Correctly spelled
-            fixed_words.append(word)
-        else:
-            # Get correction
-            correction = spell.correction(lower_word)
-            if correction and correction != lower_word:
-                # Apply same capitalization as original
-                if core_word.isupper():
-                    corrected = correction.upper()
-                elif core_word[0].isupper():
-                    corrected = correction.capitalize()
-                else:
-                    corrected = correction
-                
-                fixed_words.append(f"{prefix}{corrected}{suffix}")
-            else:
-                # No good correction found, keep original
-                fixed_words.append(word)
-    
-    fixed_text = ' '.join(fixed_words)
-    return f"{leading_ws}{fixed_text}{trailing_ws}"
+        out.append(text[cur:start])
+        out.append(replacements[0])
+        cur = max(end, start)
+    out.append(text[cur:])
+    return "".join(out)
 
 
-def fix_grammar(text: str, passes: int = 7) -> str:
+def fix_grammar(text: str, passes: int = 7, tool=None) -> str:
     """
     Fix grammar errors using LanguageTool with multiple passes.
     MAXIMUM POWER mode: Apply ALL corrections for perfect grammar/fluency.
@@ -136,12 +346,13 @@ def fix_grammar(text: str, passes: int = 7) -> str:
     Args:
         text: Text to fix
         passes: Number of correction passes (default: 5 for maximum quality)
+        tool: LanguageTool instance (default: the shared one)
     """
     if not text or not text.strip() or len(text.strip()) < 3:
         return text
     
     # Preserve whitespace
-    match = re.match(r'(\s*)(.*?)(\s*)$', text, flags=re.DOTALL)
+    match = _WS_SPLIT_RE.match(text)
     if not match:
         return text
     
@@ -150,44 +361,212 @@ def fix_grammar(text: str, passes: int = 7) -> str:
         return text
     
     try:
-        tool = get_grammar_tool()
-        corrected = core
+        if tool is None:
+            tool = get_grammar_tool()
+        return f"{leading_ws}{_fix_grammar_core(core, passes, tool)}{trailing_ws}"
+    except Exception as e:
+        # If grammar check fails, return original
+        print(f"Grammar check failed: {e}")
+        return text
+
+
+@functools.lru_cache(maxsize=100_000)
+def _fix_grammar_core(core: str, passes: int, tool) -> str:
+    """Grammar-fix whitespace-stripped text; cached per (core, passes).
+
+    Failures raise, so they are never cached.
+    """
+    corrected = core
+    
+    # Run multiple passes for maximum quality (catches cascading issues)
+    for pass_num in range(passes):
+        if _is_known_clean(corrected):
+            break
+        matches = tool.check(corrected)
         
-        # Run multiple passes for maximum quality (catches cascading issues)
-        for pass_num in range(passes):
-            matches = tool.check(corrected)
-            
-            if not matches:
-                # No more errors found, stop early
-                break
-            
-            # Apply corrections in reverse order to maintain offsets
-            for match in reversed(matches):
-                if not match.replacements:
-                    continue
+        if not matches:
+            # No more errors found, stop early
+            _mark_clean(corrected)
+            break
+        
+        # 🔥🔥 MAXIMUM POWER: Apply ALL corrections (no length restriction)
+        corrected = _apply_corrections(corrected, _match_spans(corrected, matches), skip_empty=True)
 
-                replacement = match.replacements[0]
+    return _cleanup_spacing(corrected)
 
-                # 🔥🔥 MAXIMUM POWER: NO LIMITS on changes for perfect grammar/fluency
-                start, end = match.offset, match.offset + match.errorLength
-                original_fragment = corrected[start:end]
-                if not original_fragment:
-                    continue
 
-                # 🔥🔥 Apply ALL corrections (removed length restriction)
-                corrected = corrected[:start] + replacement + corrected[end:]
+def _cleanup_repl(m):
+    return " " if m.group(1) else ""
+
+def _cleanup_spacing(text: str) -> str:
+    """Light cleanup: collapse multiple spaces introduced by fixes."""
+    return _CLEANUP_RE.sub(_cleanup_repl, text)
+
+
+# Separator between text nodes in a batched check. A blank line is a paragraph
+# break for LanguageTool, so sentence-level rules do not match across two nodes;
+# its few text-level rules (e.g. repeated words or sentence starts across
+# paragraphs) do see the neighbouring nodes, which the per-node check never did.
+_BATCH_SEPARATOR = "\n\n"
+# Upper bound on one batched check, in UTF-16 code units like LanguageTool's
+# maxTextLength (20000 on the public server); a longer node is sent on its own
+_BATCH_MAX_CHARS = int(os.environ.get("SPELL_GRAMMAR_BATCH_CHARS", "20000"))
+
+
+def _batches(keys: List[str], texts: Dict[str, str]) -> List[List[str]]:
+    """Split keys into runs whose joined texts stay within _BATCH_MAX_CHARS"""
+    batches = []
+    batch: List[str] = []
+    size = 0
+    for key in keys:
+        length = _utf16_len(texts[key]) + len(_BATCH_SEPARATOR)
+        if batch and size + length > _BATCH_MAX_CHARS:
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(key)
+        size += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def fix_grammar_batch(texts: List[str], passes: int = 7, tool=None) -> List[str]:
+    """
+    Fix grammar in many text nodes with one LanguageTool check per pass.
+
+    Like calling fix_grammar on each text, but the eligible nodes are joined
+    into buffers of up to _BATCH_MAX_CHARS, so each pass costs one roundtrip
+    to the LanguageTool server per buffer instead of one per node. Nodes in a
+    buffer whose check fails keep their original text.
+
+    Args:
+        texts: Text node contents
+        passes: Maximum number of correction passes
+        tool: LanguageTool instance (default: the shared one)
+    """
+    results = list(texts)
+
+    # Whitespace-stripped cores of the nodes worth checking, by index
+    cores: Dict[int, str] = {}
+    wrappers: Dict[int, Tuple[str, str]] = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip() or len(text.strip()) < 3:
+            continue
+        match = _WS_SPLIT_RE.match(text)
+        if not match or not match.group(2):
+            continue
+        leading_ws, core, trailing_ws = match.groups()
+        cores[i] = core
+        wrappers[i] = (leading_ws, trailing_ws)
 
-        # Light cleanup: collapse multiple spaces introduced by fixes
-        corrected = re.sub(r"\s{2,}", " ", corrected)
-        corrected = re.sub(r"\s+([.,;:!?])", r"\1", corrected)
-        corrected = re.sub(r"\s+([)\]])", r"\1", corrected)
-        corrected = re.sub(r"([([{}])\s+", r"\1", corrected)
+    if not cores:
+        return results
 
-        return f"{leading_ws}{corrected}{trailing_ws}"
+    # Identical nodes (headings, repeated boilerplate) are checked once
+    current = {core: core for core in cores.values()}
+
+    try:
+        if tool is None:
+            tool = get_grammar_tool()
     except Exception as e:
-        # If grammar check fails, return original
+        # If grammar check fails, return originals
         print(f"Grammar check failed: {e}")
-        return text
+        return results
+    active = list(current)
+    # Texts whose check failed; their nodes are left as they were
+    failed = set()
+
+    for pass_num in range(passes):
+        # Texts LanguageTool already passed are done
+        active = [key for key in active if not _is_known_clean(current[key])]
+        if not active:
+            break
+
+        text_matches: Dict[str, list] = {}
+        for batch in _batches(active, current):
+            # Start index of every text of the batch inside the joined buffer
+            starts = []
+            offset = 0
+            for key in batch:
+                starts.append(offset)
+                offset += len(current[key]) + len(_BATCH_SEPARATOR)
+            buffer = _BATCH_SEPARATOR.join(current[key] for key in batch)
+            try:
+                matches = tool.check(buffer)
+            except Exception as e:
+                print(f"Grammar check failed: {e}")
+                failed.update(batch)
+                continue
+
+            # Route each match to the text it falls in, relative to that text
+            for start, end, replacements in _match_spans(buffer, matches):
+                pos = bisect_right(starts, start) - 1
+                if pos < 0:
+                    continue
+                key = batch[pos]
+                start -= starts[pos]
+                end -= starts[pos]
+                if end > len(current[key]):
+                    # Spans a node boundary
+                    continue
+                text_matches.setdefault(key, []).append((start, end, replacements))
+
+        # Texts without matches are done, as in the per-node loop
+        for key in active:
+            if key not in text_matches and key not in failed:
+                _mark_clean(current[key])
+        active = [key for key in active if key in text_matches]
+
+        for key in active:
+            current[key] = _apply_corrections(current[key], text_matches[key], skip_empty=True)
+
+    for i, core in cores.items():
+        if core in failed:
+            continue
+        leading_ws, trailing_ws = wrappers[i]
+        results[i] = f"{leading_ws}{_cleanup_spacing(current[core])}{trailing_ws}"
+
+    return results
+
+
+# ULTRA MAXIMUM ACCURACY MODE: 34 passes to push grammar into the 90s
+PARAGRAPH_PASSES = 34
+# Upper bound on characters sent to LanguageTool by the paragraph pass per document
+PARAGRAPH_BUDGET_CHARS = int(float(os.environ.get("SPELL_GRAMMAR_BUDGET_MB", "64")) * 1_000_000)
+_HAS_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+def fix_paragraph_text(para_text: str, passes: int = PARAGRAPH_PASSES, tool=None) -> str:
+    """
+    Paragraph-level grammar/style fix: apply every top suggestion, re-checking
+    until LanguageTool reports nothing, a pass changes nothing, or the passes
+    run out.
+    """
+    # Nothing for the grammar rules to work on without letters
+    if not _HAS_LETTER_RE.search(para_text):
+        return para_text
+
+    corrected = para_text
+    if tool is None:
+        tool = get_grammar_tool()
+
+    for pass_num in range(passes):
+        if _is_known_clean(corrected):
+            break
+        matches = tool.check(corrected)
+        if not matches:
+            _mark_clean(corrected)
+            break
+
+        # Apply ALL corrections
+        previous = corrected
+        corrected = _apply_corrections(corrected, _match_spans(corrected, matches))
+        # Same text gets the same matches again; later passes would change nothing
+        if corrected == previous:
+            break
+
+    return corrected
 
 
 def process_text_node(text: str, fix_spell: bool = True, fix_gram: bool = True) -> str:
@@ -208,13 +587,83 @@ def process_text_node(text: str, fix_spell: bool = True, fix_gram: bool = True)
     return result
 
 
-def process_docx(input_path: str, output_path: str, fix_spell: bool = True, fix_gram: bool = True) -> Dict[str, int]:
+def _collect_text_nodes(root: etree._Element):
+    """
+    Find, in one walk of the tree, what the checker edits outside tables.
+
+    Returns:
+        text_nodes: every w:t not inside a w:tbl
+        paragraphs: for every w:p not inside a w:tbl, its descendant w:t nodes
+        nested: whether any of those paragraphs contains another w:p
+    """
+    text_nodes = []
+    paragraphs = []
+    nested = False
+    open_paras = []  # w:t lists of the enclosing non-table paragraphs
+    tbl_depth = 0
+
+    walker = etree.iterwalk(root, events=("start", "end"))
+    for event, elem in walker:
+        tag = elem.tag
+        if event == "start":
+            if tag == _T_TAG:
+                if not tbl_depth:
+                    text_nodes.append(elem)
+                for t_nodes in open_paras:
+                    t_nodes.append(elem)
+            elif tag == _P_TAG:
+                if open_paras:
+                    nested = True
+                if not tbl_depth:
+                    t_nodes = []
+                    paragraphs.append(t_nodes)
+                    open_paras.append(t_nodes)
+            elif tag == _TBL_TAG:
+                tbl_depth += 1
+                if not open_paras:
+                    # Nothing inside a top-level table is collected
+                    walker.skip_subtree()
+        else:
+            if tag == _P_TAG and open_paras and not tbl_depth:
+                open_paras.pop()
+            elif tag == _TBL_TAG:
+                tbl_depth -= 1
+
+    return text_nodes, paragraphs, nested
+
+
+# Start tag of an element with local name "t" under any (or no) prefix, so
+# w:t is found even when the WordprocessingML namespace is bound differently
+_T_START_RE = re.compile(rb"<(?:[^\s<>/:]+:)?t[\s/>]")
+_SCAN_CHUNK = 1 << 16
+
+
+def _has_text_elements(fp) -> bool:
+    """
+    Cheap bytes-level check of an XML stream for any w:t start tag.
+
+    Stops at the first hit, which in a document with text is near the start,
+    so this rarely inflates more than one chunk.
+    """
+    tail = b""
+    while True:
+        chunk = fp.read(_SCAN_CHUNK)
+        if not chunk:
+            return False
+        buf = tail + chunk
+        if _T_START_RE.search(buf):
+            return True
+        # Keep enough to match a tag split across two chunks
+        tail = buf[-256:]
+
+
+def process_docx(input_path, output_path, fix_spell: bool = True, fix_gram: bool = True) -> Dict[str, int]:
     """
     Process DOCX file to fix spelling and grammar.
     
     Args:
-        input_path: Input DOCX file path
-        output_path: Output DOCX file path
+        input_path: Input DOCX file path or seekable binary file object
+        output_path: Output DOCX file path or writable binary file object
         fix_spell: Enable spelling correction
         fix_gram: Enable grammar correction
     
@@ -227,108 +676,130 @@ def process_docx(input_path: str, output_path: str, fix_spell: bool = True, fix_
         "total_changes": 0
     }
     
-    # Validate input
+    # Validate input from the central directory only. testzip() would inflate
+    # every part; document.xml is CRC-checked anyway while it is parsed, and
+    # the other parts are copied through without being decompressed
     try:
         with zipfile.ZipFile(input_path, 'r') as zf:
-            if zf.testzip() is not None:
-                raise ValueError("Input DOCX is corrupted")
+            if "word/document.xml" not in zf.namelist():
+                raise ValueError("Input DOCX has no word/document.xml")
     except zipfile.BadZipFile:
         raise ValueError("Input file is not a valid DOCX")
     
     # Process DOCX
-    with zipfile.ZipFile(input_path, 'r') as zin, zipfile.ZipFile(output_path, 'w') as zout:
+    # Unchanged entries are copied from the raw archive bytes
+    if isinstance(input_path, (str, os.PathLike)):
+        raw_source = open(input_path, 'rb')
+    else:
+        raw_source = contextlib.nullcontext(input_path)
+    with zipfile.ZipFile(input_path, 'r') as zin, zipfile.ZipFile(output_path, 'w') as zout, \
+            raw_source as raw_in:
         for item in zin.infolist():
-            data = zin.read(item.filename)
-            
-            # Only process main document
-            if item.filename == "word/document.xml":
-                try:
-                    tree = etree.parse(io.BytesIO(data))
-                    root = tree.getroot()
-                    
-                    # Find all text nodes, excluding tables
-                    text_nodes = root.xpath("//w:t[not(ancestor::w:tbl)]", namespaces=NSMAP)
-                    
-                    # Pass 1: token-level fixes (spell + grammar/style)
-                    for text_node in text_nodes:
-                        if text_node.text:
-                            stats["text_nodes_processed"] += 1
-                            original = text_node.text
-                            corrected = process_text_node(original, fix_spell, fix_gram)
-                            
-                            if corrected != original:
-                                text_node.text = corrected
-                                stats["text_nodes_modified"] += 1
-                                stats["total_changes"] += 1
-
-                    # Pass 2: paragraph-level grammar/style (single conservative pass)
-                    # Focus on errors only, not style, to minimize AI detection
-                    if fix_gram:
-                        strong_para = os.environ.get("SPELL_GRAMMAR_STRONG_PARAGRAPH", "0") in ("1", "true", "True")  # Default off for minimal changes
-                        paragraphs = root.xpath("//w:p[not(ancestor::w:tbl)]", namespaces=NSMAP)
-
-                        def apply_para_level(t_nodes: List[etree._Element]) -> None:
-                            # ULTRA MAXIMUM ACCURACY MODE: 7-10 passes for 90%+ grammar perfection
-                            node_texts = [(tn.text or "") for tn in t_nodes]
-                            if not any(node_texts):
-                                return
-                            para_text = "".join(node_texts)
-                            if len(para_text.strip()) < 1:  # process even 1-char paragraphs
-                                return
-
-                            # Run 34 grammar passes with picky mode to push grammar into the 90s
-                            passes = 34  # Small bump to close the gap to 90+
-                            corrected = para_text
-                            tool = get_grammar_tool()  # Will use picky mode
-                            
-                            for pass_num in range(passes):
-                                matches = tool.check(corrected)
-                                if not matches:
-                                    break
-                                
-                                # Apply ALL corrections in reverse order
-                                for m in reversed(matches):
-                                    if not m.replacements:
-                                        continue
-                                    replacement = m.replacements[0]
-                                    start = m.offset
-                                    end = start + m.errorLength
-                                    corrected = corrected[:start] + replacement + corrected[end:]
-                            
-                            if corrected == para_text:
-                                return
-                            
-                            # Redistribute corrected text: merge all runs into first, clear rest
-                            if t_nodes:
-                                t_nodes[0].text = corrected
-                                for tn in t_nodes[1:]:
-                                    tn.text = ""
-                                stats["text_nodes_modified"] += len(t_nodes)
-                                stats["total_changes"] += 1
-
-                        for p in paragraphs:
-                            t_nodes = p.xpath(".//w:t", namespaces=NSMAP)
-                            if not t_nodes:
-                                continue
-                            apply_para_level(t_nodes)
-                    
-                    # Serialize back
-                    data = etree.tostring(
-                        tree,
-                        xml_declaration=True,
-                        encoding="UTF-8",
-                        standalone="yes"
-                    )
-                except Exception as e:
-                    print(f"Error processing document.xml: {e}")
-                    # Keep original data if processing fails
+            # Everything but the main document is copied through compressed, as-is
+            if item.filename != "word/document.xml":
+                copy_entry(zin, zout, item, raw_in)
+                continue
+
+            # Nothing to check without text elements: keep the part as-is
+            # instead of building and re-serializing a tree
+            with zin.open(item) as fp:
+                has_text = _has_text_elements(fp)
+            if not has_text:
+                copy_entry(zin, zout, item, raw_in)
+                continue
+
+            try:
+                # Parse straight from the decompressing zip stream so the raw
+                # XML bytes are not held in memory next to the tree
+                with zin.open(item) as fp:
+                    tree = etree.parse(fp)
+                root = tree.getroot()
+                
+                # Find all text nodes and paragraphs, excluding tables
+                text_nodes, paragraphs, nested = _collect_text_nodes(root)
+                
+                # Pass 1: token-level fixes (spell + grammar/style)
+                text_nodes = [tn for tn in text_nodes if tn.text]
+                originals = [tn.text for tn in text_nodes]
+                corrected_texts = originals
+                # Fetched once; every grammar call below reuses it
+                tool = get_grammar_tool() if fix_gram else None
+                if fix_spell:
+                    corrected_texts = [fix_spelling(t) for t in corrected_texts]
+                if fix_gram:
+                    # One LanguageTool roundtrip per pass for the whole document
+                    corrected_texts = fix_grammar_batch(corrected_texts, tool=tool)
+
+                for text_node, original, corrected in zip(text_nodes, originals, corrected_texts):
+                    stats["text_nodes_processed"] += 1
+                    if corrected != original:
+                        text_node.text = corrected
+                        stats["text_nodes_modified"] += 1
+                        stats["total_changes"] += 1
+
+                # Pass 2: paragraph-level grammar/style (single conservative pass)
+                # Focus on errors only, not style, to minimize AI detection
+                if fix_gram:
+                    strong_para = os.environ.get("SPELL_GRAMMAR_STRONG_PARAGRAPH", "0") in ("1", "true", "True")  # Default off for minimal changes
+
+                    def apply_para_level(t_nodes: List[etree._Element], para_text: str, corrected: str) -> None:
+                        if corrected == para_text:
+                            return
+                        
+                        # Redistribute corrected text: merge all runs into first, clear rest
+                        t_nodes[0].text = corrected
+                        for tn in t_nodes[1:]:
+                            tn.text = ""
+                        stats["text_nodes_modified"] += len(t_nodes)
+                        stats["total_changes"] += 1
+
+                    para_nodes = [t_nodes for t_nodes in paragraphs if t_nodes]
+                    # Paragraphs are independent unless one contains another (text boxes),
+                    # so their LanguageTool checks can overlap on worker threads
+                    max_workers = int(os.environ.get("SPELL_GRAMMAR_MAX_THREADS", "8"))
+
+                    para_texts = ["".join((tn.text or "") for tn in t_nodes) for t_nodes in para_nodes]
+
+                    # Keep worst-case LanguageTool work (every paragraph running every
+                    # pass) within the budget by lowering the pass count for huge documents
+                    passes = PARAGRAPH_PASSES
+                    total_chars = sum(len(para_text) for para_text in para_texts)
+                    if total_chars * passes > PARAGRAPH_BUDGET_CHARS:
+                        passes = max(1, PARAGRAPH_BUDGET_CHARS // total_chars)
+
+                    if max_workers > 1 and not nested:
+                        # process even 1-char paragraphs
+                        todo = [i for i, para_text in enumerate(para_texts) if para_text.strip()]
+                        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                            fixed = list(executor.map(
+                                functools.partial(fix_paragraph_text, passes=passes, tool=tool),
+                                [para_texts[i] for i in todo],
+                            ))
+                        for i, corrected in zip(todo, fixed):
+                            apply_para_level(para_nodes[i], para_texts[i], corrected)
+                    else:
+                        for t_nodes in para_nodes:
+                            para_text = "".join((tn.text or "") for tn in t_nodes)
+                            if para_text.strip():
+                                apply_para_level(t_nodes, para_text, fix_paragraph_text(para_text, passes, tool))
+            except Exception as e:
+                print(f"Error processing document.xml: {e}")
+                # Keep original data if processing fails
+                tree = None
+                data = zin.read(item.filename)
             
             # Write to output
             zi = zipfile.ZipInfo(item.filename)
             zi.date_time = item.date_time
             zi.compress_type = item.compress_type
             zi.external_attr = item.external_attr
-            zout.writestr(zi, data)
+            if tree is not None:
+                # Serialize straight into the compressor rather than building
+                # the whole document as bytes first
+                with zout.open(zi, "w") as fp:
+                    tree.write(fp, xml_declaration=True, encoding="UTF-8", standalone=True)
+            else:
+                zout.writestr(zi, data)
     
     return stats
 
@@ -7,18 +7,124 @@ Handles conversion between multiple file formats:
 - Audio: MP3, WAV, FLAC, M4A, AAC, OGG
 """
 
+import base64
+import json
 import os
 import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
 from pathlib import Path
-from typing import Optional
-from PIL import Image
+from typing import List, Optional
+from PIL import Image, features
 import pypandoc
 from pdf2docx import Converter as PDF2DOCXConverter
 import logging
 
+try:
+    from unoserver.client import UnoClient
+except ImportError:  # LibreOffice is then started once per conversion
+    UnoClient = None
+
+try:
+    import av
+except ImportError:  # audio is then always converted by the ffmpeg CLI
+    av = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Long-lived LibreOffice behind unoserver, so conversions skip the cold start
+UNOSERVER_HOST = "127.0.0.1"
+UNOSERVER_PORT = os.environ.get("VDOCS_UNOSERVER_PORT", "2003")
+UNO_PORT = os.environ.get("VDOCS_UNO_PORT", "2002")
+# Distribution python3-uno bindings, needed by the unoserver process only
+UNO_PYTHONPATH = os.environ.get("VDOCS_UNO_PYTHONPATH", "/usr/lib/python3/dist-packages")
+
+# Long-lived `pandoc server`, so conversions skip pandoc's start-up
+PANDOC_SERVER_URL = "http://127.0.0.1:{}".format(os.environ.get("VDOCS_PANDOC_SERVER_PORT", "3030"))
+# Formats pandoc server exchanges base64-encoded
+PANDOC_BINARY_FORMATS = {"docx", "odt", "epub"}
+# Format aliases pypandoc resolves for the command line
+PANDOC_FORMAT_NAMES = {"md": "markdown"}
+
+# A persistent server that exits is restarted after SERVER_RESTART_DELAY
+# seconds, doubling while it keeps exiting; after SERVER_MAX_RESTARTS restarts
+# without a successful conversion in between, it is given up on
+SERVER_RESTART_DELAY = 5.0
+SERVER_MAX_RESTARTS = 5
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cpusets, unlike os.cpu_count)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# FFmpeg threads per conversion: the available CPUs shared between the
+# conversions expected to run at once, unless set explicitly
+FFMPEG_CONCURRENCY = max(1, int(os.environ.get("VDOCS_FFMPEG_CONCURRENCY", "1")))
+FFMPEG_THREADS = int(os.environ.get("VDOCS_FFMPEG_THREADS", "0")) or max(
+    1, _available_cpus() // FFMPEG_CONCURRENCY
+)
+# Batch transcodes are throughput-bound; "medium" spends ~2x the CPU for a
+# somewhat smaller file
+X264_PRESET = os.environ.get("VDOCS_X264_PRESET", "veryfast")
+
+# libvips sizes its thread pool when it is loaded; give it the same CPU share
+os.environ.setdefault("VIPS_CONCURRENCY", str(FFMPEG_THREADS))
+try:
+    import pyvips
+except (ImportError, OSError):  # pyvips or libvips missing; Pillow handles every image
+    pyvips = None
+
+# Images above this size are converted with libvips, which streams them
+# instead of decoding the whole pixel buffer like Pillow
+VIPS_MIN_BYTES = 20 << 20
+
+# libvips saver and options per output format (others always use Pillow)
+VIPS_SAVERS = {
+    "jpg": ("jpegsave", {"Q": 95, "strip": True, "optimize_coding": True}),
+    "jpeg": ("jpegsave", {"Q": 95, "strip": True, "optimize_coding": True}),
+    "png": ("pngsave", {"compression": 9, "strip": True}),
+    "webp": ("webpsave", {"Q": 90, "strip": True}),
+    "tif": ("tiffsave", {"strip": True}),
+    "tiff": ("tiffsave", {"strip": True}),
+}
+
+AUDIO_FORMATS = {"mp3", "wav", "flac", "m4a", "aac", "ogg"}
+
+# Inputs per ffmpeg process in convert_audio_batch
+AUDIO_BATCH_SIZE = 32
+
+# Audio encoder and bitrate per output format (others are stream-copied)
+AUDIO_CODECS = {
+    "mp3": ("libmp3lame", "320k"),
+    "wav": ("pcm_s16le", None),
+    "flac": ("flac", None),
+    "m4a": ("aac", "256k"),
+    "aac": ("aac", "256k"),
+    "ogg": ("libvorbis", "256k"),
+}
+
+# Hardware video encoders per accelerator, by output format ("default" for the rest)
+HW_VIDEO_ENCODERS = {
+    "cuda": {"default": "h264_nvenc", "mkv": "hevc_nvenc", "mov": "hevc_nvenc", "webm": "av1_nvenc"},
+    "qsv": {"default": "h264_qsv", "mkv": "hevc_qsv", "mov": "hevc_qsv", "webm": "av1_qsv"},
+    "vaapi": {"default": "h264_vaapi", "mkv": "hevc_vaapi", "mov": "hevc_vaapi", "webm": "av1_vaapi"},
+}
+
+# Rate control roughly matching libx264 -crf 23
+HW_QUALITY_ARGS = {
+    "cuda": ["-preset", "p4", "-tune", "hq", "-rc", "vbr", "-cq", "23", "-b:v", "0"],
+    "qsv": ["-preset", "medium", "-global_quality", "23"],
+    "vaapi": ["-rc_mode", "CQP", "-qp", "23"],
+}
+
 
 class UniversalConverter:
     """Handles conversion between various file formats"""
@@ -26,6 +132,206 @@ class UniversalConverter:
     def __init__(self):
         self.temp_dir = Path("/tmp/universal-converter")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self._office_process = None
+        # LibreOffice is not thread-safe: one conversion at a time
+        self._office_lock = threading.Lock()
+        self._office_fallback_logged = False
+        self._office_restart_lock = threading.Lock()
+        self._office_restarts = 0
+        self._office_restart_at = 0.0
+        self._pandoc_process = None
+        self._pandoc_fallback_logged = False
+        self._pandoc_restart_lock = threading.Lock()
+        self._pandoc_restarts = 0
+        self._pandoc_restart_at = 0.0
+        self.hw_encoders = set()
+        self.hw_accel = self._detect_hw_accel()
+
+    # ==================== LIBREOFFICE LISTENER ====================
+
+    def start_office_listener(self) -> None:
+        """Start the persistent LibreOffice (via unoserver) unless it is running"""
+        if UnoClient is None:
+            logger.info("unoserver not installed, LibreOffice starts per conversion")
+            return
+        if self._office_process is not None and self._office_process.poll() is None:
+            return
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (env.get("PYTHONPATH"), UNO_PYTHONPATH) if p)
+        try:
+            self._office_process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "unoserver.server",
+                    "--interface",
+                    UNOSERVER_HOST,
+                    "--port",
+                    UNOSERVER_PORT,
+                    "--uno-port",
+                    UNO_PORT,
+                    "--executable",
+                    "libreoffice",
+                ],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            logger.info(f"Started LibreOffice listener on port {UNOSERVER_PORT}")
+        except Exception as e:
+            logger.warning(f"Could not start LibreOffice listener: {e}")
+            self._office_process = None
+
+    def stop_office_listener(self) -> None:
+        """Stop the persistent LibreOffice"""
+        if self._office_process is not None:
+            self._office_process.terminate()
+            self._office_process = None
+
+    def _restart_office_listener(self) -> None:
+        """Restart the exited LibreOffice listener, backing off while it keeps exiting"""
+        with self._office_restart_lock:
+            process = self._office_process
+            if process is None or process.poll() is None:
+                return  # Given up on, or already restarted by another conversion
+            now = time.monotonic()
+            if now < self._office_restart_at:
+                return
+            self._office_process = None
+            if self._office_restarts >= SERVER_MAX_RESTARTS:
+                logger.warning("LibreOffice listener keeps exiting, starting LibreOffice per conversion from now on")
+                return
+            self._office_restart_at = now + SERVER_RESTART_DELAY * 2 ** self._office_restarts
+            self._office_restarts += 1
+            logger.warning(f"LibreOffice listener exited, restarting it ({self._office_restarts}/{SERVER_MAX_RESTARTS})")
+            self.start_office_listener()
+
+    def _office_convert(self, input_path: str, output_path: str, output_format: str) -> bool:
+        """
+        Convert through the persistent LibreOffice.
+
+        Writes where the command line would (the output directory, named after
+        the input). Returns False when the listener is unavailable, so the
+        caller can fall back to a one-off LibreOffice.
+        """
+        if self._office_process is None:
+            return False
+        if self._office_process.poll() is not None:
+            # Health check: restart it; it takes a few seconds to accept requests
+            self._restart_office_listener()
+            return False
+
+        target = Path(output_path).parent / f"{Path(input_path).stem}.{output_format}"
+        try:
+            with self._office_lock:
+                UnoClient(UNOSERVER_HOST, UNOSERVER_PORT).convert(
+                    inpath=input_path, outpath=str(target), convert_to=output_format
+                )
+            self._office_restarts = 0
+            return True
+        except Exception as e:
+            if not self._office_fallback_logged:
+                logger.warning(f"LibreOffice listener unavailable, starting LibreOffice per conversion: {e}")
+                self._office_fallback_logged = True
+            return False
+
+    # ==================== PANDOC SERVER ====================
+
+    def start_pandoc_server(self) -> None:
+        """Start the persistent pandoc server unless it is running"""
+        if self._pandoc_process is not None and self._pandoc_process.poll() is None:
+            return
+        port = PANDOC_SERVER_URL.rsplit(":", 1)[1]
+        try:
+            self._pandoc_process = subprocess.Popen(
+                ["pandoc", "server", "--port", port, "--timeout", "120"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            logger.info(f"Started pandoc server on port {port}")
+        except Exception as e:
+            logger.warning(f"Could not start pandoc server: {e}")
+            self._pandoc_process = None
+
+    def stop_pandoc_server(self) -> None:
+        """Stop the persistent pandoc server"""
+        if self._pandoc_process is not None:
+            self._pandoc_process.terminate()
+            self._pandoc_process = None
+
+    def _restart_pandoc_server(self) -> None:
+        """Restart the exited pandoc server, backing off while it keeps exiting"""
+        with self._pandoc_restart_lock:
+            process = self._pandoc_process
+            if process is None or process.poll() is None:
+                return  # Given up on, or already restarted by another conversion
+            now = time.monotonic()
+            if now < self._pandoc_restart_at:
+                return
+            self._pandoc_process = None
+            if self._pandoc_restarts >= SERVER_MAX_RESTARTS:
+                logger.warning("pandoc server keeps exiting, running pandoc per conversion from now on")
+                return
+            self._pandoc_restart_at = now + SERVER_RESTART_DELAY * 2 ** self._pandoc_restarts
+            self._pandoc_restarts += 1
+            logger.warning(f"pandoc server exited, restarting it ({self._pandoc_restarts}/{SERVER_MAX_RESTARTS})")
+            self.start_pandoc_server()
+
+    def _pandoc_server_convert(
+        self, input_path: str, output_path: str, input_format: str, output_format: str
+    ) -> bool:
+        """
+        Convert through the persistent pandoc server. Returns False when it is
+        unavailable (e.g. a pandoc built without the server), so the caller
+        can fall back to running pandoc once.
+        """
+        if self._pandoc_process is None:
+            return False
+        if self._pandoc_process.poll() is not None:
+            self._restart_pandoc_server()
+            return False
+
+        with open(input_path, "rb") as f:
+            data = f.read()
+        if input_format in PANDOC_BINARY_FORMATS:
+            text = base64.b64encode(data).decode("ascii")
+        else:
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError:
+                # The server only takes UTF-8 text; pandoc reports the error itself
+                return False
+        payload = {
+            "text": text,
+            "from": PANDOC_FORMAT_NAMES.get(input_format, input_format),
+            "to": PANDOC_FORMAT_NAMES.get(output_format, output_format),
+        }
+        request = urllib.request.Request(
+            PANDOC_SERVER_URL,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                result = json.load(response)
+        except urllib.error.HTTPError as e:
+            logger.warning(f"pandoc server conversion failed, retrying with pandoc: {e}")
+            return False
+        except Exception as e:
+            if not self._pandoc_fallback_logged:
+                logger.warning(f"pandoc server unavailable, running pandoc per conversion: {e}")
+                self._pandoc_fallback_logged = True
+            return False
+        if result.get("error"):
+            logger.warning(f"pandoc server conversion failed, retrying with pandoc: {result['error']}")
+            return False
+
+        output = result["output"]
+        with open(output_path, "wb") as f:
+            f.write(base64.b64decode(output) if result.get("base64") else output.encode("utf-8"))
+        self._pandoc_restarts = 0
+        return True
 
     # ==================== DOCUMENT CONVERSIONS ====================
 
@@ -70,6 +376,8 @@ class UniversalConverter:
 
     def _docx_to_pdf(self, input_path: str, output_path: str) -> bool:
         """Convert DOCX to PDF using LibreOffice"""
+        if self._office_convert(input_path, output_path, "pdf"):
+            return True
         try:
             output_dir = Path(output_path).parent
             subprocess.run(
@@ -93,7 +401,9 @@ class UniversalConverter:
     def _pandoc_convert(
         self, input_path: str, output_path: str, input_format: str, output_format: str
     ) -> bool:
-        """Convert documents using Pandoc"""
+        """Convert documents using the pandoc server, or Pandoc"""
+        if self._pandoc_server_convert(input_path, output_path, input_format, output_format):
+            return True
         try:
             pypandoc.convert_file(
                 input_path,
@@ -107,7 +417,9 @@ class UniversalConverter:
             return False
 
     def _libreoffice_convert(self, input_path: str, output_path: str, output_format: str) -> bool:
-        """Convert using LibreOffice command line"""
+        """Convert using LibreOffice, falling back to the command line"""
+        if self._office_convert(input_path, output_path, output_format):
+            return True
         try:
             output_dir = Path(output_path).parent
             subprocess.run(
@@ -136,17 +448,63 @@ class UniversalConverter:
 
     # ==================== IMAGE CONVERSIONS ====================
 
-    def convert_image(self, input_path: str, output_path: str, output_format: str) -> bool:
-        """Convert between image formats using Pillow"""
+    def _vips_convert_image(
+        self, input_path: str, output_path: str, output_format: str, optimize_size: bool = False
+    ) -> bool:
+        """
+        Convert a large image with libvips, streaming it top to bottom.
+        Returns False when libvips cannot handle it, so the caller uses Pillow.
+        """
+        saver = VIPS_SAVERS.get(output_format.lower())
+        if pyvips is None or saver is None:
+            return False
         try:
+            image = pyvips.Image.new_from_file(input_path, access="sequential")
+            if saver[0] == "jpegsave" and image.hasalpha():
+                image = image.flatten(background=255)
+            options = dict(saver[1])
+            if optimize_size and saver[0] == "pngsave":
+                options.update(palette=True, Q=90, effort=3)
+            getattr(image, saver[0])(output_path, **options)
+            return True
+        except pyvips.Error as e:
+            logger.warning(f"libvips image conversion failed, retrying with Pillow: {e}")
+            return False
+
+    def _quantize(self, img: Image.Image) -> Image.Image:
+        """Reduce an image to an 8-bit palette (lossy), keeping transparency"""
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        if features.check_feature("libimagequant"):
+            method = Image.Quantize.LIBIMAGEQUANT
+        else:
+            # The only built-in method that supports RGBA
+            method = Image.Quantize.FASTOCTREE
+        return img.quantize(colors=256, method=method, dither=Image.Dither.FLOYDSTEINBERG)
+
+    def convert_image(
+        self, input_path: str, output_path: str, output_format: str, optimize_size: bool = False
+    ) -> bool:
+        """
+        Convert between image formats using Pillow (libvips for large files).
+        optimize_size writes PNGs as 8-bit palette images: lossy, but several
+        times smaller and faster to encode than a full-search truecolor PNG.
+        """
+        try:
+            if os.path.getsize(input_path) > VIPS_MIN_BYTES and self._vips_convert_image(
+                input_path, output_path, output_format, optimize_size
+            ):
+                return True
+
             with Image.open(input_path) as img:
                 # Handle transparency for formats that don't support it
                 if output_format.lower() in ["jpg", "jpeg"] and img.mode in ["RGBA", "LA", "P"]:
                     # Convert to RGB
                     rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
+                    if img.mode in ["P", "LA"]:
                         img = img.convert("RGBA")
-                    rgb_img.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+                    # An RGBA mask means its alpha band, without split() copying out every band
+                    rgb_img.paste(img, mask=img)
                     img = rgb_img
 
                 # Save with appropriate format
@@ -154,6 +512,8 @@ class UniversalConverter:
                 if output_format.lower() in ["jpg", "jpeg"]:
                     save_kwargs["quality"] = 95
                 elif output_format.lower() == "png":
+                    if optimize_size and img.mode != "P":
+                        img = self._quantize(img)
                     save_kwargs["optimize"] = True
                 elif output_format.lower() == "webp":
                     save_kwargs["quality"] = 90
@@ -167,37 +527,117 @@ class UniversalConverter:
 
     # ==================== VIDEO CONVERSIONS ====================
 
-    def convert_video(self, input_path: str, output_path: str, output_format: str) -> bool:
-        """Convert between video formats using FFmpeg"""
+    def _detect_hw_accel(self) -> Optional[str]:
+        """
+        Pick the hardware accelerator for video encoding, once.
+
+        VDOCS_FFMPEG_HWACCEL selects one of cuda|vaapi|qsv|none; by default
+        cuda is used when this FFmpeg build has NVENC encoders.
+        """
+        requested = os.environ.get("VDOCS_FFMPEG_HWACCEL", "auto").lower()
+        if requested == "none":
+            return None
+
         try:
-            # FFmpeg command for video conversion
-            cmd = [
-                "ffmpeg",
-                "-i",
-                input_path,
+            result = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-encoders"],
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+        except Exception as e:
+            logger.warning(f"Could not list FFmpeg encoders, using CPU encoding: {e}")
+            return None
+
+        self.hw_encoders = {
+            encoder
+            for encoders in HW_VIDEO_ENCODERS.values()
+            for encoder in encoders.values()
+            if f" {encoder} " in result.stdout
+        }
+
+        accel = "cuda" if requested == "auto" else requested
+        if accel not in HW_VIDEO_ENCODERS:
+            logger.warning(f"Unknown VDOCS_FFMPEG_HWACCEL '{requested}', using CPU encoding")
+            return None
+        if HW_VIDEO_ENCODERS[accel]["default"] not in self.hw_encoders:
+            if requested != "auto":
+                logger.warning(f"FFmpeg has no {accel} encoders, using CPU encoding")
+            return None
+
+        logger.info(f"Video encoding uses {accel} hardware acceleration")
+        return accel
+
+    def _video_encoder(self, output_format: str, hw_accel: Optional[str]) -> Optional[str]:
+        """Hardware encoder for this output format, or None to encode on the CPU"""
+        if not hw_accel:
+            return None
+        encoders = HW_VIDEO_ENCODERS[hw_accel]
+        encoder = encoders.get(output_format, encoders["default"])
+        # e.g. no AV1 encoder on older GPUs: WebM then goes to libvpx-vp9
+        return encoder if encoder in self.hw_encoders else None
+
+    def _video_codec_args(
+        self,
+        output_format: str,
+        encoder: Optional[str],
+        hw_accel: Optional[str],
+        threads: int = FFMPEG_THREADS,
+    ) -> list:
+        """Video and audio codec options for one video output"""
+        audio_codec = "libopus" if output_format == "webm" else "aac"
+
+        if encoder is None:
+            video_codec = "libvpx-vp9" if output_format == "webm" else "libx264"
+            args = [
                 "-c:v",
-                "libx264",  # Video codec
+                video_codec,
                 "-preset",
-                "medium",
+                X264_PRESET if video_codec == "libx264" else "medium",
                 "-crf",
                 "23",  # Quality (lower = better)
-                "-c:a",
-                "aac",  # Audio codec
-                "-b:a",
-                "192k",
-                "-y",  # Overwrite output
-                output_path,
+                "-threads",
+                str(threads),
             ]
+        else:
+            args = ["-c:v", encoder, *HW_QUALITY_ARGS[hw_accel]]
+            if output_format == "mov" and encoder.startswith("hevc"):
+                args.extend(["-tag:v", "hvc1"])  # HEVC tag QuickTime players expect
+
+        args.extend(["-c:a", audio_codec, "-b:a", "192k"])
+        return args
+
+    def _video_command(
+        self, input_path: str, output_path: str, output_format: str, hw_accel: Optional[str]
+    ) -> list:
+        """Build the FFmpeg command for a video conversion"""
+        output_format = output_format.lower()
+        encoder = self._video_encoder(output_format, hw_accel)
+
+        cmd = ["ffmpeg"]
+        if encoder is not None:
+            # Decoded frames stay in GPU memory between decoder and encoder
+            cmd.extend(["-hwaccel", hw_accel, "-hwaccel_output_format", hw_accel])
+        cmd.extend(["-i", input_path])
+        cmd.extend(self._video_codec_args(output_format, encoder, hw_accel))
+        cmd.extend(["-y", output_path])  # Overwrite output
+        return cmd
 
-            # Adjust codec based on output format
-            if output_format.lower() == "webm":
-                cmd[5] = "libvpx-vp9"  # WebM video codec
-                cmd[11] = "libopus"  # WebM audio codec
-            elif output_format.lower() in ["avi", "mkv"]:
-                cmd[5] = "libx264"
-            elif output_format.lower() == "mov":
-                cmd[5] = "libx264"
+    def convert_video(self, input_path: str, output_path: str, output_format: str) -> bool:
+        """Convert between video formats using FFmpeg, on the GPU when available"""
+        cmd = self._video_command(input_path, output_path, output_format, self.hw_accel)
+        if "-hwaccel" in cmd:
+            try:
+                subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+                return True
+            except Exception as e:
+                # Encoders can be compiled in without a usable device (no GPU,
+                # missing driver, sessions exhausted): retry on the CPU
+                logger.warning(f"{self.hw_accel} video encoding failed, retrying on CPU: {e}")
+                cmd = self._video_command(input_path, output_path, output_format, None)
 
+        try:
             subprocess.run(cmd, check=True, capture_output=True, timeout=600)
             return True
 
@@ -205,27 +645,132 @@ class UniversalConverter:
             logger.error(f"Video conversion failed: {e}")
             return False
 
+    def _video_multi_command(
+        self, input_path: str, outputs: List[tuple], hw_accel: Optional[str]
+    ) -> list:
+        """Build one FFmpeg command writing every requested output"""
+        cmd = ["ffmpeg", "-i", input_path]
+
+        # Outputs with a target height get their own scaled copy of the decoded video
+        scaled = [i for i, output in enumerate(outputs) if len(output) > 2 and output[2]]
+        labels = {i: f"[v{i}]" for i in scaled}
+        if scaled:
+            if len(scaled) == 1:
+                graph = [f"[0:v:0]scale=-2:{outputs[scaled[0]][2]}{labels[scaled[0]]}"]
+            else:
+                graph = ["[0:v:0]split=%d%s" % (len(scaled), "".join(f"[s{i}]" for i in scaled))]
+                graph.extend(f"[s{i}]scale=-2:{outputs[i][2]}{labels[i]}" for i in scaled)
+            cmd.extend(["-filter_complex", ";".join(graph)])
+
+        # The outputs encode concurrently: share the thread budget between them
+        threads = max(1, FFMPEG_THREADS // len(outputs))
+        for i, (output_path, output_format, *_) in enumerate(outputs):
+            output_format = output_format.lower()
+            if output_format in AUDIO_FORMATS:
+                cmd.extend(["-map", "0:a:0", *self._audio_codec_args(output_format)])
+            else:
+                # Frames are filtered in system memory here; NVENC uploads them itself
+                encoder = self._video_encoder(output_format, hw_accel) if hw_accel == "cuda" else None
+                video = labels.get(i, "0:v:0")
+                cmd.extend(["-map", video, "-map", "0:a:0?"])
+                cmd.extend(self._video_codec_args(output_format, encoder, hw_accel, threads))
+            cmd.extend(["-y", output_path])
+        return cmd
+
+    def convert_video_multi(self, input_path: str, outputs: List[tuple]) -> bool:
+        """
+        Convert one video into several outputs with a single FFmpeg run.
+
+        The input is demuxed and decoded once for all outputs instead of once
+        per format.
+
+        Args:
+            input_path: Source video
+            outputs: (output_path, output_format) tuples, optionally with a third
+                element giving the output height (width keeps the aspect ratio).
+                Audio formats (mp3, wav, ...) get the audio track only.
+        """
+        if not outputs:
+            return True
+
+        cmd = self._video_multi_command(input_path, outputs, self.hw_accel)
+        if any(arg.endswith("_nvenc") for arg in cmd):
+            try:
+                subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+                return True
+            except Exception as e:
+                logger.warning(f"{self.hw_accel} video encoding failed, retrying on CPU: {e}")
+                cmd = self._video_multi_command(input_path, outputs, None)
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+            return True
+
+        except Exception as e:
+            logger.error(f"Multi-output video conversion failed: {e}")
+            return False
+
     # ==================== AUDIO CONVERSIONS ====================
 
+    def _audio_codec_args(self, output_format: str) -> list:
+        """Audio codec and bitrate options for an output format"""
+        codec, bitrate = AUDIO_CODECS.get(output_format.lower(), ("copy", None))
+        args = ["-c:a", codec]
+        if bitrate:
+            args.extend(["-b:a", bitrate])
+        return args
+
+    def _pyav_convert_audio(self, input_path: str, output_path: str, output_format: str) -> bool:
+        """
+        Transcode audio in-process with PyAV (libav), skipping the ffmpeg
+        process start-up that dominates short clips. Returns False when this
+        path cannot handle the conversion, so the caller falls back to the CLI.
+        """
+        if av is None or output_format.lower() not in AUDIO_CODECS:
+            return False
+        codec, bitrate = AUDIO_CODECS[output_format.lower()]
+        try:
+            av.Codec(codec, "w")
+        except av.codec.codec.UnknownCodecError:
+            return False
+
+        try:
+            with av.open(input_path) as src:
+                if not src.streams.audio:
+                    return False
+                in_stream = src.streams.audio[0]
+                # Multichannel layouts are left to the CLI, which maps them exactly
+                if in_stream.channels > 2:
+                    return False
+
+                with av.open(output_path, "w") as dst:
+                    dst.metadata.update(src.metadata)
+                    out_stream = dst.add_stream(
+                        codec,
+                        rate=in_stream.rate,
+                        layout="mono" if in_stream.channels == 1 else "stereo",
+                    )
+                    if bitrate:
+                        out_stream.bit_rate = int(bitrate[:-1]) * 1000
+                    for frame in src.decode(in_stream):
+                        dst.mux(out_stream.encode(frame))
+                    dst.mux(out_stream.encode(None))
+            return True
+
+        except Exception as e:
+            logger.warning(f"PyAV audio conversion failed, retrying with ffmpeg: {e}")
+            return False
+
     def convert_audio(self, input_path: str, output_path: str, output_format: str) -> bool:
-        """Convert between audio formats using FFmpeg"""
+        """Convert between audio formats using PyAV, or the FFmpeg CLI"""
         try:
+            if self._pyav_convert_audio(input_path, output_path, output_format):
+                return True
+
             # FFmpeg command for audio conversion
             cmd = ["ffmpeg", "-i", input_path]
-
-            # Set codec and bitrate based on format
-            if output_format.lower() == "mp3":
-                cmd.extend(["-c:a", "libmp3lame", "-b:a", "320k"])
-            elif output_format.lower() == "wav":
-                cmd.extend(["-c:a", "pcm_s16le"])
-            elif output_format.lower() == "flac":
-                cmd.extend(["-c:a", "flac"])
-            elif output_format.lower() in ["m4a", "aac"]:
-                cmd.extend(["-c:a", "aac", "-b:a", "256k"])
-            elif output_format.lower() == "ogg":
-                cmd.extend(["-c:a", "libvorbis", "-b:a", "256k"])
-            else:
-                cmd.extend(["-c:a", "copy"])
+            cmd.extend(self._audio_codec_args(output_format))
+            cmd.extend(["-threads", str(FFMPEG_THREADS)])
 
             cmd.extend(["-y", output_path])
 
@@ -236,6 +781,44 @@ class UniversalConverter:
             logger.error(f"Audio conversion failed: {e}")
             return False
 
+    def convert_audio_batch(self, conversions: List[tuple]) -> List[bool]:
+        """
+        Convert many audio files. Each conversion is (input_path, output_path, output_format).
+
+        Files go through PyAV where possible; the rest are grouped by codec
+        settings and converted with one ffmpeg process per group (N inputs,
+        N mapped outputs) instead of one process per file.
+        Returns whether each conversion succeeded.
+        """
+        results = [False] * len(conversions)
+        groups = {}
+        for i, (input_path, output_path, output_format) in enumerate(conversions):
+            if self._pyav_convert_audio(input_path, output_path, output_format):
+                results[i] = True
+            else:
+                groups.setdefault(tuple(self._audio_codec_args(output_format)), []).append(i)
+
+        for codec_args, indices in groups.items():
+            for start in range(0, len(indices), AUDIO_BATCH_SIZE):
+                chunk = indices[start:start + AUDIO_BATCH_SIZE]
+                cmd = ["ffmpeg", "-y"]
+                for i in chunk:
+                    cmd.extend(["-i", conversions[i][0]])
+                for n, i in enumerate(chunk):
+                    cmd.extend(["-map", f"{n}:a:0", *codec_args])
+                    cmd.extend(["-threads", str(FFMPEG_THREADS), conversions[i][1]])
+                try:
+                    subprocess.run(cmd, check=True, capture_output=True, timeout=300 * len(chunk))
+                    for i in chunk:
+                        results[i] = True
+                except Exception as e:
+                    # One bad input fails the whole command; find out which
+                    logger.warning(f"Batched audio conversion failed, converting files one by one: {e}")
+                    for i in chunk:
+                        results[i] = self.convert_audio(*conversions[i])
+
+        return results
+
 
 # Create singleton instance
 converter = UniversalConverter()
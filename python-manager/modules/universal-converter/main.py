@@ -5,6 +5,7 @@ Handles conversion requests from the Next.js frontend
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional
 from converter import converter
 import logging
 
@@ -14,11 +15,36 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="Universal Converter Service")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Start LibreOffice and pandoc once instead of per document conversion"""
+    converter.start_office_listener()
+    converter.start_pandoc_server()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    converter.stop_office_listener()
+    converter.stop_pandoc_server()
+
+
 class ConversionRequest(BaseModel):
     inputPath: str
     outputPath: str
     inputFormat: str = None
     outputFormat: str
+    optimizeSize: bool = False
+
+
+class VideoOutput(BaseModel):
+    outputPath: str
+    outputFormat: str
+    height: Optional[int] = None
+
+
+class MultiConversionRequest(BaseModel):
+    inputPath: str
+    outputs: List[VideoOutput]
 
 
 @app.post("/convert-document")
@@ -47,7 +73,7 @@ async def convert_image(request: ConversionRequest):
     """Convert image files"""
     try:
         success = converter.convert_image(
-            request.inputPath, request.outputPath, request.outputFormat
+            request.inputPath, request.outputPath, request.outputFormat, request.optimizeSize
         )
 
         if success:
@@ -78,6 +104,25 @@ async def convert_video(request: ConversionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/convert-video-multi")
+async def convert_video_multi(request: MultiConversionRequest):
+    """Convert one video into several formats/sizes, decoding it once"""
+    try:
+        success = converter.convert_video_multi(
+            request.inputPath,
+            [(o.outputPath, o.outputFormat, o.height) for o in request.outputs],
+        )
+
+        if success:
+            return {"success": True, "outputPaths": [o.outputPath for o in request.outputs]}
+        else:
+            raise HTTPException(status_code=500, detail="Video conversion failed")
+
+    except Exception as e:
+        logger.error(f"Video conversion error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/convert-audio")
 async def convert_audio(request: ConversionRequest):
     """Convert audio files"""
@@ -96,6 +141,31 @@ async def convert_audio(request: ConversionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/convert-audio-batch")
+async def convert_audio_batch(requests: List[ConversionRequest]):
+    """Convert many audio files, sharing ffmpeg processes between them"""
+    if not requests:
+        raise HTTPException(status_code=400, detail="No audio files to convert")
+    try:
+        results = converter.convert_audio_batch(
+            [(r.inputPath, r.outputPath, r.outputFormat) for r in requests]
+        )
+
+        if any(results):
+            return {
+                "success": all(results),
+                "results": [
+                    {"outputPath": r.outputPath, "success": ok} for r, ok in zip(requests, results)
+                ],
+            }
+        else:
+            raise HTTPException(status_code=500, detail="Audio conversion failed")
+
+    except Exception as e:
+        logger.error(f"Audio conversion error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -6,8 +6,14 @@ import zipfile
 import shutil
 import io
 import time
+import queue
+import hashlib
+import threading
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import atexit
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from uuid import uuid4
 
 # Add paths to sys.path
@@ -75,14 +81,12 @@ try:
 
     # Extract functions
     anonymize_docx = docx_anon_module.anonymize_docx
-    unzip_docx = docx_anon_module.unzip_docx
-    load_xml = docx_anon_module.load_xml
+    load_xml_from_docx = docx_anon_module.load_xml_from_docx
     detect_identity = identity_det_module.detect_identity
 
     # Extract functions
     anonymize_docx = docx_anon_module.anonymize_docx
-    unzip_docx = docx_anon_module.unzip_docx
-    load_xml = docx_anon_module.load_xml
+    load_xml_from_docx = docx_anon_module.load_xml_from_docx
     detect_identity = identity_det_module.detect_identity
 
     sys.path.pop(0)  # Remove utils path
@@ -94,99 +98,248 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
-def is_valid_docx(path: str) -> bool:
+def _max_workers() -> int:
+    env_workers = os.getenv("ONECLICK_MAX_WORKERS")
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            return max(1, os.cpu_count() - 1)
+    # Default: modest cap to reduce thrash on 16 GB machines
+    return min(4, max(1, os.cpu_count() - 1))
+
+
+def _warm_worker():
+    """Pool initializer: build the per-process singletons before the first file.
+
+    The spaCy model behind Presidio and the LanguageTool client are created
+    lazily per process; doing it here means each worker pays for them once
+    for its lifetime instead of once per job.
+    """
+    _worker_scratch_dir()
+    try:
+        identity_det_module.get_pipeline()
+    except Exception as e:
+        print(f"[WARN] Worker warmup (redaction pipeline) failed: {e}")
+    try:
+        spell_grammar_checker.get_grammar_tool()
+    except Exception as e:
+        print(f"[WARN] Worker warmup (grammar tool) failed: {e}")
+
+
+# Parallel MinIO downloads per job, and how many downloaded files may wait
+# for a free worker
+DOWNLOAD_THREADS = 4
+PREFETCH_DEPTH = 2
+
+
+# Long-lived pool shared by every job handled by this process. Workers are
+# forked once, after the heavy imports above, and reused across jobs.
+_worker_pool = None
+
+
+def _get_worker_pool() -> ProcessPoolExecutor:
+    global _worker_pool
+    if _worker_pool is None:
+        max_workers = _max_workers()
+        print(f"Starting worker pool with {max_workers} workers")
+        _worker_pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_worker)
+    return _worker_pool
+
+
+def _reset_worker_pool():
+    """Drop a broken pool (e.g. a worker was OOM-killed); the next job starts a new one."""
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.shutdown(wait=False, cancel_futures=True)
+        _worker_pool = None
+
+
+atexit.register(_reset_worker_pool)
+
+
+# Scratch directory of this worker process, reused for every file it handles
+_WORKER_DIR = None
+
+
+def _worker_scratch_dir() -> str:
+    """Create this process's scratch directory on first use.
+
+    Lives on /dev/shm (tmpfs) when it has room, so staging files never touch
+    the disk. Removed when the worker exits.
+    """
+    global _WORKER_DIR
+    if _WORKER_DIR is None:
+        base = None
+        try:
+            if shutil.disk_usage("/dev/shm").free >= 1 << 30:
+                base = "/dev/shm"
+        except OSError:
+            pass
+        _WORKER_DIR = tempfile.mkdtemp(prefix=f"w{os.getpid()}_", dir=base)
+        # Pool workers leave through multiprocessing's exit path, which skips atexit
+        multiprocessing.util.Finalize(
+            None, shutil.rmtree, args=(_WORKER_DIR,), kwargs={"ignore_errors": True}, exitpriority=0
+        )
+    return _WORKER_DIR
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# Results of inputs processed before, keyed by the input's SHA-256 (duplicate
+# uploads, retried jobs). Bump the version whenever the pipeline output changes.
+RESULT_CACHE_ENABLED = os.getenv("ONECLICK_RESULT_CACHE", "1") != "0"
+RESULT_CACHE_PREFIX = "cache/v1"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _result_cache_key(path: str):
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    return f"{RESULT_CACHE_PREFIX}/{digest}/final.docx"
+
+
+def _fetch_cached_result(cache_key: str, path: str) -> bool:
+    try:
+        return minio_handler.download_to_path_if_exists(cache_key, path) and is_valid_docx(path)
+    except Exception as e:
+        print(f"[WARN] Result cache lookup failed: {e}")
+        return False
+
+
+def _store_cached_result(cache_key: str, path: str) -> None:
+    try:
+        minio_handler.upload_path(cache_key, path, DOCX_CONTENT_TYPE)
+    except Exception as e:
+        print(f"[WARN] Could not store result in cache: {e}")
+
+
+def is_valid_docx(path, verify_crc: bool = False) -> bool:
+    """Check a DOCX given as a path or a binary file object (e.g. BytesIO).
+
+    Opening the zip already validates the end-of-central-directory record and
+    the central directory; the package must also contain word/document.xml.
+    verify_crc additionally decompresses and CRC-checks every member, which
+    is only worth it for untrusted input and the final output.
+    """
     import zipfile
     try:
         with zipfile.ZipFile(path, "r") as zf:
-            return zf.testzip() is None
+            if "word/document.xml" not in zf.NameToInfo:
+                return False
+            return not verify_crc or zf.testzip() is None
     except zipfile.BadZipFile:
         return False
 
 
 def process_single_file(args):
-    """Process one file (convert/redact/humanize/format) and return output path + key."""
-    file_key, job_id, temp_dir = args
+    """Process one file (convert/redact/humanize/format) and return output path + key.
+
+    The input has already been downloaded by the parent and is deleted here.
+    The output lives in the worker's scratch directory; the caller deletes it
+    once it has been zipped.
+    """
+    file_key, job_id, local_path = args
     started = time.perf_counter()
-    worker_dir = tempfile.mkdtemp(dir=temp_dir, prefix="work_")
+    worker_dir = _worker_scratch_dir()
+    # Unique per file, since the scratch directory is shared by every file of this worker
+    file_id = uuid4().hex
+    final_path = None
+    succeeded = False
     try:
         filename = os.path.basename(file_key)
-        local_path = os.path.join(worker_dir, filename)
-
-        # Download
-        data = minio_handler.download_file(file_key)
-        with open(local_path, "wb") as f:
-            f.write(data.getbuffer())
-
-        docx_path = local_path
-
+        if filename.lower().endswith(".docx"):
+            docx_filename = filename
+        elif filename.lower().endswith(".pdf"):
+            docx_filename = os.path.splitext(filename)[0] + ".docx"
+        else:
+            print(f"Skipping non-docx/pdf file: {filename}")
+            return None
+        final_path = os.path.join(worker_dir, f"{file_id}_final_{docx_filename}")
+
+        cache_key = _result_cache_key(local_path)
+        if cache_key and _fetch_cached_result(cache_key, final_path):
+            print(f"[CACHE] Identical input processed before, reusing result for {filename}")
+            succeeded = True
+            return final_path, file_key
+        # Set when a stage fell back; such results are not cached
+        degraded = False
+
+        # Stages hand the document over in memory; only the final DOCX is
+        # written to worker_dir (the result zip is built from it)
         if filename.lower().endswith(".pdf"):
             print("Converting PDF to DOCX...")
             with open(local_path, "rb") as f:
                 pdf_bytes = io.BytesIO(f.read())
-            docx_bytes = PDFConverter.convert_pdf_to_docx(pdf_bytes)
-            docx_filename = os.path.splitext(filename)[0] + ".docx"
-            docx_path = os.path.join(worker_dir, docx_filename)
-            with open(docx_path, "wb") as f:
-                f.write(docx_bytes.getbuffer())
-            if not is_valid_docx(docx_path):
-                print(f"[ERROR] PDF-to-DOCX conversion produced a corrupted DOCX: {docx_path}")
+            docx_io = PDFConverter.convert_pdf_to_docx(pdf_bytes)
+            if not is_valid_docx(docx_io):
+                print(f"[ERROR] PDF-to-DOCX conversion produced a corrupted DOCX: {docx_filename}")
                 return None
-        elif not filename.lower().endswith(".docx"):
-            print(f"Skipping non-docx/pdf file: {filename}")
-            return None
         else:
-            if not is_valid_docx(docx_path):
-                print(f"[ERROR] Input DOCX is corrupted: {docx_path}")
+            with open(local_path, "rb") as f:
+                docx_io = io.BytesIO(f.read())
+            if not is_valid_docx(docx_io, verify_crc=True):
+                print(f"[ERROR] Input DOCX is corrupted: {local_path}")
                 return None
 
         # Redact
         print("Redacting...")
         try:
-            temp_unzip = unzip_docx(docx_path)
-            document_xml = os.path.join(temp_unzip, "word/document.xml")
-            tree = load_xml(document_xml)
+            tree = load_xml_from_docx(docx_io)
             identity = detect_identity(tree)
-            shutil.rmtree(temp_unzip)
             print(f"Detected identity: name={identity.get('name')}, roll_no={identity.get('roll_no')}")
         except Exception as e:
             print(f"Failed to detect identity: {e}")
             identity = {"name": None, "roll_no": None}
+            degraded = True
 
-        redacted_path = os.path.join(worker_dir, "redacted_" + os.path.basename(docx_path))
+        redacted_io = io.BytesIO()
         anonymize_docx(
-            docx_path,
-            redacted_path,
+            docx_io,
+            redacted_io,
             name=identity.get("name"),
             roll_no=identity.get("roll_no"),
         )
-        if not is_valid_docx(redacted_path):
-            print(f"[ERROR] Redactor produced a corrupted DOCX: {redacted_path}")
+        if not is_valid_docx(redacted_io):
+            print(f"[ERROR] Redactor produced a corrupted DOCX: redacted_{docx_filename}")
             return None
 
         # Humanize
         print("Humanizing...")
-        humanized_path = os.path.join(worker_dir, "humanized_" + os.path.basename(docx_path))
+        humanized_io = io.BytesIO()
         try:
-            docx_humanize_lxml.process_docx(redacted_path, humanized_path, skip_detect=True)
-            if not is_valid_docx(humanized_path):
-                print(f"[ERROR] Humanizer produced a corrupted DOCX: {humanized_path}")
-                shutil.copy(redacted_path, humanized_path)
+            docx_humanize_lxml.process_docx(redacted_io, humanized_io, skip_detect=True)
+            if not is_valid_docx(humanized_io):
+                print(f"[ERROR] Humanizer produced a corrupted DOCX: humanized_{docx_filename}")
+                humanized_io = redacted_io
+                degraded = True
         except Exception as e:
             print(f"Humanizer failed: {e}")
-            shutil.copy(redacted_path, humanized_path)
+            humanized_io = redacted_io
+            degraded = True
 
         # Spell / Grammar
         print("Fixing spelling and grammar...")
-        final_path = os.path.join(worker_dir, "final_" + os.path.basename(docx_path))
         try:
-            stats = spell_grammar_checker.process_docx(humanized_path, final_path)
+            stats = spell_grammar_checker.process_docx(humanized_io, final_path)
             print(f"  Fixed {stats['total_changes']} spelling/grammar errors")
-            if not is_valid_docx(final_path):
+            if not is_valid_docx(final_path, verify_crc=True):
                 print(f"[ERROR] Spell checker produced a corrupted DOCX: {final_path}")
-                shutil.copy(humanized_path, final_path)
+                with open(final_path, "wb") as f:
+                    f.write(humanized_io.getbuffer())
+                degraded = True
         except Exception as e:
             print(f"Spell/grammar check failed: {e}")
-            shutil.copy(humanized_path, final_path)
+            with open(final_path, "wb") as f:
+                f.write(humanized_io.getbuffer())
+            degraded = True
 
         # Formatting (DISABLED - preserves original formatting)
         # print("Applying standard formatting...")
@@ -202,15 +355,44 @@ def process_single_file(args):
         #     print(f"Formatting failed: {e}")
         #     shutil.copy(final_path, formatted_path)
 
+        if cache_key and not degraded:
+            _store_cached_result(cache_key, formatted_path)
+
         elapsed = time.perf_counter() - started
         print(f"[TIMER] {filename} done in {elapsed:.2f}s")
+        succeeded = True
         return formatted_path, file_key
     except Exception as e:
         print(f"[ERROR] Worker failed for {file_key}: {e}")
         return None
     finally:
-        # Do not cleanup worker_dir here; caller zips from formatted path inside worker_dir
-        pass
+        # Keep only the output handed back to the caller
+        _unlink_quietly(local_path)
+        if final_path and not succeeded:
+            _unlink_quietly(final_path)
+
+
+def _zip_name(original_key: str, job_id: str) -> str:
+    """Path of an output inside the result zip, mirroring the raw folder structure."""
+    relative_path = original_key.replace(f"jobs/{job_id}/raw/", "")
+    path_parts = relative_path.split('/')
+    if len(path_parts) > 1:
+        relative_path = '/'.join(path_parts[1:])
+    else:
+        relative_path = path_parts[0]
+
+    filename = os.path.basename(relative_path)
+    folder = os.path.dirname(relative_path)
+
+    for prefix in ["formatted_", "final_", "humanized_", "redacted_"]:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+
+    if filename.lower().endswith('.pdf'):
+        filename = filename[:-4] + '.docx'
+
+    return os.path.join(folder, filename) if folder else filename
 
 
 def process_job(job_id):
@@ -231,73 +413,97 @@ def process_job(job_id):
 
     print(f"Found {len(files)} files.")
 
-    env_workers = os.getenv("ONECLICK_MAX_WORKERS")
-    if env_workers:
-        try:
-            max_workers = max(1, int(env_workers))
-        except ValueError:
-            max_workers = max(1, os.cpu_count() - 1)
-    else:
-        # Default: modest cap to reduce thrash on 16 GB machines
-        max_workers = min(4, max(1, os.cpu_count() - 1))
-    print(f"Using up to {max_workers} parallel workers")
-
     with tempfile.TemporaryDirectory() as temp_dir:
         output_files = []
-
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            future_map = {executor.submit(process_single_file, (file_key, job_id, temp_dir)): file_key for file_key in files}
-
-            completed = 0
-            for future in as_completed(future_map):
-                file_key = future_map[future]
-                completed += 1
+        pool = _get_worker_pool()
+        pool_lock = threading.Lock()
+        # Files downloaded but not yet processed: enough to keep every worker
+        # busy while the next downloads are in flight
+        slots = threading.BoundedSemaphore(_max_workers() + PREFETCH_DEPTH)
+
+        def submit(file_key, local_path):
+            nonlocal pool
+            try:
+                return pool.submit(process_single_file, (file_key, job_id, local_path))
+            except BrokenProcessPool:
+                # A worker died while the pool was idle
+                with pool_lock:
+                    if _worker_pool is pool:
+                        _reset_worker_pool()
+                        pool = _get_worker_pool()
+                return pool.submit(process_single_file, (file_key, job_id, local_path))
+
+        # (file_key, worker future, download error) for every file, in the
+        # order they finish, so results are zipped while later files are
+        # still downloading
+        finished = queue.Queue()
+
+        def fetch_and_submit(file_key):
+            slots.acquire()
+            local_path = os.path.join(temp_dir, f"{uuid4().hex}_{os.path.basename(file_key)}")
+            try:
+                minio_handler.download_to_path(file_key, local_path)
+                future = submit(file_key, local_path)
+            except BaseException as e:
+                slots.release()
+                _unlink_quietly(local_path)
+                finished.put((file_key, None, e))
+                raise
+
+            def on_done(done):
+                slots.release()
+                finished.put((file_key, done, None))
+
+            future.add_done_callback(on_done)
+
+        # Downloads overlap with processing: workers start on the first files
+        # while the following ones are still being fetched. The result zip is
+        # built as files finish, so it is complete when the last worker
+        # returns. Outputs are DOCX (already deflated), so they are stored
+        # rather than compressed a second time.
+        zip_path = os.path.join(temp_dir, "result.zip")
+        print("Zipping results with folder structure as they finish...")
+        broken = False
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_THREADS) as downloader, \
+                zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as zipf:
+            for file_key in files:
+                downloader.submit(fetch_and_submit, file_key)
+            for completed in range(1, len(files) + 1):
+                file_key, future, error = finished.get()
+                if future is None:
+                    print(f"[ERROR] Download failed for {file_key}: {error}")
+                    continue
                 try:
                     result = future.result()
                     if result:
+                        file_path, original_key = result
+                        try:
+                            zip_file_path = _zip_name(original_key, job_id)
+                            print(f"  Adding: {zip_file_path}")
+                            zipf.write(file_path, zip_file_path)
+                        finally:
+                            # Outputs live in the workers' scratch directories
+                            _unlink_quietly(file_path)
                         output_files.append(result)
                         print(f"[Progress] {completed}/{len(files)} finished")
                     else:
                         print(f"[Progress] {completed}/{len(files)} skipped or failed")
+                except BrokenProcessPool as e:
+                    broken = True
+                    print(f"[ERROR] Future failed for {file_key}: {e}")
                 except Exception as e:
                     print(f"[ERROR] Future failed for {file_key}: {e}")
+        if broken:
+            _reset_worker_pool()
 
         if not output_files:
             print("No files succeeded; aborting zip upload.")
             return False
 
-        zip_path = os.path.join(temp_dir, "result.zip")
-        print("Zipping results with folder structure...")
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for file_path, original_key in output_files:
-                relative_path = original_key.replace(f"jobs/{job_id}/raw/", "")
-                path_parts = relative_path.split('/')
-                if len(path_parts) > 1:
-                    relative_path = '/'.join(path_parts[1:])
-                else:
-                    relative_path = path_parts[0]
-
-                filename = os.path.basename(relative_path)
-                folder = os.path.dirname(relative_path)
-
-                for prefix in ["formatted_", "final_", "humanized_", "redacted_"]:
-                    if filename.startswith(prefix):
-                        filename = filename[len(prefix):]
-                        break
-
-                if filename.lower().endswith('.pdf'):
-                    filename = filename[:-4] + '.docx'
-
-                zip_file_path = os.path.join(folder, filename) if folder else filename
-
-                print(f"  Adding: {zip_file_path}")
-                zipf.write(file_path, zip_file_path)
-
         zip_key = f"jobs/{job_id}/result.zip"
         print(f"Uploading zip to {zip_key}...")
         try:
-            with open(zip_path, "rb") as f:
-                minio_handler.upload_file(zip_key, io.BytesIO(f.read()), "application/zip")
+            minio_handler.upload_path(zip_key, zip_path, "application/zip")
         except Exception as e:
             print(f"Failed to upload zip: {e}")
             return False
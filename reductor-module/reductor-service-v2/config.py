@@ -25,6 +25,13 @@ class Config:
 
     # Conversion
     TEMP_DIR = os.getenv("TEMP_DIR", "./tmp")
+    # PDF → DOCX results are cached in MinIO under this prefix, keyed by the PDF's SHA-256
+    CONVERSION_CACHE_ENABLED = os.getenv("CONVERSION_CACHE_ENABLED", "true").lower() == "true"
+    CONVERSION_CACHE_PREFIX = os.getenv("CONVERSION_CACHE_PREFIX", "cache/docx/v1")
+
+    # PII detection
+    # spaCy worker processes for large paragraph batches (each loads its own model copy)
+    NLP_PROCESSES = int(os.getenv("NLP_PROCESSES", 1))
 
 
 config = Config()
@@ -3,19 +3,51 @@ Presidio PII Detector - PRIMARY detection engine
 Uses Microsoft Presidio for intelligent PII detection.
 """
 
+import hashlib
 import logging
-from typing import List, Dict
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import spacy
 from presidio_analyzer import AnalyzerEngine, RecognizerRegistry, Pattern, PatternRecognizer
 from presidio_analyzer.nlp_engine import NlpEngineProvider
+from config import config
 
 logger = logging.getLogger(__name__)
 
+ENTITIES = ["PERSON", "STUDENT_ROLL_NUMBER"]
+
+# Roll numbers: 8-15 digit numbers. Also used to skip the roll number
+# recognizer (and its context scoring) on texts that cannot match it.
+ROLL_NUMBER_REGEX = r"\b\d{8,15}\b"
+_ROLL_NUMBER_RE = re.compile(ROLL_NUMBER_REGEX)
+
+# spaCy components Presidio never reads (it only uses tokens, lemmas and NER)
+UNUSED_PIPES = ["parser"]
+
+# Texts per spaCy nlp.pipe() batch in detect_batch
+BATCH_SIZE = 64
+# Starting worker processes costs more than it saves on smaller batches
+PARALLEL_MIN_TEXTS = 4 * BATCH_SIZE
+
+# Results cache for repeated paragraphs (cover pages, headers, boilerplate).
+# Longer texts are rarely repeated and are not cached.
+CACHE_MAX_ENTRIES = 8192
+CACHE_MAX_TEXT_LENGTH = 2048
+# Cached detections are stored as tuples of these fields rather than dicts,
+# which keeps a full cache several times smaller
+DETECTION_FIELDS = ("entity_type", "start", "end", "score", "text")
+
 
 class PresidioDetector:
     """Microsoft Presidio-based PII detector"""
     
     _instance = None
     _analyzer = None
+    _cache = None
+    _cache_lock = None
+    _n_process = 1
     
     def __new__(cls):
         """Singleton pattern - initialize once"""
@@ -28,18 +60,30 @@ class PresidioDetector:
         """Initialize Presidio analyzer engine ONCE"""
         try:
             logger.info("Initializing Presidio analyzer...")
+            self._cache = OrderedDict()
+            self._cache_lock = threading.Lock()
             
             # Create NLP engine with spaCy
+            model_name = self._select_spacy_model()
             nlp_configuration = {
                 "nlp_engine_name": "spacy",
-                "models": [{"lang_code": "en", "model_name": "en_core_web_sm"}],
+                "models": [{"lang_code": "en", "model_name": model_name}],
             }
+            # Worker processes only help the CPU model; the GPU is shared
+            if model_name != "en_core_web_trf":
+                self._n_process = max(1, config.NLP_PROCESSES)
             provider = NlpEngineProvider(nlp_configuration=nlp_configuration)
             nlp_engine = provider.create_engine()
+            self._tune_pipeline(nlp_engine)
             
             # Create custom registry
             registry = RecognizerRegistry()
             registry.load_predefined_recognizers(nlp_engine=nlp_engine)
+            # Only keep recognizers for the entities we ask for
+            registry.recognizers = [
+                r for r in registry.recognizers
+                if set(r.supported_entities) & set(ENTITIES)
+            ]
             
             # Add custom STUDENT_ROLL_NUMBER recognizer
             student_roll_recognizer = self._create_student_roll_recognizer()
@@ -57,6 +101,27 @@ class PresidioDetector:
             logger.error(f"❌ Failed to initialize Presidio: {e}")
             raise
     
+    @staticmethod
+    def _select_spacy_model() -> str:
+        """Use the transformer model when a GPU is available, else the small CPU model"""
+        if spacy.prefer_gpu() and spacy.util.is_package("en_core_web_trf"):
+            logger.info("GPU available, using en_core_web_trf")
+            return "en_core_web_trf"
+        return "en_core_web_sm"
+
+    @staticmethod
+    def _tune_pipeline(nlp_engine) -> None:
+        """Turn off spaCy components that do not contribute to PII detection.
+
+        The tagger/lemmatizer stay on: Presidio's context enhancer matches
+        keywords like "roll no" against lemmas.
+        """
+        for nlp in nlp_engine.nlp.values():
+            nlp.batch_size = BATCH_SIZE
+            for name in UNUSED_PIPES:
+                if name in nlp.pipe_names:
+                    nlp.disable_pipe(name)
+
     def _create_student_roll_recognizer(self) -> PatternRecognizer:
         """
         Create custom recognizer for student roll numbers.
@@ -65,7 +130,7 @@ class PresidioDetector:
         # Regex pattern for roll numbers (8-15 digits)
         roll_number_pattern = Pattern(
             name="roll_number_pattern",
-            regex=r"\b\d{8,15}\b",
+            regex=ROLL_NUMBER_REGEX,
             score=0.5  # Medium confidence from pattern alone
         )
         
@@ -104,34 +169,153 @@ class PresidioDetector:
         if not text or not text.strip():
             return []
         
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        # Errors propagate: a failed analysis must not pass for "no PII"
         try:
             # Analyze text for PII
             results = self._analyzer.analyze(
                 text=text,
                 language="en",
-                entities=["PERSON", "STUDENT_ROLL_NUMBER"]
+                entities=self._entities_for(text)
             )
-            
-            # Convert to dict format
-            detections = []
-            for result in results:
-                detections.append({
-                    "entity_type": result.entity_type,
-                    "start": result.start,
-                    "end": result.end,
-                    "score": result.score,
-                    "text": text[result.start:result.end]
-                })
-            
-            logger.info(f"Presidio detected {len(detections)} entities")
-            for det in detections:
-                logger.debug(f"  - {det['entity_type']}: '{det['text']}' (score={det['score']:.2f})")
-            
-            return detections
-            
         except Exception as e:
             logger.error(f"Presidio detection error: {e}")
-            return []
+            raise
+        
+        detections = self._to_detections(text, results)
+        self._cache_put(key, detections)
+        
+        logger.info(f"Presidio detected {len(detections)} entities")
+        for det in detections:
+            logger.debug(f"  - {det['entity_type']}: '{det['text']}' (score={det['score']:.2f})")
+        
+        return detections
+
+    def detect_batch(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Detect PII entities in many texts at once.
+        
+        The texts go through spaCy's nlp.pipe() together, which is much
+        cheaper than one pipeline call per short paragraph.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            One list of detections per input text, in the same format as detect()
+        """
+        detections = [[] for _ in texts]
+        # Texts still to analyze -> positions they occur at (duplicates analyzed once)
+        pending = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            if text in pending:
+                pending[text].append(i)
+                continue
+            cached = self._cache_get(self._cache_key(text))
+            if cached is not None:
+                detections[i] = cached
+            else:
+                pending[text] = [i]
+        
+        n_process = self._n_process if len(pending) >= PARALLEL_MIN_TEXTS else 1
+        try:
+            for text, nlp_artifacts in zip(pending, self._nlp_artifacts(list(pending), n_process)):
+                results = self._analyzer.analyze(
+                    text=text,
+                    language="en",
+                    entities=self._entities_for(text),
+                    nlp_artifacts=nlp_artifacts
+                )
+                text_detections = self._to_detections(text, results)
+                self._cache_put(self._cache_key(text), text_detections)
+                for i in pending[text]:
+                    detections[i] = [dict(d) for d in text_detections]
+        except Exception as e:
+            logger.error(f"Presidio batch detection error: {e}")
+            raise
+        
+        logger.info(
+            f"Presidio detected {sum(len(d) for d in detections)} entities in {len(texts)} texts "
+            f"({sum(len(v) for v in pending.values())} analyzed)"
+        )
+        return detections
+    
+    def _nlp_artifacts(self, texts: List[str], n_process: int = 1):
+        """
+        NlpArtifacts for each text, from one spaCy nlp.pipe() pass.
+        
+        process_batch() in the pinned presidio-analyzer (2.2.33) takes no
+        batch_size or n_process, so spaCy is run here and each doc is
+        converted the way the engine's process_text() converts it. Engines
+        without that conversion fall back to process_batch(), batched by
+        nlp.batch_size and in a single process.
+        """
+        if not texts:
+            return
+        nlp_engine = self._analyzer.nlp_engine
+        to_artifacts = getattr(nlp_engine, "_doc_to_nlp_artifact", None)
+        if to_artifacts is None:
+            for _, nlp_artifacts in nlp_engine.process_batch(texts=texts, language="en"):
+                yield nlp_artifacts
+            return
+        for doc in nlp_engine.nlp["en"].pipe(texts, batch_size=BATCH_SIZE, n_process=n_process):
+            yield to_artifacts(doc, "en")
+    
+    @staticmethod
+    def _cache_key(text: str) -> Optional[bytes]:
+        """Cache key for text, or None if it is too long to cache"""
+        if len(text) > CACHE_MAX_TEXT_LENGTH:
+            return None
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def _cache_get(self, key: Optional[bytes]) -> Optional[List[Dict]]:
+        """Copy of the cached detections for key, or None"""
+        if key is None:
+            return None
+        with self._cache_lock:
+            rows = self._cache.get(key)
+            if rows is None:
+                return None
+            self._cache.move_to_end(key)
+        return [dict(zip(DETECTION_FIELDS, row)) for row in rows]
+    
+    def _cache_put(self, key: Optional[bytes], detections: List[Dict]) -> None:
+        if key is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = tuple(
+                tuple(d[field] for field in DETECTION_FIELDS) for d in detections
+            )
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _entities_for(text: str) -> List[str]:
+        """Entities worth asking Presidio for; PERSON always needs NER"""
+        if _ROLL_NUMBER_RE.search(text):
+            return ENTITIES
+        return ["PERSON"]
+    
+    @staticmethod
+    def _to_detections(text: str, results) -> List[Dict]:
+        """Convert Presidio RecognizerResults to dict format"""
+        return [
+            {
+                "entity_type": result.entity_type,
+                "start": result.start,
+                "end": result.end,
+                "score": result.score,
+                "text": text[result.start:result.end]
+            }
+            for result in results
+        ]
 
 
 # Singleton instance
@@ -11,8 +11,29 @@ import re
 import logging
 from typing import Dict, List
 
+try:
+    import re2
+except ImportError:  # google-re2 not installed
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
+# Every label contains one of these words. Texts without any of them are
+# rejected with one linear-time scan (RE2 when installed) before the
+# backtracking line pattern runs; most paragraphs have no label at all.
+LABEL_HINT_REGEX = r"(?i)NAME|ROLL|ID"
+
+# Characters str.splitlines() breaks on, and whitespace that is not one of them.
+# Patterns run over the whole text but must not match across a line.
+LINE_BREAKS = r"\n\r\v\f\x1c-\x1e\x85\u2028\u2029"
+_HSPACE = rf"[^\S{LINE_BREAKS}]"
+_LINE_BREAK_RE = re.compile(rf"[{LINE_BREAKS}]")
+# Whitespace running to the end of the line, which a line-by-line scan strips
+_TRAILING_SPACE = rf"{_HSPACE}*+(?:[{LINE_BREAKS}]|\Z)"
+
+# Entity type reported for each named group of the line pattern
+ENTITY_TYPES = {"name": "PERSON", "roll": "STUDENT_ROLL_NUMBER"}
+
 
 class RegexDetector:
     """Regex-based PII detector - handles both table and non-table formats"""
@@ -21,15 +42,26 @@ class RegexDetector:
         """Initialize regex patterns for comprehensive coverage"""
         
         # Strict line-based label patterns; require label on the same line.
-        self.name_line_pattern = re.compile(
-            r"(?:LEARNER\s+NAME|STUDENT\s+NAME|NAME)\s*[:\-\|=]?\s*([A-Z][A-Za-z\s\.'\-]{2,100})",
-            re.IGNORECASE,
+        # Quantifiers are possessive (*+, ++) so runs of whitespace or OCR
+        # junk are never re-split while backtracking.
+        name_line_pattern = (
+            rf"(?:LEARNER{_HSPACE}++NAME|STUDENT{_HSPACE}++NAME|NAME){_HSPACE}*+[:\-\|=]?{_HSPACE}*+"
+            rf"(?P<name>[A-Z](?:[A-Za-z\.'\-]|{_HSPACE}(?!{_TRAILING_SPACE})){{2,100}}+)"
         )
 
-        self.roll_line_pattern = re.compile(
-            r"(?:LEARNER\s+ROLL|ROLL\s+(?:NUMBER|NO\.?|NUM\.?|#)|ENROLLMENT\s+(?:NO|NUMBER)|ID\s*(?:NO|NUMBER)?)\s*[:\-\|=]?\s*(\d{4,20})",
+        roll_line_pattern = (
+            rf"(?:LEARNER{_HSPACE}++ROLL|ROLL{_HSPACE}++(?:NUMBER|NO\.?|NUM\.?|#)|ENROLLMENT{_HSPACE}++(?:NO|NUMBER)|ID{_HSPACE}*+(?:NO|NUMBER)?)"
+            rf"{_HSPACE}*+[:\-\|=]?{_HSPACE}*+(?P<roll>\d{{4,20}})"
+        )
+
+        # Both patterns in one pass. The lookahead keeps a name match from
+        # consuming a roll label that follows it on the line (and vice versa).
+        self.line_pattern = re.compile(
+            rf"(?=(?:{name_line_pattern})|(?:{roll_line_pattern}))",
             re.IGNORECASE,
         )
+
+        self.label_hint_pattern = (re2 or re).compile(LABEL_HINT_REGEX)
     
     def detect(self, text: str) -> List[Dict]:
         """
@@ -48,35 +80,33 @@ class RegexDetector:
         """
         if not text or not text.strip():
             return []
+        if not self.label_hint_pattern.search(text):
+            return []
         
         detections = []
         
-        for line in text.splitlines():
-            stripped = line.strip()
-            if not stripped:
+        # A line-by-line scan reports the first name and first roll number on each line
+        line_end = -1
+        found_on_line = set()
+        for m in self.line_pattern.finditer(text):
+            if m.start() >= line_end:
+                next_break = _LINE_BREAK_RE.search(text, m.start())
+                line_end = next_break.start() if next_break else len(text)
+                found_on_line.clear()
+
+            group = "name" if m.group("name") is not None else "roll"
+            if group in found_on_line:
                 continue
+            found_on_line.add(group)
 
-            m_name = self.name_line_pattern.search(stripped)
-            if m_name:
-                name = m_name.group(1).strip()
-                detections.append({
-                    "entity_type": "PERSON",
-                    "start": m_name.start(1),
-                    "end": m_name.end(1),
-                    "score": 0.85,
-                    "text": name,
-                })
-
-            m_roll = self.roll_line_pattern.search(stripped)
-            if m_roll:
-                roll = m_roll.group(1).strip()
-                detections.append({
-                    "entity_type": "STUDENT_ROLL_NUMBER",
-                    "start": m_roll.start(1),
-                    "end": m_roll.end(1),
-                    "score": 0.85,
-                    "text": roll,
-                })
+            value = m.group(group).strip()
+            detections.append({
+                "entity_type": ENTITY_TYPES[group],
+                "start": m.start(group),
+                "end": m.start(group) + len(value),
+                "score": 0.85,
+                "text": value,
+            })
 
         return detections
 
@@ -4,25 +4,28 @@ main.py
 Reductor Service v2: FastAPI entry point
 """
 
+import hashlib
 import os
 import shutil
 import tempfile
-import io
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
 from config import config
 from logger import get_logger
 from utils.minio_utils import minio_client
-from utils.converter_utils import pdf_to_docx
+from utils.converter_utils import pdf_to_docx_file
 from utils.identity_detector import detect_identity
-from utils.docx_anonymizer import anonymize_docx, load_xml
+from utils.docx_anonymizer import anonymize_docx, load_xml_from_docx
 from utils.docx_sanitizer import sanitize_docx_inplace
-from pipeline.redact_pipeline import RedactionPipeline
+from pipeline.redact_pipeline import get_redaction_pipeline
 
 logger = get_logger(__name__)
 
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 app = FastAPI(
     title=config.APP_NAME,
     version=config.APP_VERSION,
@@ -59,6 +62,98 @@ class PresidioRedactResponse(BaseModel):
     pii_types: list
 
 
+@app.on_event("startup")
+def load_redaction_pipeline():
+    """Load spaCy/Presidio before the first /presidio-redact request instead of during it"""
+    get_redaction_pipeline()
+
+
+def _convert_pdf_cached(bucket: str, pdf_data, converted_path: str) -> None:
+    """
+    Convert PDF → DOCX into converted_path, reusing the DOCX from an earlier
+    conversion of the same PDF bytes when one is cached in MinIO.
+    """
+    if not config.CONVERSION_CACHE_ENABLED:
+        pdf_to_docx_file(pdf_data, converted_path)
+        return
+
+    digest = hashlib.sha256(pdf_data.getbuffer()).hexdigest()
+    cache_key = f"{config.CONVERSION_CACHE_PREFIX}/{digest}.docx"
+    try:
+        if minio_client.download_to_path_if_exists(bucket, cache_key, converted_path):
+            logger.info(f"✅ Reusing cached conversion {cache_key}")
+            return
+    except Exception as e:
+        logger.warning(f"Conversion cache lookup failed: {e}")
+
+    pdf_to_docx_file(pdf_data, converted_path)
+
+    try:
+        minio_client.upload_file(bucket, cache_key, converted_path, DOCX_CONTENT_TYPE)
+    except Exception as e:
+        logger.warning(f"Could not cache conversion: {e}")
+
+
+def _detect_identity_in_docx(docx_path: str):
+    """Detect student identity in a DOCX; returns (identity, parsed document.xml)"""
+    tree = load_xml_from_docx(docx_path)
+    return detect_identity(tree), tree
+
+
+def _extract_paragraphs(docx_path: str):
+    """
+    Parse a DOCX and return (document, non-empty paragraphs, their texts).
+    """
+    from docx import Document
+    doc = Document(docx_path)
+    # python-docx rebuilds paragraph.text on every access; read each once
+    paragraphs = []
+    para_texts = []
+    for paragraph in doc.paragraphs:
+        text = paragraph.text
+        if text.strip():
+            paragraphs.append(paragraph)
+            para_texts.append(text)
+    return doc, paragraphs, para_texts
+
+
+def _apply_redactions(paragraphs, para_texts, redacted_para_texts) -> None:
+    """Write redacted paragraph texts back into their runs, keeping run formatting"""
+    for paragraph, original_para_text, redacted_para_text in zip(paragraphs, para_texts, redacted_para_texts):
+        # If text was redacted, intelligently replace while preserving run formatting
+        if original_para_text != redacted_para_text:
+            runs = list(paragraph.runs)
+            if not runs:
+                continue
+            # Each run.text read rebuilds the string from XML, and each write
+            # replaces the run's children; read every run once, write only
+            # the runs whose text actually changes.
+            run_texts = [run.text for run in runs]
+
+            # Distribute redacted text across existing runs sequentially, preserving formatting
+            # This keeps bullets/numbering alignment intact. Empty runs keep their text (None).
+            segments = []
+            red_idx = 0
+            total_len = len(redacted_para_text)
+            for run_text in run_texts:
+                if not run_text:
+                    segments.append(None)
+                    continue
+                end_idx = min(red_idx + len(run_text), total_len)
+                segments.append(redacted_para_text[red_idx:end_idx])
+                red_idx = end_idx
+            # Append any remaining characters to the last run without clearing styles
+            if red_idx < total_len:
+                last = segments[-1] if segments[-1] is not None else run_texts[-1]
+                segments[-1] = last + redacted_para_text[red_idx:]
+
+            for run, run_text, segment in zip(runs, run_texts, segments):
+                if segment is not None and segment != run_text:
+                    run.text = segment
+
+            logger.debug(f"Redacted paragraph: {len(original_para_text)} → {len(redacted_para_text)} chars")
+
+
 # Routes
 @app.get("/health")
 def health():
@@ -70,7 +165,7 @@ def health():
 
 
 @app.post("/anonymize", response_model=AnonymizeResponse)
-def anonymize(req: AnonymizeRequest):
+async def anonymize(req: AnonymizeRequest):
     """
     End-to-end anonymization pipeline:
     1. Download PDF from MinIO raw/
@@ -97,38 +192,36 @@ def anonymize(req: AnonymizeRequest):
 
         # Step 1: Download PDF from MinIO
         logger.info("\n[1/6] Downloading PDF from MinIO...")
-        pdf_data = minio_client.download(req.bucket, req.object_key)
+        pdf_data = await run_in_threadpool(minio_client.download, req.bucket, req.object_key)
 
         # Step 2: Convert PDF → DOCX
         logger.info("\n[2/6] Converting PDF to DOCX...")
-        docx_data = pdf_to_docx(pdf_data)
-        with open(converted_path, "wb") as f:
-            f.write(docx_data.getvalue())
+        await run_in_threadpool(_convert_pdf_cached, req.bucket, pdf_data, converted_path)
         logger.info(f"✅ Saved to {converted_path}")
 
         # Sanitize converted DOCX to fix glyph artifacts
         logger.info("[2.5/6] Sanitizing converted DOCX for glyph cleanup...")
-        sanitize_docx_inplace(converted_path)
+        await run_in_threadpool(sanitize_docx_inplace, converted_path)
 
 
         # Step 3: Detect identity BEFORE
         logger.info("\n[3/6] Detecting student identity (BEFORE anonymization)...")
-        from utils.docx_anonymizer import unzip_docx
-        temp_unzip = unzip_docx(converted_path)
-        tree_before = load_xml(os.path.join(temp_unzip, "word/document.xml"))
-        identity_before = detect_identity(tree_before)
+        identity_before, tree_before = await run_in_threadpool(_detect_identity_in_docx, converted_path)
         logger.info(f"✅ Detected: {identity_before}")
-        shutil.rmtree(temp_unzip)
 
         # Step 4: Anonymize (robust: try all detected PII if needed)
         logger.info("\n[4/6] Anonymizing (removing name and roll)...")
         name = identity_before.get("name")
         roll_no = identity_before.get("roll_no")
-        anon_stats = anonymize_docx(
+        # Reuses the tree parsed in step 3 and hands back the anonymized one for step 5
+        anon_stats, tree_after = await run_in_threadpool(
+            anonymize_docx,
             converted_path,
             anonymized_path,
             name=name,
             roll_no=roll_no,
+            document_tree=tree_before,
+            return_tree=True,
         )
 
         # If nothing was removed, try all detected entities (fallback for edge cases)
@@ -141,37 +234,39 @@ def anonymize(req: AnonymizeRequest):
                 # Always use converted_path as input, temp file as output
                 with tempfile.NamedTemporaryFile(suffix='_anonymized.docx', delete=False) as tmp:
                     temp_output = tmp.name
+                tree_after = None
                 if ent_type == "PERSON":
-                    stats2 = anonymize_docx(converted_path, temp_output, name=ent_val)
+                    stats2, tree_after = await run_in_threadpool(
+                        anonymize_docx, converted_path, temp_output, name=ent_val, return_tree=True
+                    )
                     anon_stats["removed_name"] += stats2.get("removed_name", 0)
                 elif ent_type == "STUDENT_ROLL_NUMBER":
-                    stats2 = anonymize_docx(converted_path, temp_output, roll_no=ent_val)
+                    stats2, tree_after = await run_in_threadpool(
+                        anonymize_docx, converted_path, temp_output, roll_no=ent_val, return_tree=True
+                    )
                     anon_stats["removed_roll"] += stats2.get("removed_roll", 0)
-                # After each fallback, copy temp_output to anonymized_path for next step
-                # shutil, os imported globally
-                shutil.copy(temp_output, anonymized_path)
-                os.remove(temp_output)
+                # After each fallback, move temp_output to anonymized_path for next step
+                # (a rename when both are on the same filesystem)
+                shutil.move(temp_output, anonymized_path)
             logger.info(f"Fallback anonymization complete: {anon_stats}")
 
         # Step 5: Detect identity AFTER
         logger.info("\n[5/6] Detecting student identity (AFTER anonymization)...")
-        temp_unzip = unzip_docx(anonymized_path)
-        tree_after = load_xml(os.path.join(temp_unzip, "word/document.xml"))
-        identity_after = detect_identity(tree_after)
+        if tree_after is not None:
+            identity_after = await run_in_threadpool(detect_identity, tree_after)
+        else:
+            identity_after, _ = await run_in_threadpool(_detect_identity_in_docx, anonymized_path)
         logger.info(f"✅ After anonymization: {identity_after}")
-        shutil.rmtree(temp_unzip)
 
         # Step 6: Upload to MinIO
         logger.info("\n[6/6] Uploading anonymized DOCX to MinIO...")
         output_key = req.output_key or req.object_key.replace("/raw/", "/formatted/").replace(".pdf", "_anonymized.docx")
-        with open(anonymized_path, "rb") as f:
-            # io imported globally
-            buf = io.BytesIO(f.read())
-        minio_client.upload(
+        await run_in_threadpool(
+            minio_client.upload_file,
             req.bucket,
             output_key,
-            buf,
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            anonymized_path,
+            DOCX_CONTENT_TYPE,
         )
 
         logger.info(f"\n{'='*60}")
@@ -193,7 +288,7 @@ def anonymize(req: AnonymizeRequest):
 
 
 @app.post("/presidio-redact", response_model=PresidioRedactResponse)
-def presidio_redact(req: PresidioRedactRequest):
+async def presidio_redact(req: PresidioRedactRequest):
     """
     Presidio-based PII redaction pipeline:
     1. Download PDF from MinIO
@@ -211,8 +306,8 @@ def presidio_redact(req: PresidioRedactRequest):
         logger.info(f"   Object: {req.object_key}")
         logger.info(f"{'='*60}")
 
-        # Initialize redaction pipeline
-        pipeline = RedactionPipeline()
+        # Shared redaction pipeline (models loaded at startup)
+        pipeline = get_redaction_pipeline()
 
         # Temp directory for local artifacts
         temp_dir = config.TEMP_DIR
@@ -224,85 +319,42 @@ def presidio_redact(req: PresidioRedactRequest):
 
         # Step 1: Download PDF from MinIO
         logger.info("\n[1/5] Downloading PDF from MinIO...")
-        pdf_data = minio_client.download(req.bucket, req.object_key)
+        pdf_data = await run_in_threadpool(minio_client.download, req.bucket, req.object_key)
 
         # Step 2: Convert PDF → DOCX
         logger.info("\n[2/5] Converting PDF to DOCX...")
-        docx_data = pdf_to_docx(pdf_data)
-        with open(converted_path, "wb") as f:
-            f.write(docx_data.getvalue())
+        await run_in_threadpool(_convert_pdf_cached, req.bucket, pdf_data, converted_path)
         logger.info(f"✅ Saved to {converted_path}")
 
         # Sanitize converted DOCX to fix glyph artifacts
         logger.info("[2.5/5] Sanitizing converted DOCX for glyph cleanup...")
-        sanitize_docx_inplace(converted_path)
+        await run_in_threadpool(sanitize_docx_inplace, converted_path)
 
         # Step 3: Extract text from DOCX
         logger.info("\n[3/5] Extracting text from DOCX...")
-        from docx import Document
-        doc = Document(converted_path)
-        full_text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-        logger.info(f"✅ Extracted {len(full_text)} characters")
+        doc, paragraphs, para_texts = await run_in_threadpool(_extract_paragraphs, converted_path)
+        logger.info(f"✅ Extracted {sum(len(text) for text in para_texts)} characters in {len(para_texts)} paragraphs")
 
         # Step 4: Run Presidio + Regex detection
+        # All paragraphs go through the pipeline in one batch; the same pass
+        # drives both the report and the redaction (labels preserved)
         logger.info("\n[4/5] Running Presidio + Regex PII detection...")
-        redacted_text, stats = pipeline.redact_text(full_text)
+        redacted = await run_in_threadpool(pipeline.redact_texts, para_texts)
         
         # Get detection statistics from stats
-        all_detections = stats.get('entities', [])
+        all_detections = [det for _, stats in redacted for det in stats.get('entities', [])]
         pii_types = list(set([det['entity_type'] for det in all_detections]))
         logger.info(f"✅ Detected {len(all_detections)} PII entities: {pii_types}")
 
         # Step 5: Apply redactions to DOCX while preserving formatting
         logger.info("\n[5/5] Applying redactions to DOCX (preserving formatting & labels)...")
         
-        # Use redaction pipeline directly on DOCX paragraph content
-        doc = Document(converted_path)
-        
-        for paragraph in doc.paragraphs:
-            if not paragraph.text.strip():
-                continue
-            
-            # Get original paragraph text
-            original_para_text = paragraph.text
-            
-            # Run through redaction pipeline (which preserves labels)
-            redacted_para_text, _ = pipeline.redact_text(original_para_text)
-            
-            # If text was redacted, intelligently replace while preserving run formatting
-            if original_para_text != redacted_para_text:
-                # Build character position map from runs
-                runs = list(paragraph.runs)
-                if not runs:
-                    continue
-                
-                # Calculate which characters belong to which run
-                run_char_ranges = []
-                char_pos = 0
-                for run in runs:
-                    run_len = len(run.text)
-                    run_char_ranges.append((char_pos, char_pos + run_len, run))
-                    char_pos += run_len
-                
-                # Distribute redacted text across existing runs sequentially, preserving formatting
-                # This keeps bullets/numbering alignment intact.
-                red_idx = 0
-                total_len = len(redacted_para_text)
-                for run in runs:
-                    orig_len = len(run.text)
-                    if orig_len <= 0:
-                        continue
-                    end_idx = min(red_idx + orig_len, total_len)
-                    segment = redacted_para_text[red_idx:end_idx]
-                    run.text = segment
-                    red_idx = end_idx
-                # Append any remaining characters to the last run without clearing styles
-                if red_idx < total_len:
-                    runs[-1].text = (runs[-1].text or "") + redacted_para_text[red_idx:]
-                
-                logger.debug(f"Redacted paragraph: {len(original_para_text)} → {len(redacted_para_text)} chars")
+        # Use redaction pipeline results directly on DOCX paragraph content
+        # (the document parsed in step 3 is still unmodified)
+        redacted_para_texts = [text for text, _ in redacted]
+        await run_in_threadpool(_apply_redactions, paragraphs, para_texts, redacted_para_texts)
         
-        doc.save(redacted_path)
+        await run_in_threadpool(doc.save, redacted_path)
         logger.info(f"✅ Redactions applied to {redacted_path} (labels preserved)")
 
         # Step 6: Upload to MinIO
@@ -310,14 +362,12 @@ def presidio_redact(req: PresidioRedactRequest):
         # Step 6: Upload to MinIO
         logger.info("\n[6/6] Uploading redacted DOCX to MinIO...")
         output_key = req.output_key or req.object_key.replace("/raw/", "/anonymized/").replace(".pdf", "_redacted.docx")
-        with open(redacted_path, "rb") as f:
-            import io
-            buf = io.BytesIO(f.read())
-        minio_client.upload(
+        await run_in_threadpool(
+            minio_client.upload_file,
             req.bucket,
             output_key,
-            buf,
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            redacted_path,
+            DOCX_CONTENT_TYPE,
         )
 
         logger.info(f"\n{'='*60}")
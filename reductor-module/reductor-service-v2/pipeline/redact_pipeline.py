@@ -11,6 +11,7 @@ Pipeline:
 6. Return redacted text
 """
 
+import bisect
 import logging
 import re
 from typing import List, Dict, Tuple
@@ -19,6 +20,36 @@ from detectors.regex_detector import get_regex_detector
 
 logger = logging.getLogger(__name__)
 
+# Math indicators: equations, matrices, symbols
+MATH_REGEXES = [
+    r"\\[a-zA-Z]+",  # LaTeX commands
+    r"[=∫∑∏∂Δ√≈≠≤≥±×÷]",  # Math symbols
+    r"\^\d|_\d",  # Superscript/subscript
+    r"\[\s*\[|\]\s*\]",  # Matrix brackets
+    # Only tried at the start of a digit run: a search over a long run of
+    # digits would otherwise rescan it from every position
+    r"(?<!\d)\d+[a-zA-Z]\s*[=≈]",  # Variable equations like "2x ="
+    r"[A-Z]\s*=\s*\[",  # Matrix definitions
+    r"d[A-Z]/d[A-Z]",  # Derivatives
+    r"Ep\s*=",  # Elasticity formulas
+    r"\(\s*[A-Z]\s*=\s*\d+",  # Coordinate/value pairs
+]
+# All of them in one alternation, so a line is scanned once rather than once per pattern
+MATH_PATTERN = re.compile("|".join(f"(?:{regex})" for regex in MATH_REGEXES))
+
+# Labels required on the same line before a value is redacted
+_PERSON_LABEL = r"(name|student\s+name|submitted\s+by|author|student)\s*[:–-]?\s*"
+_ROLL_LABEL = r"(roll\s*no|roll\s*number|roll|student\s*id|enrollment\s*no|id\s*no|enrollment)\s*[:–-]?\s*"
+LABEL_PATTERNS = {
+    "PERSON": re.compile(r"(?i)" + _PERSON_LABEL),
+    "STUDENT_ROLL_NUMBER": re.compile(r"(?i)" + _ROLL_LABEL),
+}
+# The same labels at the start of a detected span
+INLINE_LABEL_PATTERNS = {
+    "PERSON": re.compile(r"(?i)\s*" + _PERSON_LABEL),
+    "STUDENT_ROLL_NUMBER": re.compile(r"(?i)\s*" + _ROLL_LABEL),
+}
+
 
 class RedactionPipeline:
     """Combines Presidio and Regex detection for comprehensive PII redaction"""
@@ -43,25 +74,39 @@ class RedactionPipeline:
         """
         merged = list(presidio_detections)  # Start with Presidio (higher priority)
         
+        # Presidio spans by entity type, sorted by start, with the running
+        # maximum of their ends so the backwards scan below can stop early
+        by_type: Dict[str, Tuple[List[int], List[int], List[Dict]]] = {}
+        for pres_det in sorted(presidio_detections, key=lambda d: d["start"]):
+            starts, max_ends, dets = by_type.setdefault(pres_det["entity_type"], ([], [], []))
+            starts.append(pres_det["start"])
+            max_ends.append(max(pres_det["end"], max_ends[-1]) if max_ends else pres_det["end"])
+            dets.append(pres_det)
+        
         for regex_det in regex_detections:
             is_duplicate = False
+            regex_length = regex_det["end"] - regex_det["start"]
             
             # Check if this regex detection overlaps with any Presidio detection
-            for pres_det in presidio_detections:
-                if regex_det["entity_type"] == pres_det["entity_type"]:
-                    # Calculate overlap
-                    overlap_start = max(regex_det["start"], pres_det["start"])
-                    overlap_end = min(regex_det["end"], pres_det["end"])
-                    overlap_length = max(0, overlap_end - overlap_start)
-                    
-                    regex_length = regex_det["end"] - regex_det["start"]
-                    pres_length = pres_det["end"] - pres_det["start"]
-                    
-                    # If >50% overlap, consider duplicate
-                    if overlap_length > 0.5 * min(regex_length, pres_length):
-                        is_duplicate = True
-                        logger.debug(f"Skipping duplicate: '{regex_det['text']}'")
-                        break
+            # of its type: only spans starting before it ends can overlap, and
+            # none at or before index i once max_ends[i] <= its start
+            starts, max_ends, dets = by_type.get(regex_det["entity_type"], ([], [], []))
+            i = bisect.bisect_left(starts, regex_det["end"]) - 1
+            while i >= 0 and max_ends[i] > regex_det["start"]:
+                pres_det = dets[i]
+                i -= 1
+                # Calculate overlap
+                overlap_start = max(regex_det["start"], pres_det["start"])
+                overlap_end = min(regex_det["end"], pres_det["end"])
+                overlap_length = max(0, overlap_end - overlap_start)
+                
+                pres_length = pres_det["end"] - pres_det["start"]
+                
+                # If >50% overlap, consider duplicate
+                if overlap_length > 0.5 * min(regex_length, pres_length):
+                    is_duplicate = True
+                    logger.debug(f"Skipping duplicate: '{regex_det['text']}'")
+                    break
             
             if not is_duplicate:
                 # Always add regex detections - they're our safety net for names/rolls
@@ -92,14 +137,7 @@ class RedactionPipeline:
             - entities: List of detected entities
         """
         if not text or not text.strip():
-            return text, {
-                "total_detections": 0,
-                "presidio_count": 0,
-                "regex_count": 0,
-                "names_redacted": 0,
-                "rolls_redacted": 0,
-                "entities": []
-            }
+            return text, self._empty_stats()
         
         logger.info(f"Starting redaction pipeline on {len(text)} characters")
         
@@ -108,81 +146,155 @@ class RedactionPipeline:
         presidio_detections = self.presidio_detector.detect(text)
         logger.info(f"Presidio found {len(presidio_detections)} entities")
         
+        return self._redact_detected(text, presidio_detections)
+    
+    def redact_texts(self, texts: List[str]) -> List[Tuple[str, Dict]]:
+        """
+        Redact PII from many texts (e.g. every paragraph of a document).
+        
+        Same result as calling redact_text() on each text, but Presidio
+        analyzes them in one batch and repeated texts (headers, "Name:"
+        lines and other boilerplate) are processed once.
+        
+        Args:
+            texts: Input texts to redact
+            
+        Returns:
+            One (redacted_text, stats) tuple per input text
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        logger.info(f"Running Presidio detector on {len(texts)} texts ({len(unique_texts)} unique)...")
+        presidio_batch = self.presidio_detector.detect_batch(unique_texts)
+        
+        redacted_by_text = {}
+        for text, presidio_detections in zip(unique_texts, presidio_batch):
+            if not text or not text.strip():
+                redacted_by_text[text] = (text, self._empty_stats())
+            else:
+                redacted_by_text[text] = self._redact_detected(text, presidio_detections, log_level=logging.DEBUG)
+        
+        # Repeats get their own stats so callers can't alias each other's entities
+        results = []
+        seen = set()
+        for text in texts:
+            redacted_text, stats = redacted_by_text[text]
+            if text in seen:
+                stats = {**stats, "entities": [dict(d) for d in stats["entities"]]}
+            seen.add(text)
+            results.append((redacted_text, stats))
+        
+        logger.info(
+            f"Redaction complete for {len(texts)} texts: "
+            f"{sum(stats['names_redacted'] for _, stats in results)} names, "
+            f"{sum(stats['rolls_redacted'] for _, stats in results)} rolls"
+        )
+        return results
+    
+    def detect_texts(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Detect PII in many texts without redacting them.
+        
+        Args:
+            texts: Input texts to analyze
+            
+        Returns:
+            One list of merged Presidio + Regex detections per input text,
+            the same list redact_texts() reports as stats["entities"]
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        logger.info(f"Running Presidio detector on {len(texts)} texts ({len(unique_texts)} unique)...")
+        presidio_batch = self.presidio_detector.detect_batch(unique_texts)
+        
+        merged_by_text = {}
+        for text, presidio_detections in zip(unique_texts, presidio_batch):
+            if not text or not text.strip():
+                merged_by_text[text] = []
+            else:
+                regex_detections = self.regex_detector.detect(text)
+                merged_by_text[text] = self._merge_detections(presidio_detections, regex_detections)
+        
+        return [[dict(d) for d in merged_by_text[text]] for text in texts]
+    
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            "total_detections": 0,
+            "presidio_count": 0,
+            "regex_count": 0,
+            "names_redacted": 0,
+            "rolls_redacted": 0,
+            "entities": []
+        }
+    
+    def _redact_detected(self, text: str, presidio_detections: List[Dict], log_level: int = logging.INFO) -> Tuple[str, Dict]:
+        """
+        Run the regex safety net and redact, given Presidio's detections for text.
+        
+        Batches log per-text progress at log_level=DEBUG and summarize once instead.
+        """
         # Step 2: Run Regex (SECONDARY)
-        logger.info("Running Regex detector...")
+        logger.log(log_level, "Running Regex detector...")
         regex_detections = self.regex_detector.detect(text)
-        logger.info(f"Regex found {len(regex_detections)} entities")
+        logger.log(log_level, f"Regex found {len(regex_detections)} entities")
         
         # Step 3: Merge detections
         merged_detections = self._merge_detections(presidio_detections, regex_detections)
-        logger.info(f"Merged to {len(merged_detections)} unique entities")
+        logger.log(log_level, f"Merged to {len(merged_detections)} unique entities")
         
-        # Step 4: Redact text
-        redacted_text = text
+        # Step 4: Redact text, in place in a character buffer joined once at the end
+        buf = list(text)
         names_count = 0
         rolls_count = 0
 
-        def _is_formula_line(global_start: int) -> bool:
-            """Detect if line contains mathematical formulas/notation."""
-            line_start = redacted_text.rfind("\n", 0, global_start)
-            if line_start == -1:
-                line_start = 0
-            else:
-                line_start += 1
+        # Redactions keep the text length (values become spaces), so line
+        # boundaries can be indexed once up front
+        line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        # Per-line results, dropped when a redaction changes the line
+        formula_lines: Dict[int, bool] = {}
+        label_ends: Dict[Tuple[int, str], int] = {}
 
-            line_end = redacted_text.find("\n", global_start)
-            if line_end == -1:
-                line_end = len(redacted_text)
+        def _line_index(global_start: int) -> int:
+            return bisect.bisect_right(line_starts, global_start) - 1
 
-            line_text = redacted_text[line_start:line_end]
-            
-            # Math indicators: equations, matrices, symbols
-            math_patterns = [
-                r"\\[a-zA-Z]+",  # LaTeX commands
-                r"[=∫∑∏∂Δ√≈≠≤≥±×÷]",  # Math symbols
-                r"\^\d|_\d",  # Superscript/subscript
-                r"\[\s*\[|\]\s*\]",  # Matrix brackets
-                r"\d+[a-zA-Z]\s*[=≈]",  # Variable equations like "2x ="
-                r"[A-Z]\s*=\s*\[",  # Matrix definitions
-                r"d[A-Z]/d[A-Z]",  # Derivatives
-                r"Ep\s*=",  # Elasticity formulas
-                r"\(\s*[A-Z]\s*=\s*\d+",  # Coordinate/value pairs
-            ]
-            
-            for pat in math_patterns:
-                if re.search(pat, line_text):
-                    return True
-            return False
+        def _line_text(line: int) -> str:
+            line_start = line_starts[line]
+            line_end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(buf)
+            return "".join(buf[line_start:line_end])
+
+        def _is_formula_line(global_start: int) -> bool:
+            """Detect if line contains mathematical formulas/notation."""
+            line = _line_index(global_start)
+            if line not in formula_lines:
+                formula_lines[line] = MATH_PATTERN.search(_line_text(line)) is not None
+            return formula_lines[line]
 
         def _label_on_line(global_start: int, entity_type: str) -> int:
             """Return label end on same line if present, else -1."""
             if global_start < 0:
                 return -1
 
-            line_start = redacted_text.rfind("\n", 0, global_start)
-            if line_start == -1:
-                line_start = 0
-            else:
-                line_start += 1
-
-            line_end = redacted_text.find("\n", global_start)
-            if line_end == -1:
-                line_end = len(redacted_text)
-
-            line_text = redacted_text[line_start:line_end]
-            offset_base = line_start
+            line = _line_index(global_start)
+            key = (line, entity_type)
+            if key not in label_ends:
+                label_ends[key] = -1
+                pattern = LABEL_PATTERNS.get(entity_type)
+                if pattern is not None:
+                    m = pattern.search(_line_text(line))
+                    if m:
+                        label_ends[key] = line_starts[line] + m.end()
+            return label_ends[key]
 
-            patterns = []
-            if entity_type == "PERSON":
-                patterns = [r"(?i)(name|student\s+name|submitted\s+by|author|student)\s*[:–-]?\s*"]
-            elif entity_type == "STUDENT_ROLL_NUMBER":
-                patterns = [r"(?i)(roll\s*no|roll\s*number|roll|student\s*id|enrollment\s*no|id\s*no|enrollment)\s*[:–-]?\s*"]
-
-            for pat in patterns:
-                m = re.search(pat, line_text)
-                if m:
-                    return offset_base + m.end()
-            return -1
+        def _forget_lines(start: int, end: int) -> None:
+            if "\n" in text[start:end]:
+                # The span joined lines; index the redacted text again
+                line_starts[:] = [0] + [i + 1 for i, char in enumerate(buf) if char == "\n"]
+                formula_lines.clear()
+                label_ends.clear()
+                return
+            for line in range(_line_index(start), _line_index(end - 1) + 1):
+                formula_lines.pop(line, None)
+                for entity_type in LABEL_PATTERNS:
+                    label_ends.pop((line, entity_type), None)
         
         # Process in reverse order to maintain positions
         for detection in reversed(merged_detections):
@@ -206,12 +318,11 @@ class RedactionPipeline:
             adjusted_start = label_end
 
             # Also trim inline label if detector span includes it
-            span_text = redacted_text[start:end]
+            span_text = "".join(buf[start:end])
             inline_label = None
-            if entity_type == "PERSON":
-                inline_label = re.match(r"(?i)\s*(name|student\s+name|submitted\s+by|author|student)\s*[:–-]?\s*", span_text)
-            elif entity_type == "STUDENT_ROLL_NUMBER":
-                inline_label = re.match(r"(?i)\s*(roll\s*no|roll\s*number|roll|student\s*id|enrollment\s*no|id\s*no|enrollment)\s*[:–-]?\s*", span_text)
+            inline_pattern = INLINE_LABEL_PATTERNS.get(entity_type)
+            if inline_pattern is not None:
+                inline_label = inline_pattern.match(span_text)
 
             if inline_label and inline_label.end() < len(span_text):
                 adjusted_start = max(adjusted_start, start + inline_label.end())
@@ -221,8 +332,8 @@ class RedactionPipeline:
                 continue
 
             # Replace detected value with spaces (leave label intact)
-            redaction = " " * (end - adjusted_start)
-            redacted_text = redacted_text[:adjusted_start] + redaction + redacted_text[end:]
+            buf[adjusted_start:end] = " " * (end - adjusted_start)
+            _forget_lines(adjusted_start, end)
 
             # Count by type
             if entity_type == "PERSON":
@@ -238,6 +349,8 @@ class RedactionPipeline:
                 end,
             )
         
+        redacted_text = "".join(buf)
+        
         # Step 5: Prepare stats
         stats = {
             "total_detections": len(merged_detections),
@@ -248,7 +361,7 @@ class RedactionPipeline:
             "entities": merged_detections
         }
         
-        logger.info(f"Redaction complete: {names_count} names, {rolls_count} rolls")
+        logger.log(log_level, f"Redaction complete: {names_count} names, {rolls_count} rolls")
         
         return redacted_text, stats
 
@@ -0,0 +1,111 @@
+"""
+Catastrophic-backtracking (ReDoS) check for the reductor's regexes.
+
+Usage:
+  python3 scripts/redos_check.py
+
+Every pattern is run against "pump" strings (a label-like prefix, one
+repeated chunk, a suffix that forces the match to fail late) at two sizes.
+A linear-time pattern takes about SIZE_FACTOR times longer on the larger
+input; one that backtracks takes SIZE_FACTOR squared or worse. Patterns
+that scale superlinearly are reported with the witness string and the
+script exits non-zero, so it can run in CI before a pattern change ships.
+Each pattern runs in its own process; one that does not finish within
+TIMEOUT_SECONDS is reported as failing too.
+"""
+
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from detectors.regex_detector import RegexDetector
+from pipeline import redact_pipeline
+from utils import docx_anonymizer
+
+SMALL = 256
+SIZE_FACTOR = 8
+# Linear scaling gives a ratio near SIZE_FACTOR; quadratic near SIZE_FACTOR ** 2
+MAX_RATIO = SIZE_FACTOR * 3
+# Below this the timings are noise, whatever the ratio
+MIN_SECONDS = 0.01
+# Best of this many runs per input, to ride out scheduler jitter
+REPEATS = 3
+# Per pattern, for all pump strings together
+TIMEOUT_SECONDS = 30
+
+PREFIXES = ["", "NAME: ", "student name ", "ROLL NO ", "ID", "enrollment no ", "(", "[", "1", "Ep"]
+PUMPS = [" ", "\t", "A", "a ", "1", "12 ", ". ", "-", "[ "]
+SUFFIXES = ["", "!", "\n", "=x"]
+
+
+def _patterns():
+    """(label, callable) for every regex search the service runs"""
+    detector = RegexDetector()
+    yield "RegexDetector.detect", detector.detect
+    yield "RegexDetector.line_pattern", lambda text: list(detector.line_pattern.finditer(text))
+    yield "redact_pipeline.MATH_PATTERN", redact_pipeline.MATH_PATTERN.search
+    for entity_type, pattern in redact_pipeline.LABEL_PATTERNS.items():
+        yield f"redact_pipeline.LABEL_PATTERNS[{entity_type}]", pattern.search
+    for entity_type, pattern in redact_pipeline.INLINE_LABEL_PATTERNS.items():
+        yield f"redact_pipeline.INLINE_LABEL_PATTERNS[{entity_type}]", pattern.match
+    yield "docx_anonymizer.LABEL_NAME_RE", docx_anonymizer.LABEL_NAME_RE.search
+    yield "docx_anonymizer.LABEL_ROLL_RE", docx_anonymizer.LABEL_ROLL_RE.search
+
+
+def _elapsed(func, text: str) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+        if best > TIMEOUT_SECONDS / REPEATS:
+            break
+    return best
+
+
+def _check(index: int, results) -> None:
+    """Child process: pump one pattern and report its superlinear cases"""
+    label, func = list(_patterns())[index]
+    failures = []
+    for prefix, pump, suffix in itertools.product(PREFIXES, PUMPS, SUFFIXES):
+        small = prefix + pump * SMALL + suffix
+        large = prefix + pump * (SMALL * SIZE_FACTOR) + suffix
+        t_small = max(_elapsed(func, small), 1e-6)
+        t_large = _elapsed(func, large)
+        if t_large > MIN_SECONDS and t_large / t_small > MAX_RATIO:
+            failures.append(
+                f"{t_small * 1000:.1f}ms → {t_large * 1000:.1f}ms "
+                f"for {prefix!r} + {pump!r} * N + {suffix!r}"
+            )
+    results.put(failures)
+
+
+def main() -> int:
+    failures = 0
+    for index, (label, _) in enumerate(_patterns()):
+        results = multiprocessing.Queue()
+        worker = multiprocessing.Process(target=_check, args=(index, results))
+        worker.start()
+        worker.join(TIMEOUT_SECONDS)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+            failures += 1
+            print(f"❌ {label}: timed out after {TIMEOUT_SECONDS}s")
+            continue
+        for failure in results.get():
+            failures += 1
+            print(f"❌ {label}: {failure}")
+    if failures:
+        print(f"\n{failures} superlinear case(s) found")
+        return 1
+    print("✅ All patterns scale linearly on the pump strings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,35 +37,39 @@ class PDFConverter:
     @staticmethod
     def convert_pdf_to_docx(pdf_data: io.BytesIO) -> io.BytesIO:
         """Convert PDF to DOCX format."""
+        temp_docx = tempfile.NamedTemporaryFile(suffix=".docx", delete=False)
+        temp_docx.close()
+        try:
+            PDFConverter.convert_pdf_to_docx_file(pdf_data, temp_docx.name)
+            with open(temp_docx.name, "rb") as f:
+                docx_bytes = f.read()
+            return io.BytesIO(docx_bytes)
+        finally:
+            if os.path.exists(temp_docx.name):
+                os.remove(temp_docx.name)
+
+    @staticmethod
+    def convert_pdf_to_docx_file(pdf_data: io.BytesIO, output_path: str) -> None:
+        """Convert PDF to DOCX, writing the result straight to output_path."""
         try:
             logger.info("Starting PDF to DOCX conversion")
             
-            # Create temporary files
+            # Create temporary file
             temp_pdf = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-            temp_docx = tempfile.NamedTemporaryFile(suffix=".docx", delete=False)
             
             try:
-                # Write PDF data to temp file
-                pdf_data.seek(0)
-                temp_pdf.write(pdf_data.read())
+                # Write PDF data to temp file (no intermediate bytes copy)
+                temp_pdf.write(pdf_data.getbuffer())
                 temp_pdf.close()
                 
                 # Convert PDF to DOCX
                 converter = Converter(temp_pdf.name)
-                converter.convert(temp_docx.name)
+                converter.convert(output_path)
                 converter.close()
-                
-                # Read converted DOCX
-                temp_docx.close()
-                with open(temp_docx.name, "rb") as f:
-                    docx_bytes = f.read()
-                return io.BytesIO(docx_bytes)
             finally:
-                # Clean up temp files
+                # Clean up temp file
                 if os.path.exists(temp_pdf.name):
                     os.remove(temp_pdf.name)
-                if os.path.exists(temp_docx.name):
-                    os.remove(temp_docx.name)
         except Exception as e:
             logger.error(f"PDF to DOCX conversion failed: {e}")
             raise
@@ -12,6 +12,17 @@ from logger import get_logger
 logger = get_logger(__name__)
 
 
+def _pdf_converter():
+    """Import PDFConverter from converter-module"""
+    ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+    converter_path = os.path.join(ROOT, "python-manager", "modules", "converter-module")
+    if converter_path not in sys.path:
+        sys.path.insert(0, converter_path)
+    
+    from services.pdf_converter import PDFConverter
+    return PDFConverter
+
+
 def pdf_to_docx(pdf_data: io.BytesIO) -> io.BytesIO:
     """
     Convert PDF to DOCX preserving structure.
@@ -27,20 +38,32 @@ def pdf_to_docx(pdf_data: io.BytesIO) -> io.BytesIO:
     logger.info("📄 Converting PDF → DOCX (using converter-module)...")
     
     try:
-        # Import converter from converter-module
-        ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-        converter_path = os.path.join(ROOT, "python-manager", "modules", "converter-module")
-        if converter_path not in sys.path:
-            sys.path.insert(0, converter_path)
-        
-        from services.pdf_converter import PDFConverter
-        
         # Use the working converter
-        docx_data = PDFConverter.convert_pdf_to_docx(pdf_data)
+        docx_data = _pdf_converter().convert_pdf_to_docx(pdf_data)
         
-        logger.info(f"✅ PDF → DOCX complete ({len(docx_data.getvalue())} bytes)")
+        logger.info(f"✅ PDF → DOCX complete ({docx_data.getbuffer().nbytes} bytes)")
         return docx_data
         
     except Exception as e:
         logger.error(f"❌ PDF conversion failed: {e}")
         raise
+
+
+def pdf_to_docx_file(pdf_data: io.BytesIO, output_path: str) -> None:
+    """
+    Convert PDF to DOCX, writing the DOCX straight to output_path
+    instead of returning it in memory.
+    
+    Args:
+        pdf_data: BytesIO containing PDF bytes
+        output_path: Where to write the DOCX
+    """
+    logger.info("📄 Converting PDF → DOCX (using converter-module)...")
+    
+    try:
+        _pdf_converter().convert_pdf_to_docx_file(pdf_data, output_path)
+        logger.info(f"✅ PDF → DOCX complete ({os.path.getsize(output_path)} bytes)")
+        
+    except Exception as e:
+        logger.error(f"❌ PDF conversion failed: {e}")
+        raise
@@ -11,16 +11,33 @@ CRITICAL PRINCIPLE:
 - Preserves all structure, spacing, alignment
 """
 
+import io
 import os
 import re
+import sys
+import threading
 import zipfile
 import tempfile
+from pathlib import Path
 from lxml import etree
 from logger import get_logger
 
+# shared/ lives at the repository root, and at /app/shared in the service images
+for _root in Path(__file__).resolve().parents:
+    if (_root / "shared" / "zip_raw.py").is_file():
+        if str(_root) not in sys.path:
+            sys.path.append(str(_root))
+        break
+from shared.zip_raw import copy_entry
+
 logger = get_logger(__name__)
 
 WORD_NAMESPACE = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+DOCUMENT_PART = "word/document.xml"
+
+# Labels a paragraph must contain before a matching name/roll number is removed
+LABEL_NAME_RE = re.compile(r"\b(learner\s+name|student\s+name|name)\b", re.IGNORECASE)
+LABEL_ROLL_RE = re.compile(r"\b(learner\s+roll|roll\s+(?:number|no\.?|num\.?|#)|enrollment\s+(?:no|number)|id\s+(?:no|number))\b", re.IGNORECASE)
 
 
 TEXT_LIKE_EXTENSIONS = {
@@ -39,35 +56,21 @@ TEXT_LIKE_EXTENSIONS = {
 }
 
 
-def _replace_bytes_case_insensitive(file_path: str, targets: list[bytes]) -> int:
-    """Case-insensitive byte replacement for text-like files. Returns replacements count."""
-    ext = os.path.splitext(file_path)[1].lower()
+def _replace_bytes_case_insensitive(filename: str, data: bytes, targets: list[bytes]) -> tuple[bytes, int]:
+    """Case-insensitive byte replacement for text-like parts. Returns (data, replacements count)."""
+    ext = os.path.splitext(filename)[1].lower()
     if ext not in TEXT_LIKE_EXTENSIONS:
-        return 0
-
-    try:
-        with open(file_path, "rb") as f:
-            data = f.read()
-    except Exception:
-        return 0
+        return data, 0
 
     total = 0
     for tgt in targets:
         if not tgt:
             continue
-        pattern = re.compile(re.escape(tgt), flags=re.IGNORECASE)
-        hits = len(re.findall(pattern, data))
+        replaced, hits = re.compile(re.escape(tgt), flags=re.IGNORECASE).subn(b"[REDACTED]", data)
         if hits:
-            data = re.sub(pattern, b"[REDACTED]", data)
+            data = replaced
             total += hits
-
-    if total:
-        try:
-            with open(file_path, "wb") as f:
-                f.write(data)
-        except Exception:
-            return 0
-    return total
+    return data, total
 
 
 def unzip_docx(docx_path: str) -> str:
@@ -104,6 +107,38 @@ def load_xml(xml_path: str) -> etree._ElementTree:
         raise
 
 
+# lxml parsers are reusable but not thread-safe, so keep one per thread
+_parser_local = threading.local()
+
+
+def _shared_parser() -> etree.XMLParser:
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = etree.XMLParser(
+            recover=True,
+            huge_tree=True,
+            remove_blank_text=False,
+            strip_cdata=False,
+            remove_comments=False,
+        )
+        _parser_local.parser = parser
+    return parser
+
+
+def load_xml_from_docx(docx_path, part: str = DOCUMENT_PART) -> etree._ElementTree:
+    """
+    Parse one XML part straight out of a DOCX (path or binary file object),
+    without extracting the package to disk. Malformed XML is recovered
+    rather than rejected; this is meant for reading, not rewriting.
+    """
+    with zipfile.ZipFile(docx_path, 'r') as z:
+        data = z.read(part)
+    root = etree.fromstring(data, _shared_parser())
+    if root is None:
+        raise ValueError(f"No XML content in {part}")
+    return root.getroottree()
+
+
 def zip_docx(temp_dir: str, output_path: str):
     """Rezip DOCX from temp directory."""
     with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as z:
@@ -114,6 +149,40 @@ def zip_docx(temp_dir: str, output_path: str):
                 z.write(file_path, arcname)
 
 
+def _rewrite_docx_parts(docx_path: str, edit, select=None) -> int:
+    """
+    Rewrite a DOCX in place, in memory. edit(filename, data) returns the new
+    bytes for a part, or None to leave it alone; only parts passing
+    select(filename) (default: all) are read and offered to it. Untouched
+    parts are copied through raw, and the file is not rewritten at all if
+    nothing changed.
+
+    Returns:
+        Number of parts changed
+    """
+    with open(docx_path, "rb") as f:
+        source = io.BytesIO(f.read())
+
+    with zipfile.ZipFile(source, 'r') as zin:
+        changed = {}
+        for item in zin.infolist():
+            if item.is_dir() or (select is not None and not select(item.filename)):
+                continue
+            new_data = edit(item.filename, zin.read(item.filename))
+            if new_data is not None:
+                changed[item.filename] = new_data
+        if not changed:
+            return 0
+
+        with zipfile.ZipFile(docx_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+            for item in zin.infolist():
+                if item.filename in changed:
+                    zout.writestr(item.filename, changed[item.filename])
+                else:
+                    copy_entry(zin, zout, item, source)
+    return len(changed)
+
+
 def _remove_value_aggressive(docx_path: str, value: str) -> int:
     """
     AGGRESSIVE direct byte-level removal.
@@ -130,49 +199,34 @@ def _remove_value_aggressive(docx_path: str, value: str) -> int:
         return 0
     
     val_clean = value.strip()
+    val_bytes = val_clean.encode("utf-8")
+    pattern = re.compile(re.escape(val_bytes), flags=re.IGNORECASE)
     removed_count = 0
-    
-    temp_dir = unzip_docx(docx_path)
-    try:
+
+    def edit(filename: str, data: bytes):
+        nonlocal removed_count
+        original = data
+
         # Scan every XML part (document, headers, footers, customXml, settings)
-        for root, _, files in os.walk(temp_dir):
-            for filename in files:
-                if not filename.lower().endswith('.xml'):
-                    continue
-                xml_path = os.path.join(root, filename)
-
-                # Read as bytes
-                with open(xml_path, "rb") as f:
-                    xml_bytes = f.read()
-
-                val_bytes = val_clean.encode("utf-8")
-                pattern = re.compile(re.escape(val_bytes), flags=re.IGNORECASE)
-                hits = len(re.findall(pattern, xml_bytes))
-
-                if hits:
-                    xml_bytes = re.sub(pattern, b"[REDACTED]", xml_bytes)
-                    removed_count += hits
-                    logger.info(f"  ✂️  Removed {hits} occurrences of '{val_clean}' in {filename}")
-
-                    with open(xml_path, "wb") as f:
-                        f.write(xml_bytes)
-
-        # Final fallback: replace in any text-like file (rels, customXml, etc.)
-        targets = [val_clean.encode("utf-8")]
-        for root, _, files in os.walk(temp_dir):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                hits = _replace_bytes_case_insensitive(file_path, targets)
-                if hits:
-                    removed_count += hits
-
-        # Rezip once after all edits
-        zip_docx(temp_dir, docx_path)
-
-        return removed_count
-    finally:
-        import shutil
-        shutil.rmtree(temp_dir)
+        if filename.lower().endswith('.xml'):
+            replaced, hits = pattern.subn(b"[REDACTED]", data)
+            if hits:
+                data = replaced
+                removed_count += hits
+                logger.info(f"  ✂️  Removed {hits} occurrences of '{val_clean}' in {os.path.basename(filename)}")
+
+        # Final fallback: replace in any text-like part (rels, customXml, etc.)
+        data, hits = _replace_bytes_case_insensitive(filename, data, [val_bytes])
+        removed_count += hits
+
+        return data if data is not original else None
+
+    _rewrite_docx_parts(
+        docx_path,
+        edit,
+        select=lambda filename: os.path.splitext(filename)[1].lower() in TEXT_LIKE_EXTENSIONS,
+    )
+    return removed_count
 
 
 def _remove_value_from_text_nodes(docx_path: str, value: str) -> int:
@@ -202,31 +256,22 @@ def _remove_value_byte_level(docx_path: str, value: str) -> int:
     if not value or not value.strip():
         return 0
     
-    temp_dir = unzip_docx(docx_path)
-    try:
-        document_xml = os.path.join(temp_dir, "word/document.xml")
-        
-        with open(document_xml, "rb") as f:
-            xml_bytes = f.read()
-        
-        val_bytes = value.strip().encode("utf-8")
-        # Replace with NBSP to preserve structure and bullet rendering
-        pattern = b"(<w:t[^>]*>)" + re.escape(val_bytes) + b"(</w:t>)"
-        
-        replaced = re.sub(pattern, b"\\1\xC2\xA0\\2", xml_bytes, flags=re.IGNORECASE)
-        
+    val_bytes = value.strip().encode("utf-8")
+    # Replace with NBSP to preserve structure and bullet rendering
+    pattern = re.compile(b"(<w:t[^>]*>)" + re.escape(val_bytes) + b"(</w:t>)", flags=re.IGNORECASE)
+    bytes_removed = 0
+
+    def edit(filename: str, xml_bytes: bytes):
+        nonlocal bytes_removed
+        replaced = pattern.sub(b"\\1\xC2\xA0\\2", xml_bytes)
         bytes_removed = len(xml_bytes) - len(replaced)
-        
         if bytes_removed > 0:
-            with open(document_xml, "wb") as f:
-                f.write(replaced)
             logger.info(f"    ✂️  Byte-level removal: {bytes_removed} bytes")
-        
-        zip_docx(temp_dir, docx_path)
-        return bytes_removed
-    finally:
-        import shutil
-        shutil.rmtree(temp_dir)
+            return replaced
+        return None
+
+    _rewrite_docx_parts(docx_path, edit, select=lambda filename: filename == "word/document.xml")
+    return bytes_removed
 
 
 def _fix_bullet_formatting(docx_path: str) -> int:
@@ -238,13 +283,11 @@ def _fix_bullet_formatting(docx_path: str) -> int:
     
     Returns: number of runs fixed
     """
-    temp_dir = unzip_docx(docx_path)
-    try:
-        document_xml = os.path.join(temp_dir, "word/document.xml")
-        tree = load_xml(document_xml)
-        root = tree.getroot()
-        
-        fixed = 0
+    fixed = 0
+
+    def edit(filename: str, xml_bytes: bytes):
+        nonlocal fixed
+        root = etree.fromstring(xml_bytes, etree.XMLParser(remove_blank_text=False, strip_cdata=False, remove_comments=False))
         
         # Find all runs with Symbol/Wingdings fonts
         for run in root.xpath("//w:r", namespaces=WORD_NAMESPACE):
@@ -272,28 +315,34 @@ def _fix_bullet_formatting(docx_path: str) -> int:
                 if text_node is not None and text_node.text:
                     logger.info(f"  ✓ Changed {ascii_font} → Arial for text: {repr(text_node.text[:20])}")
         
-        # Write back XML
-        tree.write(document_xml, encoding="UTF-8", xml_declaration=True)
-        
-        # Rezip
-        zip_docx(temp_dir, docx_path)
-        
-        return fixed
-    finally:
-        import shutil
-        shutil.rmtree(temp_dir)
-
-
-def anonymize_docx(input_path: str, output_path: str, name: str = None, roll_no: str = None) -> dict:
+        if not fixed:
+            return None
+        return etree.tostring(root.getroottree(), encoding="UTF-8", xml_declaration=True)
+
+    _rewrite_docx_parts(docx_path, edit, select=lambda filename: filename == "word/document.xml")
+    return fixed
+
+
+def anonymize_docx(
+    input_path,
+    output_path,
+    name: str = None,
+    roll_no: str = None,
+    document_tree: etree._ElementTree = None,
+    return_tree: bool = False,
+):
     """
     Anonymize DOCX by removing name and roll number.
     BULLETPROOF: Uses direct byte replacement at multiple levels.
     
     Args:
-        input_path: Input DOCX file
-        output_path: Output anonymized DOCX
+        input_path: Input DOCX file (path or binary file object)
+        output_path: Output anonymized DOCX (path or writable binary file object)
         name: Student name to remove
         roll_no: Student roll number to remove
+        document_tree: Already-parsed word/document.xml of input_path, used
+            instead of parsing it again. It is anonymized in place.
+        return_tree: Also return the output's word/document.xml tree
     
     Returns:
         {
@@ -301,11 +350,15 @@ def anonymize_docx(input_path: str, output_path: str, name: str = None, roll_no:
             "removed_roll": count,
             "bytes_removed": total
         }
+        or (stats, document_tree) with return_tree; the tree is None if
+        word/document.xml could not be parsed
     """
-    import shutil
-    
-    # Copy input to output first
-    shutil.copy(input_path, output_path)
+    # Read a path input up front so output_path may be the same file
+    if isinstance(input_path, (str, os.PathLike)):
+        with open(input_path, "rb") as f:
+            source = io.BytesIO(f.read())
+    else:
+        source = input_path
     
     logger.info(f"🔄 Anonymizing {output_path}...")
     logger.info(f"   Using BULLETPROOF byte-level replacement")
@@ -316,38 +369,42 @@ def anonymize_docx(input_path: str, output_path: str, name: str = None, roll_no:
         "bytes_removed": 0,
     }
     
-    temp_dir = unzip_docx(output_path)
-    try:
-        label_name_re = re.compile(r"\b(learner\s+name|student\s+name|name)\b", re.IGNORECASE)
-        label_roll_re = re.compile(r"\b(learner\s+roll|roll\s+(?:number|no\.?|num\.?|#)|enrollment\s+(?:no|number)|id\s+(?:no|number))\b", re.IGNORECASE)
-
-        name_clean = name.strip() if name else None
-        roll_clean = roll_no.strip() if roll_no else None
-        name_parts = [p for p in (name_clean.split() if name_clean else []) if len(p) >= 3]
+    name_clean = name.strip() if name else None
+    roll_clean = roll_no.strip() if roll_no else None
+    name_parts = [p for p in (name_clean.split() if name_clean else []) if len(p) >= 3]
+    output_tree = None
+
+    # Rewrite the package entry by entry, in memory, instead of extracting it
+    # to a temp directory and zipping it back up. Only the parts that change
+    # are re-compressed; the rest is copied through as stored in the input.
+    with zipfile.ZipFile(source, 'r') as zin, zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            if not item.filename.lower().endswith('.xml'):
+                copy_entry(zin, zout, item, source)
+                continue
 
-        for root, _, files in os.walk(temp_dir):
-            for filename in files:
-                if not filename.lower().endswith('.xml'):
-                    continue
+            is_document = item.filename == DOCUMENT_PART
+            data = None if is_document and document_tree is not None else zin.read(item.filename)
+            changed = False
 
-                xml_path = os.path.join(root, filename)
+            if data is None:
+                tree = document_tree
+            else:
                 try:
-                    tree = etree.parse(xml_path)
+                    tree = etree.parse(io.BytesIO(data))
                 except Exception:
-                    continue
-
-                changed = False
-
-                # Only process WordprocessingML parts that actually contain text nodes
-                if not (tree.getroot().tag.endswith('document') or tree.xpath("//w:t", namespaces=WORD_NAMESPACE)):
-                    continue
+                    tree = None
+            if is_document:
+                output_tree = tree
 
+            # Only process WordprocessingML parts that actually contain text nodes
+            if tree is not None and (tree.getroot().tag.endswith('document') or tree.xpath("//w:t", namespaces=WORD_NAMESPACE)):
                 # Paragraph-level scan to enforce label context
                 for para in tree.xpath("//w:p", namespaces=WORD_NAMESPACE):
                     para_text = "".join((t.text or "") for t in para.xpath(".//w:t", namespaces=WORD_NAMESPACE))
                     para_lower = para_text.lower()
-                    has_name_label = bool(label_name_re.search(para_lower))
-                    has_roll_label = bool(label_roll_re.search(para_lower))
+                    has_name_label = bool(LABEL_NAME_RE.search(para_lower))
+                    has_roll_label = bool(LABEL_ROLL_RE.search(para_lower))
 
                     for text_node in para.xpath(".//w:t", namespaces=WORD_NAMESPACE):
                         txt_raw = text_node.text or ""
@@ -378,18 +435,18 @@ def anonymize_docx(input_path: str, output_path: str, name: str = None, roll_no:
                                         break
 
                 if changed:
-                    tree.write(xml_path, encoding="UTF-8", xml_declaration=True)
+                    data = etree.tostring(tree, encoding="UTF-8", xml_declaration=True)
 
-        # Rezip all modified parts
-        zip_docx(temp_dir, output_path)
-        
-        logger.info(f"✅ Anonymization complete:")
-        logger.info(f"   Name instances removed: {stats['removed_name']}")
-        logger.info(f"   Roll instances removed: {stats['removed_roll']}")
-        logger.info(f"   Total bytes removed: {stats['bytes_removed']}")
-        
-        return stats
+            if not changed:
+                copy_entry(zin, zout, item, source)
+            else:
+                zout.writestr(item.filename, data)
+    
+    logger.info(f"✅ Anonymization complete:")
+    logger.info(f"   Name instances removed: {stats['removed_name']}")
+    logger.info(f"   Roll instances removed: {stats['removed_roll']}")
+    logger.info(f"   Total bytes removed: {stats['bytes_removed']}")
     
-    finally:
-        import shutil
-        shutil.rmtree(temp_dir)
+    if return_tree:
+        return stats, output_tree
+    return stats
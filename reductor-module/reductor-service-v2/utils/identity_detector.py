@@ -42,15 +42,16 @@ def detect_identity(docx_tree: etree._ElementTree) -> dict:
     pipeline = get_pipeline()
 
     text_nodes = root.xpath("//w:t", namespaces=WORD_NAMESPACE)
+    # (node index, stripped text) for every non-empty text node
+    node_texts = [(idx, (node.text or "").strip()) for idx, node in enumerate(text_nodes)]
+    node_texts = [(idx, text) for idx, text in node_texts if text]
     detections = []
 
-    # Detect per text node to avoid span mismatch; only keep exact node text matches
-    for idx, node in enumerate(text_nodes):
-        node_text = (node.text or "").strip()
-        if not node_text:
-            continue
-        _, stats = pipeline.redact_text(node_text)
-        for det in stats.get("entities", []):
+    # Detect per text node to avoid span mismatch; only keep exact node text matches.
+    # All node texts go through the pipeline as one batch; nothing is redacted here.
+    results = pipeline.detect_texts([text for _, text in node_texts])
+    for (idx, node_text), node_detections in zip(node_texts, results):
+        for det in node_detections:
             det_text = (det.get("text") or "").strip()
             if not det_text:
                 continue
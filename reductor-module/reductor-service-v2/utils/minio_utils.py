@@ -5,7 +5,10 @@ MinIO utilities: download/upload files
 """
 
 import io
+import os
+import shutil
 from minio import Minio
+from minio.error import S3Error
 from config import config
 from logger import get_logger
 
@@ -32,18 +35,36 @@ class MinIOClient:
             response = self.client.get_object(bucket, object_key)
             data = io.BytesIO(response.read())
             response.close()
-            logger.info(f"✅ Downloaded {object_key} ({len(data.getvalue())} bytes)")
+            logger.info(f"✅ Downloaded {object_key} ({data.getbuffer().nbytes} bytes)")
             return data
         except Exception as e:
             logger.error(f"❌ Download failed: {e}")
             raise
 
+    def download_to_path_if_exists(self, bucket: str, object_key: str, file_path: str) -> bool:
+        """Download straight to disk; return False instead of raising when the object does not exist."""
+        try:
+            response = self.client.get_object(bucket, object_key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return False
+            logger.error(f"❌ Download failed: {e}")
+            raise
+        try:
+            with open(file_path, "wb") as f:
+                shutil.copyfileobj(response, f, length=1 << 20)
+        finally:
+            response.close()
+            response.release_conn()
+        logger.info(f"✅ Downloaded {object_key} ({os.path.getsize(file_path)} bytes)")
+        return True
+
     def upload(self, bucket: str, object_key: str, file_data: io.BytesIO, content_type: str = "application/octet-stream"):
         """Upload file to MinIO."""
         logger.info(f"⬆️  Uploading to MinIO: {bucket}/{object_key}")
         try:
             file_data.seek(0)
-            file_size = len(file_data.getvalue())
+            file_size = file_data.getbuffer().nbytes
             self.client.put_object(
                 bucket,
                 object_key,
@@ -56,5 +77,20 @@ class MinIOClient:
             logger.error(f"❌ Upload failed: {e}")
             raise
 
+    def upload_file(self, bucket: str, object_key: str, file_path: str, content_type: str = "application/octet-stream"):
+        """Upload a local file to MinIO, streaming it from disk."""
+        logger.info(f"⬆️  Uploading to MinIO: {bucket}/{object_key}")
+        try:
+            self.client.fput_object(
+                bucket,
+                object_key,
+                file_path,
+                content_type=content_type,
+            )
+            logger.info(f"✅ Uploaded {object_key} ({os.path.getsize(file_path)} bytes)")
+        except Exception as e:
+            logger.error(f"❌ Upload failed: {e}")
+            raise
+
 
 minio_client = MinIOClient()
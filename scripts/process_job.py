@@ -6,6 +6,7 @@ import zipfile
 import shutil
 import io
 import time
+import fcntl
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from uuid import uuid4
@@ -76,6 +77,36 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
+# ioctl(2) request that clones a file's extents (copy-on-write) on btrfs/xfs
+FICLONE = 0x40049409
+
+
+def fast_copy(src: str, dst: str) -> None:
+    """Copy a file without moving its bytes through userspace where possible.
+
+    Tries a reflink (O(1), copy-on-write), then copy_file_range (kernel-side,
+    same filesystem), then shutil.copyfile.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+        try:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            else:
+                return
+        except (AttributeError, OSError):
+            pass
+    shutil.copyfile(src, dst)
+
+
 def is_valid_docx(path: str) -> bool:
     import zipfile
     try:
@@ -152,10 +183,10 @@ def process_single_file(args):
             docx_humanize_lxml.process_docx(redacted_path, humanized_path, skip_detect=True)
             if not is_valid_docx(humanized_path):
                 print(f"[ERROR] Humanizer produced a corrupted DOCX: {humanized_path}")
-                shutil.copy(redacted_path, humanized_path)
+                fast_copy(redacted_path, humanized_path)
         except Exception as e:
             print(f"Humanizer failed: {e}")
-            shutil.copy(redacted_path, humanized_path)
+            fast_copy(redacted_path, humanized_path)
 
         # Spell / Grammar
         print("Fixing spelling and grammar...")
@@ -165,10 +196,10 @@ def process_single_file(args):
             print(f"  Fixed {stats['total_changes']} spelling/grammar errors")
             if not is_valid_docx(final_path):
                 print(f"[ERROR] Spell checker produced a corrupted DOCX: {final_path}")
-                shutil.copy(humanized_path, final_path)
+                fast_copy(humanized_path, final_path)
         except Exception as e:
             print(f"Spell/grammar check failed: {e}")
-            shutil.copy(humanized_path, final_path)
+            fast_copy(humanized_path, final_path)
 
         # Formatting (DISABLED - preserves original formatting)
         # print("Applying standard formatting...")
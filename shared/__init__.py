@@ -0,0 +1 @@
+"""Code shared by the Python services (copied into each image as /app/shared)"""
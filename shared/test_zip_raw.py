@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Round-trip tests for shared/zip_raw.py.
+
+Run with pytest, or directly: python3 shared/test_zip_raw.py
+"""
+
+import io
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared import zip_raw
+
+# (name, data, compression) for a package exercising every entry shape we copy
+ENTRIES = [
+    ("[Content_Types].xml", b"<Types/>" * 50, zipfile.ZIP_DEFLATED),
+    ("word/document.xml", b"<w:document>" + b"text " * 2000 + b"</w:document>", zipfile.ZIP_DEFLATED),
+    ("word/media/image1.png", bytes(range(256)) * 40, zipfile.ZIP_STORED),
+    ("word/média/ünïcode.xml", "<x>ünïcode</x>".encode("utf-8") * 20, zipfile.ZIP_DEFLATED),
+    ("customXml/item1.xml", b"<lzma/>" * 300, zipfile.ZIP_LZMA),
+    ("word/empty.xml", b"", zipfile.ZIP_DEFLATED),
+]
+# Entry carrying an extra field in its local header, which the copy must skip
+EXTRA_ENTRY = "word/styles.xml"
+EXTRA_FIELD = struct.pack("<HH", 0xCAFE, 4) + b"abcd"
+ENTRIES.append((EXTRA_ENTRY, b"<w:styles/>" * 100, zipfile.ZIP_DEFLATED))
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only stream without seek(), so ZipFile writes data descriptors"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def _make_package(data_descriptors: bool = False) -> bytes:
+    out = _Unseekable() if data_descriptors else io.BytesIO()
+    with zipfile.ZipFile(out, "w") as z:
+        for name, data, compression in ENTRIES:
+            info = zipfile.ZipInfo(name, (2024, 1, 2, 3, 4, 6))
+            if name == EXTRA_ENTRY:
+                info.extra = EXTRA_FIELD
+            z.writestr(info, data, compress_type=compression)
+    return (out.buffer if data_descriptors else out).getvalue()
+
+
+def _copy_package(source: bytes, out=None) -> bytes:
+    out = io.BytesIO() if out is None else out
+    raw_in = io.BytesIO(source)
+    with zipfile.ZipFile(io.BytesIO(source)) as zin, zipfile.ZipFile(out, "w") as zout:
+        for item in zin.infolist():
+            zip_raw.copy_entry(zin, zout, item, raw_in)
+    return (out.buffer if isinstance(out, _Unseekable) else out).getvalue()
+
+
+def _check_round_trip(source: bytes, copied: bytes, raw: bool) -> None:
+    with zipfile.ZipFile(io.BytesIO(source)) as zsrc, zipfile.ZipFile(io.BytesIO(copied)) as zdst:
+        assert zdst.testzip() is None, "Copied package fails CRC check"
+        assert zdst.namelist() == zsrc.namelist(), "Entry names or order changed"
+        for src, dst in zip(zsrc.infolist(), zdst.infolist()):
+            assert zdst.read(dst) == zsrc.read(src), f"{src.filename}: content changed"
+            assert dst.compress_type == src.compress_type, f"{src.filename}: compression changed"
+            assert dst.date_time == src.date_time, f"{src.filename}: timestamp changed"
+            assert dst.external_attr == src.external_attr, f"{src.filename}: attributes changed"
+            # Compression option bits survive; the data descriptor bit is not needed
+            assert dst.flag_bits & 0x06 == src.flag_bits & 0x06, f"{src.filename}: flags changed"
+            assert not dst.flag_bits & 0x08 or not raw, f"{src.filename}: stray data descriptor flag"
+            if not src.filename.isascii():
+                assert dst.flag_bits & 0x800, f"{src.filename}: UTF-8 name flag missing"
+            if raw:
+                assert dst.compress_size == src.compress_size, f"{src.filename}: was recompressed"
+
+
+def test_raw_copy_round_trip():
+    source = _make_package()
+    _check_round_trip(source, _copy_package(source), raw=zip_raw.RAW_COPY_MAX_VERSION >= sys.version_info[:2])
+
+
+def test_raw_copy_of_data_descriptor_entries():
+    source = _make_package(data_descriptors=True)
+    with zipfile.ZipFile(io.BytesIO(source)) as z:
+        assert all(item.flag_bits & 0x08 for item in z.infolist()), "Fixture has no data descriptors"
+    _check_round_trip(source, _copy_package(source), raw=zip_raw.RAW_COPY_MAX_VERSION >= sys.version_info[:2])
+
+
+def test_source_entries_untouched():
+    source = _make_package()
+    raw_in = io.BytesIO(source)
+    with zipfile.ZipFile(io.BytesIO(source)) as zin, zipfile.ZipFile(io.BytesIO(), "w") as zout:
+        before = [(i.header_offset, i.flag_bits, i.compress_size) for i in zin.infolist()]
+        for item in zin.infolist():
+            zip_raw.copy_entry(zin, zout, item, raw_in)
+        assert [(i.header_offset, i.flag_bits, i.compress_size) for i in zin.infolist()] == before
+        assert zin.testzip() is None
+
+
+def test_fallback_on_unsupported_python():
+    source = _make_package(data_descriptors=True)
+    saved = zip_raw.RAW_COPY_MAX_VERSION
+    zip_raw.RAW_COPY_MAX_VERSION = (3, 0)
+    try:
+        _check_round_trip(source, _copy_package(source), raw=False)
+    finally:
+        zip_raw.RAW_COPY_MAX_VERSION = saved
+
+
+def test_fallback_on_unseekable_output():
+    source = _make_package()
+    _check_round_trip(source, _copy_package(source, out=_Unseekable()), raw=False)
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
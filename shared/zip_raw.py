@@ -0,0 +1,88 @@
+"""
+zip_raw.py
+
+Copy zip entries between archives without recompressing them.
+
+Used by the spell/grammar checker and the reductor service, which both
+rewrite one or two parts of a DOCX and pass everything else through.
+"""
+
+import struct
+import sys
+import zipfile
+
+# Local file header: fixed 30 bytes, then file name and extra field
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_LOCAL_HEADER_LENGTHS = struct.Struct("<HH")  # name length, extra length at offset 26
+
+# The raw copy appends an entry through ZipFile internals, the way
+# ZipFile.mkdir writes a header-only entry. Newest Python whose zipfile it is
+# known to match (the round trip in test_zip_raw.py covers it); on later
+# versions, or if the internals are gone, entries are recompressed instead.
+RAW_COPY_MAX_VERSION = (3, 13)
+_RAW_COPY_ATTRS = ("fp", "start_dir", "filelist", "NameToInfo", "_didModify", "_writecheck")
+
+
+def raw_copy_supported(zout: zipfile.ZipFile) -> bool:
+    """Whether copy_entry can write raw compressed bytes into zout"""
+    return (
+        sys.version_info[:2] <= RAW_COPY_MAX_VERSION
+        and all(hasattr(zout, attr) for attr in _RAW_COPY_ATTRS)
+        # Unseekable outputs get data descriptors; the raw copy writes sizes up front
+        and getattr(zout, "_seekable", False)
+    )
+
+
+def copy_entry(zin: zipfile.ZipFile, zout: zipfile.ZipFile, item: zipfile.ZipInfo, raw_in) -> None:
+    """
+    Copy an unchanged entry of zin into zout.
+
+    The compressed bytes are copied verbatim from raw_in (a seekable binary
+    file over the same archive as zin) instead of being inflated and
+    re-deflated. Encrypted entries, and outputs or Python versions the raw
+    copy does not support, go through zin.read() and zout.writestr().
+    """
+    if item.flag_bits & 0x1 or not raw_copy_supported(zout):
+        zout.writestr(_copy_info(item), zin.read(item))
+        return
+
+    raw_in.seek(item.header_offset)
+    header = raw_in.read(_LOCAL_HEADER_SIZE)
+    if len(header) != _LOCAL_HEADER_SIZE or not header.startswith(_LOCAL_HEADER_SIGNATURE):
+        raise zipfile.BadZipFile(f"Bad local file header for {item.filename}")
+    name_len, extra_len = _LOCAL_HEADER_LENGTHS.unpack_from(header, 26)
+    raw_in.seek(item.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+
+    zi = _copy_info(item)
+    zi.CRC = item.CRC
+    zi.compress_size = item.compress_size
+    zi.file_size = item.file_size
+    # Keep compression option bits (e.g. LZMA end marker); sizes go in the
+    # header, so no data descriptor. FileHeader() sets the UTF-8 name flag.
+    zi.flag_bits = item.flag_bits & 0x06
+
+    zout.fp.seek(zout.start_dir)
+    zi.header_offset = zout.fp.tell()
+    zout._writecheck(zi)
+    zout._didModify = True
+    zout.filelist.append(zi)
+    zout.NameToInfo[zi.filename] = zi
+    zout.fp.write(zi.FileHeader())
+    remaining = item.compress_size
+    while remaining:
+        chunk = raw_in.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {item.filename}")
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+    zout.start_dir = zout.fp.tell()
+
+
+def _copy_info(item: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """Fresh ZipInfo for item, so writing it never touches the source archive's entry"""
+    zi = zipfile.ZipInfo(item.filename, item.date_time)
+    zi.compress_type = item.compress_type
+    zi.external_attr = item.external_attr
+    zi.create_system = item.create_system
+    return zi